@@ -0,0 +1,341 @@
+#!python
+"""
+Benchmark generation of graph JSON from terraform graph output,
+comparing the previous pygraphviz/networkx implementation with TerraformGraphParser.
+
+Requires pygraphviz and networkx, which are installed by requirements-dev.txt.
+
+Usage: python scripts/benchmark_graph_json.py [--modules N] [--resources N] [--iterations N]
+"""
+
+import argparse
+import contextlib
+import io
+import re
+import sys
+import timeit
+
+import pygraphviz
+import networkx as nx
+
+sys.path.append('.')
+
+from terrareg.models import ModuleDetails
+
+
+def generate_terraform_graph(module_count, resource_count):
+    """
+    Generate graph in the format of terraform graph output, containing
+    nested module calls, each containing resources, data sources, variables, locals and outputs.
+    """
+    lines = [
+        'digraph {',
+        '\tcompound = "true"',
+        '\tnewrank = "true"',
+        '\tsubgraph "root" {',
+    ]
+    provider = '[root] provider[\\"registry.terraform.io/hashicorp/aws\\"]'
+    lines.append(f'\t\t"{provider}" [label = "provider[\\"registry.terraform.io/hashicorp/aws\\"]", shape = "diamond"]')
+
+    module_prefixes = ['']
+    for module_itx in range(module_count):
+        # Nest every other module within the previous module
+        parent_prefix = module_prefixes[-1] if module_itx % 2 else ''
+        module_prefixes.append(f'{parent_prefix}module.module{module_itx}.')
+
+    for prefix in module_prefixes:
+        module_name = prefix[:-1]
+        if module_name:
+            lines.append(f'\t\t"[root] {module_name} (close)" [label = "{module_name}", shape = "box"]')
+            lines.append(f'\t\t"[root] {module_name} (expand)" [label = "{module_name}", shape = "box"]')
+        for resource_itx in range(resource_count):
+            resource = f'{prefix}aws_s3_bucket.bucket{resource_itx}'
+            data = f'{prefix}data.aws_iam_policy_document.policy{resource_itx}'
+            variable = f'{prefix}var.name{resource_itx}'
+            local = f'{prefix}local.value{resource_itx}'
+            output = f'{prefix}output.name{resource_itx}'
+            lines.append(f'\t\t"[root] {resource} (expand)" [label = "{resource}", shape = "box"]')
+            lines.append(f'\t\t"[root] {data} (expand)" [label = "{data}", shape = "box"]')
+            lines.append(f'\t\t"[root] {variable}" [label = "{variable}", shape = "note"]')
+            lines.append(f'\t\t"[root] {local} (expand)" -> "[root] {variable}"')
+            lines.append(f'\t\t"[root] {resource} (expand)" -> "[root] {local} (expand)"')
+            lines.append(f'\t\t"[root] {resource} (expand)" -> "[root] {data} (expand)"')
+            lines.append(f'\t\t"[root] {resource} (expand)" -> "{provider}"')
+            lines.append(f'\t\t"[root] {output} (expand)" -> "[root] {resource} (expand)"')
+            if module_name:
+                lines.append(f'\t\t"[root] {resource} (expand)" -> "[root] {module_name} (expand)"')
+                lines.append(f'\t\t"[root] {module_name} (close)" -> "[root] {output} (expand)"')
+        if module_name:
+            parent_name = re.sub(r'\.?module\.[^\.]+$', '', module_name)
+            lines.append(f'\t\t"[root] {module_name} (expand)" -> "[root] {parent_name + " (expand)" if parent_name else "root"}"')
+            if parent_name:
+                # Link parent module to nested module, using parallel edges
+                lines.append(f'\t\t"[root] {parent_name} (close)" -> "[root] {module_name} (close)"')
+                lines.append(f'\t\t"[root] {parent_name} (expand)" -> "[root] {module_name} (expand)"')
+            lines.append(f'\t\t"[root] root" -> "[root] {module_name} (close)"')
+
+    lines.append(f'\t\t"[root] {provider} (close)" -> "[root] aws_s3_bucket.bucket0 (expand)"')
+    lines.append(f'\t\t"[root] root" -> "[root] {provider} (close)"')
+    lines.append('\t}')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+class BenchmarkModuleDetails:
+    """Provide graph data and Infracost output in place of ModuleDetails database row"""
+
+    def __init__(self, terraform_graph):
+        """Store member variables"""
+        self.terraform_graph = terraform_graph
+        self.infracost = {}
+
+    def generate_graph_json(self, full_resource_names, full_module_names):
+        """Generate graph JSON using TerraformGraphParser"""
+        return ModuleDetails._generate_graph_json(self, full_resource_names=full_resource_names, full_module_names=full_module_names)
+
+    def legacy_generate_graph_json(self, full_resource_names, full_module_names):
+        """Generate graph JSON using pygraphviz and networkx"""
+        terraform_graph = self.terraform_graph
+        if not terraform_graph:
+            return None
+
+        # Generate NX graph from terraform graphviz output
+        graph = pygraphviz.AGraph(terraform_graph)
+        nx_graph = nx.nx_agraph.from_agraph(graph)
+
+        infracost = self.infracost
+        resource_costs = {}
+        remove_item_iteration_re = re.compile(r'\[[^\]]+\]')
+        if infracost:
+            for resource in self.infracost["projects"][0]["breakdown"]["resources"]:
+                if not resource["monthlyCost"]:
+                    continue
+
+                name = remove_item_iteration_re.sub("", resource["name"])
+                if name not in resource_costs:
+                    resource_costs[name] = 0
+                resource_costs[name] += round((float(resource["monthlyCost"]) * 12), 2)
+
+        module_var_output_local_re = re.compile(r'^(module\.[^\.]+\.)+(var|local|output)\.[^\.]+$')
+        # Capture modules resources, such as:
+        # module.module1
+        # module.module1.module.module2
+        module_re = re.compile(r'^(?:module\.[^\.]+\.)*(?:module\.([^\.]+))$')
+        # Capture data resources, such as:
+        # data.aws_s3_bucket.test
+        # module.module1.data.aws_s3_bucket.test
+        # module.module1.module.module2.data.aws_s3_bucket.test
+        data_re = re.compile(r'^((?:module\.[^\.]+\.)+)data\.([^\.]+)\.([^\.])+$')
+        # Capture resources, such as:
+        # aws_s3_bucket.test
+        # module.module1.aws_s3_bucket.test
+        # module.module1.module.module2.aws_s3_bucket.test
+        resource_re = re.compile(r'^((?:module\.[^\.]+\.)*)([^\.]+)\.([^\.]+)$')
+
+        # Store node renames, to be renamed after initial iteration
+        renames = {}
+        # Store nodes to be removed
+        to_remove = []
+        # Store labels to be pushed to graph JSON
+        labels = {}
+        # Store type mappings for determine node attributes
+        type_mapping = {}
+        # Store parents of attributes to modules, used for
+        # parent mapping in JSON
+        parents = {}
+
+        def remove_node(node):
+            """Add a node to the remove_nodes list, if they are not already present"""
+            if node not in to_remove:
+                to_remove.append(node)
+
+        for node_label in nx_graph.nodes:
+            # Remove leading '[root] ' name and expand/close suffices from node names
+            name = node_label.replace('[root] ', '').replace(' (expand)', '').replace(' (close)', '')
+
+            # Check for root vars, outputs and locals
+            if name.startswith('output.') or name.startswith('var.') or name.startswith('local.'):
+                remove_node(node_label)
+
+            # Remove any module vars/outputs/locals
+            elif module_var_output_local_re.match(name):
+                remove_node(node_label)
+
+            # handle all other nodes
+            else:
+                # Rename to shortened name
+                renames[node_label] = name
+
+                # Match node name to type regexes
+                module_match = module_re.match(name)
+                resource_match = resource_re.match(name)
+                data_match = data_re.match(name)
+
+                # Create labels and type mapping
+                if name == "root":
+                    # Match root module
+                    labels[name] = "Root Module"
+                    type_mapping[name] = "module"
+
+                # Match submodules
+                elif module_match:
+                    if full_module_names:
+                        labels[name] = name
+                    else:
+                        labels[name] = module_match.group(1)
+
+                    type_mapping[name] = "module"
+
+                elif data_match:
+                    type_mapping[name] = "data"
+                    parents[name] = data_match.group(1).strip(".") or "root"
+
+                    if full_resource_names:
+                        labels[name] = name
+                    else:
+                        labels[name] = f"(data) {data_match.group(2)}.{data_match.group(3)}"
+
+                # Ensure resource RE is performed last,
+                # as this could also match module_re
+                elif resource_match:
+                    type_mapping[name] = "resource"
+                    if full_resource_names:
+                        labels[name] = name
+                    else:
+                        labels[name] = f"{resource_match.group(2)}.{resource_match.group(3)}"
+
+                    # Add cost to label, if available
+                    if name in resource_costs:
+                        labels[name] += f" (${resource_costs[name]}/year)"
+                    parents[name] = resource_match.group(1).strip(".") or "root"
+
+                # Discard any unrecognised types
+                else:
+                    remove_node(name)
+                    print("Unable to match node to type", name)
+
+        # Perform rename of nodes
+        nx_graph = nx.relabel_nodes(nx_graph, renames)
+
+        # Remove any nodes marked for removal
+        for node in to_remove:
+            nx_graph.remove_node(node)
+
+        # Convert to JSON for cytoscape
+        cytoscape_json = {
+            "nodes": [],
+            "edges": []
+        }
+
+        for node in nx_graph.nodes:
+            data = {
+                "id": node,
+                "label": labels.get(node),
+                "child_count": list(parents.values()).count(node)
+            }
+
+            style = {}
+            if type_mapping[node] == "module":
+                style = {
+                    'color': '#000000',
+                    'background-color': '#F8F7F9',
+                    'font-weight': 'bold',
+                    'text-valign': 'top',
+                }
+            # Add red outline to resources that have an associated cost
+            if node in resource_costs:
+                style['border-style'] = 'solid'
+                style['border-width'] = '2px'
+                style['border-color'] = 'red'
+
+            # Add parent if available
+            parent = parents.get(node, None)
+            if parent:
+                data["parent"] = parent
+
+            cytoscape_json["nodes"].append({
+                "data": data,
+                "style": style
+            })
+
+        # Add edges to graph
+        seen_module_links = []
+        for edge in nx_graph.edges:
+            # Only add edges for module-module links
+            if (type_mapping[edge[0]] == "module" and type_mapping[edge[1]] == "module" and
+                    # Only link modules in one direction, where module is a sub-module of another,
+                    # to avoid links in both directions
+                    edge[0] in edge[1]):
+                # Mark module as having been seen in edges
+                seen_module_links.append(edge[1])
+
+                cytoscape_json["edges"].append({
+                    "data": {
+                        "id": f"{edge[0]}.{edge[1]}",
+                        "source": edge[0],
+                        "target": edge[1]
+                    },
+                    "classes": [
+                        f"{type_mapping[edge[0]]}-{type_mapping[edge[1]]}"
+                    ]
+                })
+
+        # Iterate through all modules...
+        for module, type_mapping in type_mapping.items():
+            if type_mapping == "module":
+                # If a module link has not already been seen,
+                # add a link to root module
+                if module not in seen_module_links and module != "root":
+                    cytoscape_json["edges"].append({
+                        "data": {
+                            "id": f"root.{module}",
+                            "source": module,
+                            "target": "root"
+                        },
+                        "classes": [
+                            f"{module}-root"
+                        ]
+                    })
+
+        return cytoscape_json
+
+
+
+def main():
+    """Compare output and duration of graph JSON generation"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--modules', type=int, default=50, help='Number of module calls in generated graph')
+    parser.add_argument('--resources', type=int, default=20, help='Number of resources within each module')
+    parser.add_argument('--iterations', type=int, default=5, help='Number of iterations of each implementation')
+    args = parser.parse_args()
+
+    module_details = BenchmarkModuleDetails(generate_terraform_graph(module_count=args.modules, resource_count=args.resources))
+    print(f'Graph size: {len(module_details.terraform_graph)} bytes, {module_details.terraform_graph.count(chr(10))} lines')
+
+    # Discard output of unmatched nodes
+    with contextlib.redirect_stdout(io.StringIO()):
+        outputs = {}
+        for full_resource_names in [False, True]:
+            for full_module_names in [False, True]:
+                outputs[(full_resource_names, full_module_names)] = (
+                    module_details.legacy_generate_graph_json(full_resource_names, full_module_names),
+                    module_details.generate_graph_json(full_resource_names, full_module_names)
+                )
+
+        durations = {}
+        for name, function in [('pygraphviz/networkx', module_details.legacy_generate_graph_json),
+                               ('TerraformGraphParser', module_details.generate_graph_json)]:
+            durations[name] = min(timeit.repeat(lambda: function(False, False), number=1, repeat=args.iterations))
+
+    for (full_resource_names, full_module_names), (legacy_output, output) in outputs.items():
+        if output != legacy_output:
+            print(f'Output differs (full_resource_names={full_resource_names}, full_module_names={full_module_names})')
+            sys.exit(1)
+    print(f'Output matches: {len(output["nodes"])} nodes, {len(output["edges"])} edges')
+
+    for name, duration in durations.items():
+        print(f'{name}: {duration * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
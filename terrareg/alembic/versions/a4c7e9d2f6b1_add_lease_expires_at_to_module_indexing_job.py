@@ -0,0 +1,25 @@
+"""Add lease_expires_at column to module_indexing_job
+
+Revision ID: a4c7e9d2f6b1
+Revises: d8e4a6f1b3c2
+Create Date: 2023-10-18 20:12:43.518207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e9d2f6b1'
+down_revision = 'd8e4a6f1b3c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('module_indexing_job', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('module_indexing_job') as module_indexing_job_op:
+        module_indexing_job_op.drop_column('lease_expires_at')
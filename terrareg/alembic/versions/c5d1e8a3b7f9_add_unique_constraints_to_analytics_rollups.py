@@ -0,0 +1,75 @@
+"""Add unique constraints to analytics daily rollup tables
+
+Revision ID: c5d1e8a3b7f9
+Revises: a4c7e9d2f6b1
+Create Date: 2023-10-19 18:41:07.218354
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d1e8a3b7f9'
+down_revision = 'a4c7e9d2f6b1'
+branch_labels = None
+depends_on = None
+
+
+ROLLUP_TABLE_KEYS = {
+    'analytics_module_version_daily': ['date', 'module_version_id'],
+    'analytics_module_provider_daily': ['date', 'module_provider_id'],
+    'analytics_token_daily': ['date', 'module_version_id', 'analytics_token', 'environment', 'has_auth_token'],
+}
+
+
+def _merge_duplicate_rows(c, table_name, key_columns):
+    """Merge rows with duplicate keys into the row with the lowest ID"""
+    key_string = ', '.join(key_columns)
+    key_condition = ' AND '.join(f'{column} = :{column}' for column in key_columns)
+    duplicates = c.execute(sa.text(f"""
+        SELECT {key_string}, MIN(id) AS min_id, SUM(download_count) AS total_count
+        FROM {table_name}
+        GROUP BY {key_string}
+        HAVING COUNT(*) > 1
+    """)).fetchall()
+    for row in duplicates:
+        params = {column: row[column] for column in key_columns}
+        c.execute(sa.text(f"DELETE FROM {table_name} WHERE {key_condition} AND id != :min_id"),
+                  dict(params, min_id=row['min_id']))
+        c.execute(sa.text(f"UPDATE {table_name} SET download_count = :total_count WHERE id = :min_id"),
+                  {'total_count': row['total_count'], 'min_id': row['min_id']})
+
+
+def upgrade():
+    c = op.get_bind()
+
+    # Replace NULL analytics tokens and environments with empty strings,
+    # as NULL values are not considered equal by unique constraints
+    for column in ['analytics_token', 'environment']:
+        c.execute(sa.text(f"UPDATE analytics_token_daily SET {column} = '' WHERE {column} IS NULL"))
+
+    for table_name, key_columns in ROLLUP_TABLE_KEYS.items():
+        _merge_duplicate_rows(c, table_name, key_columns)
+
+    with op.batch_alter_table('analytics_token_daily', schema=None) as batch_op:
+        batch_op.alter_column('analytics_token', existing_type=sa.String(length=128), nullable=False, server_default='')
+        batch_op.alter_column('environment', existing_type=sa.String(length=128), nullable=False, server_default='')
+
+    for table_name, key_columns in ROLLUP_TABLE_KEYS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.create_unique_constraint(f'uq_{table_name}_key', key_columns)
+
+
+def downgrade():
+    for table_name in ROLLUP_TABLE_KEYS:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_constraint(f'uq_{table_name}_key', type_='unique')
+
+    with op.batch_alter_table('analytics_token_daily', schema=None) as batch_op:
+        batch_op.alter_column('analytics_token', existing_type=sa.String(length=128), nullable=True, server_default=None)
+        batch_op.alter_column('environment', existing_type=sa.String(length=128), nullable=True, server_default=None)
+
+    c = op.get_bind()
+    for column in ['analytics_token', 'environment']:
+        c.execute(sa.text(f"UPDATE analytics_token_daily SET {column} = NULL WHERE {column} = ''"))
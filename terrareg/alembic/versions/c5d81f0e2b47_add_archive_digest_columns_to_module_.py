@@ -0,0 +1,28 @@
+"""Add archive digest columns to module version
+
+Revision ID: c5d81f0e2b47
+Revises: a3c7e2d9f614
+Create Date: 2023-10-14 18:02:51.604219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d81f0e2b47'
+down_revision = 'a3c7e2d9f614'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("module_version") as module_version_batch:
+        module_version_batch.add_column(sa.Column('archive_sha256', sa.String(length=64), nullable=True))
+        module_version_batch.add_column(sa.Column('archive_size', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("module_version") as module_version_batch:
+        module_version_batch.drop_column('archive_size')
+        module_version_batch.drop_column('archive_sha256')
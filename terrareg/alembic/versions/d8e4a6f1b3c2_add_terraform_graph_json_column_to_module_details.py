@@ -0,0 +1,25 @@
+"""Add terraform_graph_json column to module_details
+
+Revision ID: d8e4a6f1b3c2
+Revises: c5d81f0e2b47
+Create Date: 2023-10-16 19:41:07.312845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = 'd8e4a6f1b3c2'
+down_revision = 'c5d81f0e2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('module_details', sa.Column('terraform_graph_json', sa.LargeBinary(length=16777215).with_variant(mysql.MEDIUMBLOB(), 'mysql'), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('module_details') as module_details_op:
+        module_details_op.drop_column('terraform_graph_json')
@@ -1,9 +1,17 @@
 
+import atexit
+import collections
+import queue
 import re
 import datetime
+import threading
+import time
 
 
 import sqlalchemy
+import sqlalchemy.dialects.mysql
+import sqlalchemy.dialects.postgresql
+import sqlalchemy.dialects.sqlite
 
 from terrareg.database import Database
 from terrareg.config import Config
@@ -112,9 +120,7 @@ class AnalyticsEngine:
         # If auth token is not provided, 
         environment = AnalyticsEngine.get_environment_from_token(auth_token)
 
-        # Insert analytics details into DB
-        db = Database.get()
-        insert_statement = db.analytics.insert().values(
+        analytics_values = dict(
             parent_module_version=module_version.pk,
             timestamp=AnalyticsEngine.get_datetime_now(),
             terraform_version=terraform_version,
@@ -125,16 +131,93 @@ class AnalyticsEngine:
             module_name=module_name,
             provider_name=provider_name
         )
-        with db.get_connection() as conn:
-            conn.execute(insert_statement)
+
+        # If asynchronous ingestion is enabled, add to queue,
+        # falling back to inserting directly if the queue is full
+        if Config().ANALYTICS_ASYNC_INGESTION and AnalyticsIngestionQueue.get().enqueue(analytics_values):
+            return
+
+        # Insert analytics details and update rollups in a single transaction
+        db = Database.get()
+        insert_statement = db.analytics.insert().values(**analytics_values)
+        with db.start_transaction() as transaction_context:
+            transaction_context.connection.execute(insert_statement)
+            AnalyticsEngine.update_rollups(transaction_context.connection, [analytics_values])
+
+    @staticmethod
+    def _increment_rollup(conn, table, key_columns, counts):
+        """
+        Add counts to rollup rows, creating rows that do not exist.
+
+        Counts is a mapping of tuples of key column values to the count to be added.
+        All rows are updated in a single upsert statement.
+        """
+        if not counts:
+            return
+
+        values = [
+            dict(zip(key_columns, key), download_count=count)
+            for key, count in counts.items()
+        ]
+        dialect_name = conn.dialect.name
+        if dialect_name == 'mysql':
+            statement = sqlalchemy.dialects.mysql.insert(table).values(values)
+            statement = statement.on_duplicate_key_update(
+                download_count=table.c.download_count + statement.inserted.download_count
+            )
+        else:
+            dialect = sqlalchemy.dialects.postgresql if dialect_name == 'postgresql' else sqlalchemy.dialects.sqlite
+            statement = dialect.insert(table).values(values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c[key_column] for key_column in key_columns],
+                set_={'download_count': table.c.download_count + statement.excluded.download_count}
+            )
+        conn.execute(statement)
+
+    @staticmethod
+    def update_rollups(conn, analytics_rows):
+        """Add analytics rows to daily rollups."""
+        db = Database.get()
+
+        # Obtain module provider IDs for all module versions
+        module_version_ids = set(row['parent_module_version'] for row in analytics_rows)
+        res = conn.execute(sqlalchemy.select(
+            db.module_version.c.id,
+            db.module_version.c.module_provider_id
+        ).where(
+            db.module_version.c.id.in_(module_version_ids)
+        ))
+        module_provider_ids = {row['id']: row['module_provider_id'] for row in res}
+
+        module_version_counts = collections.Counter()
+        module_provider_counts = collections.Counter()
+        token_counts = collections.Counter()
+        for row in analytics_rows:
+            date = row['timestamp'].date()
+            module_version_counts[(date, row['parent_module_version'])] += 1
+            if row['parent_module_version'] in module_provider_ids:
+                module_provider_counts[(date, module_provider_ids[row['parent_module_version']])] += 1
+            # Empty analytics tokens/environments are stored as empty strings in rollups
+            token_counts[(date, row['parent_module_version'], row['analytics_token'] or '',
+                          row['environment'] or '', row['auth_token'] is not None)] += 1
+
+        AnalyticsEngine._increment_rollup(
+            conn, db.analytics_module_version_daily,
+            ['date', 'module_version_id'], module_version_counts)
+        AnalyticsEngine._increment_rollup(
+            conn, db.analytics_module_provider_daily,
+            ['date', 'module_provider_id'], module_provider_counts)
+        AnalyticsEngine._increment_rollup(
+            conn, db.analytics_token_daily,
+            ['date', 'module_version_id', 'analytics_token', 'environment', 'has_auth_token'], token_counts)
 
     def get_total_downloads():
-        """Return number of downloads for a given module version."""
+        """Return total number of downloads."""
         db = Database.get()
         select = sqlalchemy.select(
-            [sqlalchemy.func.count()]
+            [sqlalchemy.func.coalesce(sqlalchemy.func.sum(db.analytics_module_version_daily.c.download_count), 0)]
         ).select_from(
-            db.analytics
+            db.analytics_module_version_daily
         )
         with db.get_connection() as conn:
             res = conn.execute(select)
@@ -144,18 +227,19 @@ class AnalyticsEngine:
     def get_global_module_usage_base_query(include_empty_auth_token=False):
         """Return base query for getting all analytics tokens."""
         db = Database.get()
-        # Initial query to select all analytics joined to module version and module provider
+        # Initial query to select all analytics token rollups joined to module version and module provider
         select = sqlalchemy.select(
             db.module_provider.c.id,
             db.namespace.c.namespace,
             db.module_provider.c.module,
             db.module_provider.c.provider,
-            db.analytics.c.analytics_token
+            # Convert empty analytics tokens, stored as empty strings in the rollup, to NULL
+            sqlalchemy.func.nullif(db.analytics_token_daily.c.analytics_token, '').label('analytics_token')
         ).select_from(
-            db.analytics
+            db.analytics_token_daily
         ).join(
             db.module_version,
-            db.analytics.c.parent_module_version == db.module_version.c.id
+            db.analytics_token_daily.c.module_version_id == db.module_version.c.id
         ).join(
             db.module_provider,
             db.module_version.c.module_provider_id == db.module_provider.c.id
@@ -170,12 +254,12 @@ class AnalyticsEngine:
         # Filter rows with empty auth token, if including them is not enabled
         if not include_empty_auth_token:
             select = select.where(
-                db.analytics.c.auth_token != None
+                db.analytics_token_daily.c.has_auth_token == True
             )
 
         # Group select by analytics token and module provider ID
         select = select.group_by(
-            db.analytics.c.analytics_token,
+            db.analytics_token_daily.c.analytics_token,
             db.module_provider.c.id
         )
         return select
@@ -212,14 +296,11 @@ class AnalyticsEngine:
         """Return number of downloads for a given module version."""
         db = Database.get()
         select = sqlalchemy.select(
-            [sqlalchemy.func.count()]
+            [sqlalchemy.func.coalesce(sqlalchemy.func.sum(db.analytics_module_version_daily.c.download_count), 0)]
         ).select_from(
-            db.analytics
-        ).join(
-            db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
+            db.analytics_module_version_daily
         ).where(
-            db.module_version.c.id == module_version.pk
+            db.analytics_module_version_daily.c.module_version_id == module_version.pk
         )
         with db.get_connection() as conn:
             res = conn.execute(select)
@@ -229,29 +310,37 @@ class AnalyticsEngine:
     def get_module_provider_download_stats(module_provider):
         """Return number of downloads for intervals."""
         db = Database.get()
-        stats = {}
-        for i in [(7, 'week'), (31, 'month'), (365, 'year'), (None, 'total')]:
-
-            select = sqlalchemy.select(
-                [sqlalchemy.func.count()]
-            ).select_from(
-                db.analytics
-            )
-            select = AnalyticsEngine._join_filter_analytics_table_by_module_provider(
-                db=db, query=select, module_provider=module_provider)
-
-            # If a checking a given time frame, limit by number of days
-            if i[0]:
-                from_timestamp = AnalyticsEngine.get_datetime_now() - datetime.timedelta(days=i[0])
-                select = select.where(
-                    db.analytics.c.timestamp >= from_timestamp
+        table = db.analytics_module_provider_daily
+        today = AnalyticsEngine.get_datetime_now().date()
+
+        # Obtain count for each interval in a single query,
+        # with a conditional sum for each of the time frames.
+        # Each interval includes today, e.g. a week is today and the previous 6 days
+        columns = []
+        for days, name in [(7, 'week'), (31, 'month'), (365, 'year'), (None, 'total')]:
+            download_count = table.c.download_count
+            if days:
+                download_count = sqlalchemy.case(
+                    (table.c.date > (today - datetime.timedelta(days=days)), table.c.download_count),
+                    else_=0
                 )
+            columns.append(sqlalchemy.func.coalesce(sqlalchemy.func.sum(download_count), 0).label(name))
 
-            with db.get_connection() as conn:
-                res = conn.execute(select)
-                stats[i[1]] = res.scalar()
+        select = sqlalchemy.select(
+            columns
+        ).select_from(
+            table
+        ).where(
+            table.c.module_provider_id == module_provider.pk
+        )
+
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
 
-        return stats
+        return {
+            name: row[name]
+            for name in ['week', 'month', 'year', 'total']
+        }
 
     @staticmethod
     def check_module_provider_redirect_usage(module_provider_redirect):
@@ -419,6 +508,29 @@ class AnalyticsEngine:
                 db.analytics.c.parent_module_version == module_version.pk
             ))
 
+            # Remove module version downloads from module provider rollups
+            res = conn.execute(sqlalchemy.select(
+                db.analytics_module_version_daily.c.date,
+                sqlalchemy.func.sum(db.analytics_module_version_daily.c.download_count).label('download_count')
+            ).where(
+                db.analytics_module_version_daily.c.module_version_id == module_version.pk
+            ).group_by(
+                db.analytics_module_version_daily.c.date
+            ))
+            cls._increment_rollup(
+                conn, db.analytics_module_provider_daily,
+                ['date', 'module_provider_id'],
+                {
+                    (row['date'], module_version._module_provider.pk): -row['download_count']
+                    for row in res.fetchall()
+                }
+            )
+
+            for table in [db.analytics_module_version_daily, db.analytics_token_daily]:
+                conn.execute(table.delete().where(
+                    table.c.module_version_id == module_version.pk
+                ))
+
     @classmethod
     def migrate_analytics_to_new_module_version(cls, old_version_version_pk, new_module_version):
         """Migrate all analytics for old module version ID to new module version."""
@@ -431,38 +543,169 @@ class AnalyticsEngine:
                 parent_module_version=new_module_version.pk
             ))
 
+            # Add rollup counts to any existing rows for the new module version,
+            # before removing the rollups for the old module version
+            for table, key_columns in [
+                    (db.analytics_module_version_daily, ['date', 'module_version_id']),
+                    (db.analytics_token_daily,
+                     ['date', 'module_version_id', 'analytics_token', 'environment', 'has_auth_token'])]:
+                res = conn.execute(sqlalchemy.select(
+                    *[table.c[key_column] for key_column in key_columns],
+                    table.c.download_count
+                ).where(
+                    table.c.module_version_id == old_version_version_pk
+                ))
+                counts = {}
+                for row in res.fetchall():
+                    key = dict(row)
+                    key['module_version_id'] = new_module_version.pk
+                    counts[tuple(key[key_column] for key_column in key_columns)] = row['download_count']
+                cls._increment_rollup(conn, table, key_columns, counts)
+                conn.execute(table.delete().where(
+                    table.c.module_version_id == old_version_version_pk
+                ))
+
+    @classmethod
+    def delete_analytics_for_module_provider(cls, module_provider):
+        """Delete module provider download rollups for given module provider."""
+        db = Database.get()
+
+        with db.get_connection() as conn:
+            conn.execute(db.analytics_module_provider_daily.delete().where(
+                db.analytics_module_provider_daily.c.module_provider_id == module_provider.pk
+            ))
+
+    @classmethod
+    def compact_analytics(cls):
+        """
+        Delete analytics older than the retention period, returning the number of deleted rows.
+
+        Download counts are held in the daily rollups, so are unaffected.
+        The latest analytics row for each analytics token and environment of
+        each module provider is retained, as these are used to determine the
+        versions used by each token and the usage of module provider redirects.
+        """
+        retention_days = Config().ANALYTICS_RETENTION_DAYS
+        if retention_days < 0:
+            return 0
+        batch_size = max(Config().ANALYTICS_COMPACTION_BATCH_SIZE, 1)
+        cutoff = cls.get_datetime_now() - datetime.timedelta(days=retention_days)
+
+        db = Database.get()
+        latest_id_select = sqlalchemy.select(
+            sqlalchemy.func.max(db.analytics.c.id)
+        ).select_from(
+            db.analytics
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics.c.parent_module_version
+        ).group_by(
+            db.module_version.c.module_provider_id,
+            db.analytics.c.analytics_token,
+            db.analytics.c.environment
+        )
+        with db.get_connection() as conn:
+            retained_ids = set(row[0] for row in conn.execute(latest_id_select))
+
+        # Iterate through analytics older than the cut-off in batches,
+        # deleting all rows that are not being retained
+        deleted_count = 0
+        last_id = None
+        while True:
+            select = sqlalchemy.select(
+                db.analytics.c.id
+            ).where(
+                db.analytics.c.timestamp < cutoff
+            ).order_by(
+                db.analytics.c.id
+            ).limit(batch_size)
+            if last_id is not None:
+                select = select.where(db.analytics.c.id > last_id)
+
+            with db.get_connection() as conn:
+                ids = [row['id'] for row in conn.execute(select)]
+                if not ids:
+                    break
+                last_id = ids[-1]
+
+                delete_ids = [id_ for id_ in ids if id_ not in retained_ids]
+                if delete_ids:
+                    conn.execute(db.analytics.delete().where(
+                        db.analytics.c.id.in_(delete_ids)
+                    ))
+                    deleted_count += len(delete_ids)
+
+        return deleted_count
+
     @classmethod
     def get_module_provider_version_statistics(cls):
-        """Return number of major, minor and patch releases for a module version"""
+        """
+        Return number of major, minor and patch releases across all module providers.
+
+        Published, non-beta versions of all module providers in namespaces containing
+        a published module are obtained in a single query and each version of a module
+        provider is compared to its previous version.
+        """
+        db = Database.get()
+
+        # Obtain IDs of namespaces that contain a module provider
+        # with a published latest version
+        published_namespace_select = db.select_module_provider_joined_latest_module_version(
+            db.module_provider.c.namespace_id
+        ).where(
+            db.module_version.c.published == True,
+            db.module_version.c.beta == False
+        ).correlate(None)
+
+        select = sqlalchemy.select(
+            db.module_version.c.module_provider_id,
+            db.module_version.c.version
+        ).select_from(
+            db.module_version
+        ).join(
+            db.module_provider,
+            db.module_version.c.module_provider_id == db.module_provider.c.id
+        ).where(
+            db.module_version.c.published == True,
+            db.module_version.c.beta == False,
+            db.module_provider.c.namespace_id.in_(published_namespace_select)
+        )
+
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
+
+        # Split version number by . and convert each version part to integers,
+        # grouping versions by module provider
+        provider_versions = collections.defaultdict(list)
+        for row in rows:
+            provider_versions[row['module_provider_id']].append(
+                tuple(int(v) for v in row['version'].split('.'))
+            )
+
         major_count = 0
         minor_count = 0
         patch_count = 0
-        for namespace in terrareg.models.Namespace.get_all(only_published=True).rows:
-            for module in namespace.get_all_modules():
-                for module_provider in module.get_providers():
-                    versions = module_provider.get_versions(include_beta=False, include_unpublished=False)
-                    # Reverse versions, so that the they increase in value
-                    versions.reverse()
-
-                    # Setup variable to hold previous version
-                    previous_version = None
-                    for module_version in versions:
-                        # Split version number by . and convert each version part to integers
-                        version_split = [int(v) for v in module_version.version.split('.')]
-                        # If this is the first version, count as a major release,
-                        # otherwise, check if major version has increased since last seen release
-                        if previous_version is None or version_split[0] > previous_version[0]:
-                            major_count += 1
-                        # Check if version is a minor change
-                        elif version_split[1] > previous_version[1]:
-                            minor_count += 1
-                        # Check if version is a patch change
-                        elif version_split[2] > previous_version[2]:
-                            patch_count += 1
-                        else:
-                            print('Unable to determine version change between:', previous_version, 'and', version_split)
-
-                        previous_version = version_split
+        for versions in provider_versions.values():
+            # Sort versions, so that the they increase in value
+            versions.sort()
+
+            # Setup variable to hold previous version
+            previous_version = None
+            for version_split in versions:
+                # If this is the first version, count as a major release,
+                # otherwise, check if major version has increased since last seen release
+                if previous_version is None or version_split[0] > previous_version[0]:
+                    major_count += 1
+                # Check if version is a minor change
+                elif version_split[1] > previous_version[1]:
+                    minor_count += 1
+                # Check if version is a patch change
+                elif version_split[2] > previous_version[2]:
+                    patch_count += 1
+                else:
+                    print('Unable to determine version change between:', previous_version, 'and', version_split)
+
+                previous_version = version_split
 
         # Return all 3 counts
         return major_count, minor_count, patch_count
@@ -519,9 +762,281 @@ class AnalyticsEngine:
             )
         prometheus_generator.add_metric(module_provider_usage_metric)
 
+        if Config().ANALYTICS_ASYNC_INGESTION:
+            queue_depth_metric = PrometheusMetric(
+                'analytics_ingestion_queue_depth',
+                type_='gauge',
+                help='Number of module downloads waiting to be inserted into the database'
+            )
+            queue_depth_metric.add_data_row(value=AnalyticsIngestionQueue.get().get_queue_depth())
+            prometheus_generator.add_metric(queue_depth_metric)
+
+            dropped_count_metric = PrometheusMetric(
+                'analytics_ingestion_dropped_count',
+                type_='counter',
+                help='Number of module downloads that could not be inserted into the database'
+            )
+            dropped_count_metric.add_data_row(value=AnalyticsIngestionQueue.get().get_dropped_count())
+            prometheus_generator.add_metric(dropped_count_metric)
+
         return prometheus_generator.generate()
 
 
+class AnalyticsIngestionQueue:
+    """
+    Write-behind queue for module download analytics.
+
+    Downloads are added to an in-memory queue and inserted by a background
+    worker thread, using a single multi-row INSERT per batch.
+    Batches are inserted once the queue reaches ANALYTICS_INGESTION_BATCH_SIZE
+    or after ANALYTICS_INGESTION_FLUSH_INTERVAL seconds, whichever occurs first.
+    Any remaining downloads are inserted when the application exits.
+    If a batch cannot be inserted, its downloads are inserted individually and
+    any that still fail are discarded and counted in the Prometheus metrics.
+    """
+
+    _INSTANCE = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """Return singleton instance, starting the worker on first use."""
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    instance = cls()
+                    instance.start()
+                    cls._INSTANCE = instance
+        return cls._INSTANCE
+
+    @classmethod
+    def shutdown_instance(cls):
+        """Stop worker of singleton instance, if started, inserting all queued downloads."""
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is not None:
+                cls._INSTANCE.shutdown()
+                cls._INSTANCE = None
+
+    def __init__(self):
+        """Setup member variables."""
+        config = Config()
+        self._batch_size = max(config.ANALYTICS_INGESTION_BATCH_SIZE, 1)
+        self._flush_interval = config.ANALYTICS_INGESTION_FLUSH_INTERVAL
+        self._queue = queue.Queue(maxsize=config.ANALYTICS_INGESTION_MAX_QUEUE_SIZE)
+        self._flush_lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._is_shutdown = False
+        self._thread = None
+        self._dropped_count = 0
+
+    def start(self):
+        """Start background worker thread."""
+        self._thread = threading.Thread(target=self._run, name='analytics-ingestion', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, analytics_values):
+        """
+        Add download to queue.
+
+        Returns False if the queue is full or the worker has been stopped,
+        in which case the caller should insert the download itself.
+        """
+        if self._is_shutdown:
+            return False
+        try:
+            self._queue.put_nowait(analytics_values)
+        except queue.Full:
+            return False
+
+        # Wake worker once a full batch is available
+        if self._queue.qsize() >= self._batch_size:
+            self._wake_event.set()
+        return True
+
+    def get_queue_depth(self):
+        """Return number of downloads waiting to be inserted."""
+        return self._queue.qsize()
+
+    def get_dropped_count(self):
+        """Return number of downloads that could not be inserted and were discarded."""
+        return self._dropped_count
+
+    def _get_batch(self):
+        """Remove up to a batch size of downloads from the queue."""
+        batch = []
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert_batch(self, batch):
+        """Insert batch of downloads into database."""
+        db = Database.get()
+        # Use a dedicated connection, rather than Database.get_connection,
+        # to avoid using a transaction belonging to the current thread
+        with db.get_engine().begin() as conn:
+            conn.execute(db.analytics.insert().values(batch))
+            AnalyticsEngine.update_rollups(conn, batch)
+
+    def _insert_rows_individually(self, batch):
+        """Insert each download of a failed batch separately, counting downloads that cannot be inserted."""
+        for analytics_values in batch:
+            try:
+                self._insert_batch([analytics_values])
+            except Exception as exc:
+                self._dropped_count += 1
+                print(f'Failed to insert analytics row, discarding download: {exc}')
+
+    def flush(self):
+        """Insert all queued downloads into the database."""
+        with self._flush_lock:
+            while True:
+                batch = self._get_batch()
+                if not batch:
+                    break
+                try:
+                    self._insert_batch(batch)
+                except Exception as exc:
+                    # Fall back to inserting downloads individually, so that
+                    # a single invalid download does not cause the batch to be lost
+                    print(f'Failed to insert batch of {len(batch)} analytics rows, inserting individually: {exc}')
+                    self._insert_rows_individually(batch)
+
+    def _run(self):
+        """Insert queued downloads until shutdown."""
+        while not self._is_shutdown:
+            self._wake_event.wait(timeout=self._flush_interval)
+            self._wake_event.clear()
+            self.flush()
+
+    def shutdown(self):
+        """Stop worker thread and insert all remaining downloads."""
+        self._is_shutdown = True
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+
+atexit.register(AnalyticsIngestionQueue.shutdown_instance)
+
+
+class AnalyticsCompactionWorker:
+    """Background worker, periodically removing analytics older than the retention period."""
+
+    _INSTANCE = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    @classmethod
+    def start_instance(cls):
+        """Start singleton worker, if not already running."""
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is None:
+                instance = cls()
+                instance.start()
+                cls._INSTANCE = instance
+        return cls._INSTANCE
+
+    @classmethod
+    def stop_instance(cls):
+        """Stop singleton worker, if running."""
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is not None:
+                cls._INSTANCE.stop()
+                cls._INSTANCE = None
+
+    def __init__(self):
+        """Setup member variables."""
+        self._interval = Config().ANALYTICS_COMPACTION_INTERVAL
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start background worker thread."""
+        self._thread = threading.Thread(target=self._run, name='analytics-compaction', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Compact analytics on each interval until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                deleted_count = AnalyticsEngine.compact_analytics()
+                if deleted_count:
+                    print(f'Removed {deleted_count} analytics rows older than retention period')
+            except Exception as exc:
+                print(f'Failed to compact analytics: {exc}')
+            self._stop_event.wait(timeout=self._interval)
+
+    def stop(self):
+        """Stop background worker thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class PrometheusMetricsCache:
+    """
+    Cache of generated Prometheus metrics.
+
+    Metrics are generated on first request. Once older than PROMETHEUS_METRICS_CACHE_TTL,
+    the cached metrics are returned whilst new metrics are generated in a background thread.
+    """
+
+    _LOCK = threading.Lock()
+    _METRICS = None
+    _GENERATED_AT = None
+    _REFRESH_THREAD = None
+
+    @classmethod
+    def get(cls):
+        """Return Prometheus metrics, using cached metrics if enabled."""
+        ttl = Config().PROMETHEUS_METRICS_CACHE_TTL
+        if ttl <= 0:
+            return AnalyticsEngine.get_prometheus_metrics()
+
+        if cls._METRICS is None:
+            with cls._LOCK:
+                if cls._METRICS is None:
+                    cls._update()
+        elif time.monotonic() - cls._GENERATED_AT >= ttl:
+            cls._start_refresh()
+
+        return cls._METRICS
+
+    @classmethod
+    def reset(cls):
+        """Remove cached metrics."""
+        with cls._LOCK:
+            cls._METRICS = None
+            cls._GENERATED_AT = None
+
+    @classmethod
+    def _update(cls):
+        """Generate metrics and store in cache."""
+        metrics = AnalyticsEngine.get_prometheus_metrics()
+        cls._METRICS = metrics
+        cls._GENERATED_AT = time.monotonic()
+
+    @classmethod
+    def _refresh(cls):
+        """Regenerate metrics, handling errors."""
+        try:
+            cls._update()
+        except Exception as exc:
+            print(f'Failed to generate Prometheus metrics: {exc}')
+
+    @classmethod
+    def _start_refresh(cls):
+        """Start background regeneration of metrics, if not already running."""
+        with cls._LOCK:
+            if cls._REFRESH_THREAD is not None and cls._REFRESH_THREAD.is_alive():
+                return
+            cls._REFRESH_THREAD = threading.Thread(target=cls._refresh, name='prometheus-metrics-refresh', daemon=True)
+            cls._REFRESH_THREAD.start()
+
+
 class PrometheusMetric:
     """Prometheus metric"""
 
@@ -0,0 +1,207 @@
+"""Provide storage backends for module version archives."""
+
+from contextlib import contextmanager
+import os
+import tempfile
+import threading
+
+from terrareg.config import Config, ArtifactStorageBackend
+from terrareg.errors import ArtifactStorageNotConfiguredError
+from terrareg.utils import safe_join_paths
+
+
+class BaseArtifactStorage:
+    """
+    Storage backend for artifacts, identified by keys relative
+    to the root of the storage, e.g. modules/<namespace>/<module>/<provider>/<version>/source.zip
+    """
+
+    @staticmethod
+    def get():
+        """Return storage backend for configured backend type"""
+        if Config().ARTIFACT_STORAGE_BACKEND is ArtifactStorageBackend.S3:
+            return S3ArtifactStorage()
+        return LocalArtifactStorage()
+
+    @contextmanager
+    def write_path(self, key):
+        """
+        Yield local path that artifact should be written to.
+
+        The artifact is stored once the context manager exits.
+        """
+        raise NotImplementedError
+
+    def exists(self, key):
+        """Return whether artifact exists"""
+        raise NotImplementedError
+
+    def get_local_path(self, key):
+        """Return local path of artifact, if it is stored on the local filesystem."""
+        return None
+
+    def get_download_url(self, key):
+        """Return URL that clients can be redirected to, to download artifact, if supported by backend."""
+        return None
+
+    def open(self, key):
+        """Return binary file object for reading artifact, or None if it does not exist."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Delete artifact, if it exists."""
+        raise NotImplementedError
+
+    def delete_directory(self, key):
+        """Delete empty directory containing artifacts, if the backend has directories."""
+        pass
+
+
+class LocalArtifactStorage(BaseArtifactStorage):
+    """Store artifacts in data directory"""
+
+    def _get_path(self, key):
+        """Return path of artifact"""
+        return safe_join_paths(Config().DATA_DIRECTORY, key)
+
+    @contextmanager
+    def write_path(self, key):
+        """Yield path of artifact in data directory, creating parent directories."""
+        path = self._get_path(key)
+
+        # Create parent directories.
+        # These should have been created during namespace, module, version creation,
+        # however, in situations where the users do not use/care about generated archives
+        # and DELETE_EXTERNALLY_HOSTED_ARTIFACTS has not been disabled and
+        # the data directory has not been mounted outside of ephemeral storage,
+        # the parent directories may have been lost
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        yield path
+
+    def exists(self, key):
+        """Return whether artifact exists"""
+        return os.path.isfile(self._get_path(key))
+
+    def get_local_path(self, key):
+        """Return path of artifact"""
+        return self._get_path(key)
+
+    def open(self, key):
+        """Open artifact for reading"""
+        path = self._get_path(key)
+        if not os.path.isfile(path):
+            return None
+        return open(path, 'rb')
+
+    def delete(self, key):
+        """Delete artifact file"""
+        path = self._get_path(key)
+        if os.path.isfile(path):
+            os.unlink(path)
+
+    def delete_directory(self, key):
+        """Delete directory, if it exists"""
+        path = self._get_path(key)
+        if os.path.isdir(path):
+            try:
+                os.rmdir(path)
+            except OSError as exc:
+                # Handle OSError which can be caused when
+                # files that are not managed by Terrareg
+                # exist in the module version data directory.
+                # This is safer than forcefully deleting
+                # all data in the directory and should not happen
+                # during normal conditions
+                print(f'An error occured when attempting to remove module provider directory: {str(exc)}')
+
+
+class S3ArtifactStorage(BaseArtifactStorage):
+    """Store artifacts in S3-compatible bucket"""
+
+    _CLIENTS = {}
+    _CLIENTS_LOCK = threading.Lock()
+
+    @classmethod
+    def _get_client(cls):
+        """Return S3 client, re-using clients across threads, as they are thread-safe."""
+        config = Config()
+        client_key = (config.S3_ARTIFACT_ENDPOINT_URL, config.S3_ARTIFACT_REGION)
+        with cls._CLIENTS_LOCK:
+            if client_key not in cls._CLIENTS:
+                try:
+                    import boto3
+                except ImportError:
+                    raise ArtifactStorageNotConfiguredError('boto3 must be installed to use S3 artifact storage')
+
+                cls._CLIENTS[client_key] = boto3.client(
+                    's3',
+                    endpoint_url=config.S3_ARTIFACT_ENDPOINT_URL or None,
+                    region_name=config.S3_ARTIFACT_REGION or None
+                )
+            return cls._CLIENTS[client_key]
+
+    def __init__(self):
+        """Store member variables."""
+        config = Config()
+        if not config.S3_ARTIFACT_BUCKET:
+            raise ArtifactStorageNotConfiguredError('S3_ARTIFACT_BUCKET must be set to use S3 artifact storage')
+        self._bucket = config.S3_ARTIFACT_BUCKET
+        self._prefix = config.S3_ARTIFACT_PREFIX
+
+    def _get_object_key(self, key):
+        """Return key of object in bucket"""
+        return f'{self._prefix}{key}'
+
+    @staticmethod
+    def _is_not_found_error(exc):
+        """Return whether client error is due to non-existent object"""
+        response = getattr(exc, 'response', None) or {}
+        return response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    @contextmanager
+    def write_path(self, key):
+        """Yield path in temporary directory, uploading file to bucket on exit."""
+        with tempfile.TemporaryDirectory() as temp_directory:
+            path = os.path.join(temp_directory, os.path.basename(key))
+            yield path
+
+            if os.path.isfile(path):
+                # Upload using file object, which is streamed
+                # to the bucket using multipart uploads
+                with open(path, 'rb') as fh:
+                    self._get_client().upload_fileobj(fh, self._bucket, self._get_object_key(key))
+
+    def exists(self, key):
+        """Return whether object exists in bucket"""
+        try:
+            self._get_client().head_object(Bucket=self._bucket, Key=self._get_object_key(key))
+        except Exception as exc:
+            if self._is_not_found_error(exc):
+                return False
+            raise
+        return True
+
+    def get_download_url(self, key):
+        """Return presigned URL of object, if presigned redirects are enabled."""
+        config = Config()
+        if not config.S3_ARTIFACT_PRESIGNED_REDIRECT:
+            return None
+        return self._get_client().generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self._bucket, 'Key': self._get_object_key(key)},
+            ExpiresIn=config.S3_ARTIFACT_PRESIGNED_URL_EXPIRY
+        )
+
+    def open(self, key):
+        """Return streaming body of object"""
+        try:
+            response = self._get_client().get_object(Bucket=self._bucket, Key=self._get_object_key(key))
+        except Exception as exc:
+            if self._is_not_found_error(exc):
+                return None
+            raise
+        return response['Body']
+
+    def delete(self, key):
+        """Delete object from bucket"""
+        self._get_client().delete_object(Bucket=self._bucket, Key=self._get_object_key(key))
@@ -0,0 +1,43 @@
+
+from .base_auth_method import BaseAuthMethod
+
+
+class ModuleIndexingJobAuthMethod(BaseAuthMethod):
+    """
+    Auth method for background module indexing jobs.
+
+    This is never determined from a request and is set
+    by the indexing job worker, so that actions performed
+    by the job are attributed to the user that queued the job.
+    """
+
+    def __init__(self, username=None):
+        """Store username of user that queued the job."""
+        self._username = username
+
+    @property
+    def requires_csrf_tokens(self):
+        """Whether auth type requires CSRF tokens"""
+        return False
+
+    @classmethod
+    def is_enabled(cls):
+        """Not enabled for determining auth from requests"""
+        return False
+
+    @classmethod
+    def check_auth_state(cls):
+        """Never authenticated via a request"""
+        return False
+
+    def check_namespace_access(self, permission_type, namespace):
+        """Indexing jobs have no namespace access."""
+        return False
+
+    def get_username(self):
+        """Return username of user that queued the job"""
+        return self._username if self._username else 'Module indexing job'
+
+    def can_access_read_api(self):
+        """Indexing jobs do not access APIs"""
+        return False
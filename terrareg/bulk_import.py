@@ -0,0 +1,104 @@
+"""
+Import all versions of a module provider from git tags.
+
+Usage: python -m terrareg.bulk_import <namespace>/<module>/<provider> [--concurrency N] [--queue-only]
+"""
+
+from argparse import ArgumentParser
+import os
+import sys
+
+from flask import Flask, g
+
+import terrareg.auth
+import terrareg.config
+import terrareg.database
+import terrareg.errors
+import terrareg.models
+import terrareg.module_indexing_job
+import terrareg.module_provider_bulk_import
+
+
+def print_progress(job, completed, total):
+    """Print progress of bulk import"""
+    message = f'[{completed}/{total}] {job.version}: {job.status.value}'
+    if job.error:
+        message += f' ({job.error})'
+    print(message)
+
+
+def create_app():
+    """
+    Create flask app for indexing module versions, initialising the database and data directories.
+
+    Unlike the server, no background workers are started, so
+    that jobs are only processed by the bulk import.
+    """
+    os.makedirs(os.path.join(terrareg.config.Config().DATA_DIRECTORY, 'modules'), exist_ok=True)
+
+    terrareg.database.Database.get().initialise()
+    terrareg.models.GitProvider.initialise_from_config()
+
+    return Flask(__name__)
+
+
+def main(argv=None):
+    """Run bulk import of module provider"""
+    parser = ArgumentParser('terrareg.bulk_import')
+    parser.add_argument('module_provider', help='Module provider to import, in the format namespace/module/provider')
+    parser.add_argument('--concurrency', dest='concurrency', type=int,
+                        default=terrareg.config.Config().MODULE_BULK_IMPORT_CONCURRENCY,
+                        help='Maximum number of module versions to index concurrently')
+    parser.add_argument('--queue-only', dest='queue_only', action='store_true',
+                        help='Only create indexing jobs, to be processed by background workers')
+    args = parser.parse_args(argv)
+
+    if args.module_provider.count('/') != 2:
+        parser.error('module_provider must be in the format namespace/module/provider')
+    namespace_name, module_name, provider_name = args.module_provider.split('/')
+
+    app = create_app()
+    with app.app_context():
+        # Attribute created module versions to bulk import in audit history
+        setattr(g, terrareg.auth.AuthFactory.FLASK_GLOBALS_AUTH_KEY,
+                terrareg.auth.ModuleIndexingJobAuthMethod(username='Bulk import'))
+
+        namespace = terrareg.models.Namespace.get(namespace_name)
+        module_provider = None
+        if namespace:
+            module_provider = terrareg.models.ModuleProvider.get(
+                module=terrareg.models.Module(namespace=namespace, name=module_name),
+                name=provider_name
+            )
+        if module_provider is None:
+            print(f'Module provider does not exist: {args.module_provider}')
+            return 1
+
+        bulk_import = terrareg.module_provider_bulk_import.ModuleProviderBulkImport(
+            module_provider=module_provider,
+            app=app,
+            concurrency=args.concurrency,
+            progress_callback=print_progress
+        )
+        try:
+            jobs = bulk_import.queue()
+        except terrareg.errors.TerraregError as exc:
+            print(str(exc))
+            return 1
+
+        print(f'Queued {len(jobs)} module versions for import')
+        if args.queue_only or not jobs:
+            return 0
+
+        jobs = bulk_import.run(jobs)
+        failed_versions = [
+            job.version for job in jobs
+            if job.status is not terrareg.module_indexing_job.ModuleIndexingJobStatus.SUCCEEDED
+        ]
+        if failed_versions:
+            print(f'Failed to import versions: {", ".join(failed_versions)}')
+            return 1
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
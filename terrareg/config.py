@@ -18,6 +18,25 @@ class ServerType(Enum):
     WAITRESS = "waitress"
 
 
+class ModuleSearchBackend(Enum):
+    """Backend used for module search"""
+    DATABASE = "database"
+    MEMORY = "memory"
+
+
+class ArtifactStorageBackend(Enum):
+    """Backend used to store module version archives"""
+    LOCAL = "local"
+    S3 = "s3"
+
+
+class SourceDownloadOffloadMode(Enum):
+    """Method used to offload serving of module version archives to a fronting web server"""
+    NONE = "none"
+    X_ACCEL_REDIRECT = "x-accel-redirect"
+    X_SENDFILE = "x-sendfile"
+
+
 class Config:
 
     @property
@@ -98,6 +117,102 @@ class Config:
         """
         return os.path.join(os.environ.get('DATA_DIRECTORY', os.getcwd()), 'data')
 
+    @property
+    def ARTIFACT_STORAGE_BACKEND(self):
+        """
+        Backend used to store archives of module versions hosted by Terrareg.
+
+        This can be set to one of:
+         * 'local' - Archives are stored in the `DATA_DIRECTORY`, which must be shared between all instances of Terrareg.
+         * 's3' - Archives are stored in an S3-compatible bucket, configured by `S3_ARTIFACT_BUCKET`. Requires the `boto3` package to be installed.
+
+        When using 's3', credentials are obtained using the default boto3 credential chain (e.g. `AWS_ACCESS_KEY_ID`/`AWS_SECRET_ACCESS_KEY` environment variables or an instance role).
+        """
+        return ArtifactStorageBackend(os.environ.get('ARTIFACT_STORAGE_BACKEND', 'local'))
+
+    @property
+    def S3_ARTIFACT_BUCKET(self):
+        """
+        Name of S3 bucket used to store module version archives, when `ARTIFACT_STORAGE_BACKEND` is set to 's3'.
+        """
+        return os.environ.get('S3_ARTIFACT_BUCKET', '')
+
+    @property
+    def S3_ARTIFACT_PREFIX(self):
+        """
+        Prefix of keys of module version archives stored in the S3 bucket.
+        """
+        return os.environ.get('S3_ARTIFACT_PREFIX', '')
+
+    @property
+    def S3_ARTIFACT_ENDPOINT_URL(self):
+        """
+        Endpoint URL of S3-compatible storage (e.g. `http://minio:9000`).
+
+        If not set, the default AWS S3 endpoint is used.
+        """
+        return os.environ.get('S3_ARTIFACT_ENDPOINT_URL', '')
+
+    @property
+    def S3_ARTIFACT_REGION(self):
+        """
+        Region of the S3 bucket used to store module version archives.
+
+        If not set, the region is obtained from the default boto3 configuration.
+        """
+        return os.environ.get('S3_ARTIFACT_REGION', '')
+
+    @property
+    def S3_ARTIFACT_PRESIGNED_REDIRECT(self):
+        """
+        Whether source downloads of module versions stored in S3 redirect to a presigned URL of the archive.
+
+        When disabled, archives are streamed from S3 through Terrareg.
+        """
+        return self.convert_boolean(os.environ.get('S3_ARTIFACT_PRESIGNED_REDIRECT', 'True'))
+
+    @property
+    def S3_ARTIFACT_PRESIGNED_URL_EXPIRY(self):
+        """
+        Time in seconds that presigned URLs of archives stored in S3 are valid for.
+        """
+        return int(os.environ.get('S3_ARTIFACT_PRESIGNED_URL_EXPIRY', '300'))
+
+    @property
+    def SOURCE_DOWNLOAD_OFFLOAD_MODE(self):
+        """
+        Method used to offload serving of module version archives, stored in the `DATA_DIRECTORY`, to a fronting web server.
+
+        When enabled, Terrareg performs authentication and conditional request handling and returns an empty response
+        containing a header that instructs the web server to serve the archive directly from disk (using sendfile),
+        which avoids archive content passing through Terrareg.
+
+        This can be set to one of:
+         * 'none' - Archives are served by Terrareg.
+         * 'x-accel-redirect' - Sets `X-Accel-Redirect` header, for use with nginx. The value is the path of the archive, relative to the `DATA_DIRECTORY`, prefixed with `SOURCE_DOWNLOAD_X_ACCEL_REDIRECT_LOCATION`.
+         * 'x-sendfile' - Sets `X-Sendfile` header to the absolute path of the archive, for use with Apache (mod_xsendfile) or lighttpd. The web server must have access to the `DATA_DIRECTORY`.
+
+        This must only be enabled when Terrareg is accessed through a web server that supports the header,
+        otherwise empty archives will be returned to users.
+        Note: Traefik does not support either header.
+        """
+        return SourceDownloadOffloadMode(os.environ.get('SOURCE_DOWNLOAD_OFFLOAD_MODE', 'none'))
+
+    @property
+    def SOURCE_DOWNLOAD_X_ACCEL_REDIRECT_LOCATION(self):
+        """
+        Internal nginx location that maps to the `DATA_DIRECTORY`, used when `SOURCE_DOWNLOAD_OFFLOAD_MODE` is set to 'x-accel-redirect'.
+
+        For example, with the default value, nginx should be configured with:
+        ```
+        location /_terrareg_data/ {
+            internal;
+            alias /app/data/;
+        }
+        ```
+        """
+        return os.environ.get('SOURCE_DOWNLOAD_X_ACCEL_REDIRECT_LOCATION', '/_terrareg_data/')
+
     @property
     def DATABASE_URL(self):
         """
@@ -173,6 +288,97 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('DISABLE_ANALYTICS', 'False'))
 
+    @property
+    def ANALYTICS_ASYNC_INGESTION(self):
+        """
+        Whether module download analytics are recorded asynchronously.
+
+        When enabled, module downloads are added to an in-memory queue and
+        inserted into the database in batches by a background worker,
+        rather than being inserted during the download request.
+
+        Queued analytics are inserted when the application is shut down,
+        but may be lost if the application is terminated abruptly.
+
+        If a batch fails to insert, its downloads are inserted individually.
+        Downloads that still cannot be inserted are discarded and counted by the
+        `analytics_ingestion_dropped_count` Prometheus metric.
+
+        See `ANALYTICS_INGESTION_BATCH_SIZE`, `ANALYTICS_INGESTION_FLUSH_INTERVAL` and `ANALYTICS_INGESTION_MAX_QUEUE_SIZE`.
+        """
+        return self.convert_boolean(os.environ.get('ANALYTICS_ASYNC_INGESTION', 'False'))
+
+    @property
+    def ANALYTICS_INGESTION_BATCH_SIZE(self):
+        """
+        Maximum number of queued module downloads inserted into the database in a single statement,
+        when `ANALYTICS_ASYNC_INGESTION` is enabled.
+
+        Once the queue contains this many downloads, they are inserted immediately.
+        """
+        return int(os.environ.get('ANALYTICS_INGESTION_BATCH_SIZE', '100'))
+
+    @property
+    def ANALYTICS_INGESTION_FLUSH_INTERVAL(self):
+        """
+        Maximum time, in seconds, that module downloads are queued before being inserted into the database,
+        when `ANALYTICS_ASYNC_INGESTION` is enabled.
+        """
+        return float(os.environ.get('ANALYTICS_INGESTION_FLUSH_INTERVAL', '5'))
+
+    @property
+    def ANALYTICS_INGESTION_MAX_QUEUE_SIZE(self):
+        """
+        Maximum number of module downloads held in the queue,
+        when `ANALYTICS_ASYNC_INGESTION` is enabled.
+
+        If the queue is full, module downloads are inserted into the database during the download request.
+        """
+        return int(os.environ.get('ANALYTICS_INGESTION_MAX_QUEUE_SIZE', '10000'))
+
+    @property
+    def ANALYTICS_RETENTION_DAYS(self):
+        """
+        Number of days that individual module download analytics are retained for.
+
+        Download counts are stored in daily summaries, which are not removed,
+        and the latest download for each analytics token/environment of each module provider
+        is always retained, so that the versions used by each analytics token and
+        redirect usage can still be determined.
+
+        All other module download analytics older than this number of days are periodically deleted by the server.
+
+        Value of `-1` disables the removal of analytics.
+        """
+        return int(os.environ.get('ANALYTICS_RETENTION_DAYS', '-1'))
+
+    @property
+    def ANALYTICS_COMPACTION_INTERVAL(self):
+        """
+        Interval, in seconds, between removing module download analytics older than `ANALYTICS_RETENTION_DAYS`.
+        """
+        return int(os.environ.get('ANALYTICS_COMPACTION_INTERVAL', '3600'))
+
+    @property
+    def ANALYTICS_COMPACTION_BATCH_SIZE(self):
+        """
+        Maximum number of module download analytics removed in a single statement,
+        when removing analytics older than `ANALYTICS_RETENTION_DAYS`.
+        """
+        return int(os.environ.get('ANALYTICS_COMPACTION_BATCH_SIZE', '1000'))
+
+    @property
+    def PROMETHEUS_METRICS_CACHE_TTL(self):
+        """
+        Number of seconds that generated Prometheus metrics are cached for.
+
+        Once cached metrics are older than this, the cached metrics continue to be
+        returned whilst they are regenerated in the background.
+
+        Value of `0` disables caching and metrics are generated for each request.
+        """
+        return int(os.environ.get('PROMETHEUS_METRICS_CACHE_TTL', '60'))
+
     @property
     def ALLOW_FORCEFUL_MODULE_PROVIDER_REDIRECT_DELETION(self):
         """
@@ -411,6 +617,19 @@ class Config:
         """
         return ModuleVersionReindexMode(os.environ.get('MODULE_VERSION_REINDEX_MODE', 'legacy'))
 
+    @property
+    def MODULE_SEARCH_BACKEND(self):
+        """
+        Backend used to perform module searches and to calculate search filter counts.
+
+        This can be set to one of:
+         * 'database' - Searches are performed using queries against the database.
+         * 'memory' - An in-memory index of module providers is built at application startup and updated as modules are published, renamed and deleted. Searches and search filter counts are calculated from the index, only querying the database for details of the returned page of results.
+
+        The 'memory' backend must only be used when a single instance of Terrareg is running against the database, as the index is only updated with changes made by the running instance.
+        """
+        return ModuleSearchBackend(os.environ.get('MODULE_SEARCH_BACKEND', 'database'))
+
     @property
     def AUTO_CREATE_MODULE_PROVIDER(self):
         """
@@ -455,6 +674,179 @@ class Config:
         """
         return os.environ.get('EXAMPLES_DIRECTORY', 'examples')
 
+    @property
+    def MODULE_EXTRACTION_PARALLELISM(self):
+        """
+        Maximum number of submodules and examples that are analysed concurrently when indexing a module version.
+
+        When greater than `1`, each worker analyses submodules/examples within its own copy of the module source,
+        and the results are stored once all analysis has completed.
+        `terraform init` is run by one worker at a time, as the Terraform plugin cache is shared between workers.
+
+        Value of `1` analyses submodules and examples sequentially.
+        """
+        return int(os.environ.get('MODULE_EXTRACTION_PARALLELISM', '1'))
+
+    @property
+    def MODULE_ARCHIVE_FORMATS(self):
+        """
+        Comma-separated list of archive formats generated for module versions hosted by Terrareg.
+
+        Supported formats are `zip` and `tar.gz`.
+        Only the `zip` archive is served by the module source download endpoint,
+        so `tar.gz` can be removed to reduce the time and disk space used when indexing module versions.
+
+        Archives are not generated when `DELETE_EXTERNALLY_HOSTED_ARTIFACTS` is enabled and the module version has a git clone URL.
+        """
+        return [
+            archive_format
+            for archive_format in os.environ.get('MODULE_ARCHIVE_FORMATS', 'zip,tar.gz').split(',')
+            if archive_format
+        ]
+
+    @property
+    def MODULE_ARCHIVE_COMPRESSION_LEVEL(self):
+        """
+        Compression level (0-9) used when generating module version archives.
+
+        Lower values reduce the CPU time taken to generate archives, at the cost of larger archives.
+        """
+        return int(os.environ.get('MODULE_ARCHIVE_COMPRESSION_LEVEL', '6'))
+
+    @property
+    def MODULE_BULK_IMPORT_CONCURRENCY(self):
+        """
+        Maximum number of module versions that are indexed concurrently when importing all git tags of a module provider
+        using the bulk import endpoint or `python -m terrareg.bulk_import`.
+
+        The bulk import endpoint responds once the module versions have been queued, with the IDs of the indexing jobs,
+        and the module versions are indexed in the background.
+        When `MODULE_INDEXING_JOB_QUEUE` is enabled, the endpoint leaves the module versions to be indexed by the queue workers
+        and the concurrency is determined by `MODULE_INDEXING_JOB_WORKERS`.
+        """
+        return int(os.environ.get('MODULE_BULK_IMPORT_CONCURRENCY', '2'))
+
+    @property
+    def MODULE_EXTRACTION_CACHE(self):
+        """
+        Whether to cache the results of analysing modules, submodules and examples during indexing.
+
+        Results are keyed by the content of the analysed directory (and any local modules that it references),
+        the versions of terraform-docs, tfsec, Infracost and Terraform, and the extraction configuration.
+        When re-indexing a module version, or indexing modules containing identical submodules/examples,
+        the previous results are used rather than re-running the analysis.
+
+        Terraform graph, modules and version results are not cached for directories that use remote modules,
+        as these may change without the module changing.
+
+        Results are stored in an `extraction-cache` directory within the `DATA_DIRECTORY`, which can be safely removed at any time.
+        """
+        return self.convert_boolean(os.environ.get('MODULE_EXTRACTION_CACHE', 'False'))
+
+    @property
+    def MODULE_EXTRACTION_CACHE_MAX_AGE(self):
+        """
+        Number of days that cached analysis results are used for, when `MODULE_EXTRACTION_CACHE` is enabled.
+
+        This ensures that results that depend on external data, such as Infracost pricing, are periodically regenerated.
+
+        Value of `0` disables expiry of cached results.
+        """
+        return int(os.environ.get('MODULE_EXTRACTION_CACHE_MAX_AGE', '30'))
+
+    @property
+    def README_HTML_CACHE(self):
+        """
+        Whether to cache the HTML rendered from READMEs of modules, submodules and examples.
+
+        Rendered HTML is keyed by the module version extraction, the hostname used to access Terrareg
+        and the attributes of the module version that affect example sources within the README
+        (such as whether it is the latest version), so cached HTML is not used once these change.
+
+        Entries are stored in a `readme-html-cache` directory within the `DATA_DIRECTORY`, which can be safely removed at any time,
+        with recently used entries held in memory (see `README_HTML_CACHE_MEMORY_ENTRIES`).
+        Entries are only stored in the `DATA_DIRECTORY` when `PUBLIC_URL` or `DOMAIN_NAME` is configured,
+        as otherwise the README depends on the hostname provided by each request.
+        """
+        return self.convert_boolean(os.environ.get('README_HTML_CACHE', 'False'))
+
+    @property
+    def README_HTML_CACHE_MEMORY_ENTRIES(self):
+        """
+        Maximum number of rendered READMEs held in memory by each Terrareg process, when `README_HTML_CACHE` is enabled.
+
+        Value of `0` disables in-memory caching, using only the cache in the `DATA_DIRECTORY`.
+        """
+        return int(os.environ.get('README_HTML_CACHE_MEMORY_ENTRIES', '256'))
+
+    @property
+    def MODULE_SPECS_CACHE_SIZE(self):
+        """
+        Maximum size (in megabytes) of parsed terraform-docs output held in memory by each Terrareg process.
+
+        Parsed inputs, outputs, providers and resources of modules, submodules and examples are shared between requests,
+        avoiding re-parsing the stored terraform-docs output for each request.
+        Least recently used entries are removed once the total size of the terraform-docs output for cached entries exceeds this limit.
+
+        Value of `0` disables the cache.
+        """
+        return int(os.environ.get('MODULE_SPECS_CACHE_SIZE', '64'))
+
+    @property
+    def MODULE_INDEXING_JOB_QUEUE(self):
+        """
+        Whether module versions indexed via the module import API and git provider hooks are queued for indexing by background workers.
+
+        When enabled, these endpoints respond with a `202` status and the ID of the indexing job, rather than waiting for
+        the module version to be extracted.
+        The status of the job can be obtained using the `/v1/terrareg/module_indexing_jobs/<job_id>` endpoint.
+        """
+        return self.convert_boolean(os.environ.get('MODULE_INDEXING_JOB_QUEUE', 'False'))
+
+    @property
+    def MODULE_INDEXING_JOB_WORKERS(self):
+        """
+        Number of background workers, started by each instance of Terrareg, that process queued module indexing jobs.
+
+        Jobs are stored in the database, so indexing can be scaled independently of web workers, by running
+        instances with a larger number of workers.
+
+        Value of `0` disables processing of jobs by the instance.
+
+        This is only used when `MODULE_INDEXING_JOB_QUEUE` is enabled.
+        """
+        return int(os.environ.get('MODULE_INDEXING_JOB_WORKERS', '1'))
+
+    @property
+    def MODULE_INDEXING_JOB_MAX_ATTEMPTS(self):
+        """
+        Maximum number of attempts made to index a module version from a queued indexing job, before the job is marked as failed.
+
+        Only errors that may be transient, such as failures to clone the repository, are retried.
+        Other errors, such as invalid module metadata, cause the job to be marked as failed on the first attempt.
+        """
+        return int(os.environ.get('MODULE_INDEXING_JOB_MAX_ATTEMPTS', '3'))
+
+    @property
+    def MODULE_INDEXING_JOB_RETRY_DELAY(self):
+        """
+        Number of seconds to wait before retrying a failed module indexing job.
+
+        The delay is doubled for each subsequent attempt.
+        """
+        return int(os.environ.get('MODULE_INDEXING_JOB_RETRY_DELAY', '60'))
+
+    @property
+    def MODULE_INDEXING_JOB_LEASE_DURATION(self):
+        """
+        Number of seconds that a module indexing job is leased to the worker processing it.
+
+        The lease is renewed whilst the job is being processed.
+        If the worker stops without completing the job (e.g. the instance is restarted), the job
+        is claimed by another worker once the lease has expired.
+        """
+        return int(os.environ.get('MODULE_INDEXING_JOB_LEASE_DURATION', '300'))
+
     @property
     def GIT_CLONE_TIMEOUT(self):
         """
@@ -467,6 +859,30 @@ class Config:
         val = os.environ.get('GIT_CLONE_TIMEOUT', '300')
         return None if val is None else int(val)
 
+    @property
+    def GIT_MIRROR_CACHE_DIRECTORY(self):
+        """
+        Directory for storing local bare mirrors of module git repositories.
+
+        When set, each repository is mirrored once and updated by fetching changes,
+        with each module version cloned from the local mirror, rather than cloning the repository
+        from the remote for every module version that is indexed.
+
+        This should be local storage and does not need to be persistent.
+
+        Leave empty to disable the mirror cache.
+        """
+        return os.environ.get('GIT_MIRROR_CACHE_DIRECTORY', '')
+
+    @property
+    def GIT_MIRROR_CACHE_MAX_SIZE(self):
+        """
+        Maximum total size, in MB, of git mirrors stored in `GIT_MIRROR_CACHE_DIRECTORY`.
+
+        Once exceeded, the least recently used mirrors are removed.
+        """
+        return int(os.environ.get('GIT_MIRROR_CACHE_MAX_SIZE', '10240'))
+
     @property
     def GIT_PROVIDER_CONFIG(self):
         """
@@ -1,5 +1,7 @@
 """Provide database class."""
 
+import threading
+
 import sqlalchemy
 import sqlalchemy.dialects.mysql
 
@@ -61,9 +63,36 @@ class Database():
         self._module_version = None
         self._sub_module = None
         self._analytics = None
+        self._analytics_module_version_daily = None
+        self._analytics_module_provider_daily = None
+        self._analytics_token_daily = None
         self._example_file = None
         self._module_version_file = None
-        self.transaction_connection = None
+        self._module_search_trigram = None
+        self._module_indexing_job = None
+        # Transactions started outside of a request context
+        # are only used by the thread that started them
+        self._thread_local = threading.local()
+
+    @property
+    def transaction_connection(self):
+        """Return connection of transaction started by current thread outside of request context."""
+        return getattr(self._thread_local, 'transaction_connection', None)
+
+    @transaction_connection.setter
+    def transaction_connection(self, value):
+        """Set connection of transaction for current thread."""
+        self._thread_local.transaction_connection = value
+
+    @property
+    def transaction_context(self):
+        """Return transaction started by current thread outside of request context."""
+        return getattr(self._thread_local, 'transaction_context', None)
+
+    @transaction_context.setter
+    def transaction_context(self, value):
+        """Set transaction for current thread."""
+        self._thread_local.transaction_context = value
 
     @property
     def session(self):
@@ -170,6 +199,27 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._analytics
 
+    @property
+    def analytics_module_version_daily(self):
+        """Return daily analytics rollup table for module versions."""
+        if self._analytics_module_version_daily is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._analytics_module_version_daily
+
+    @property
+    def analytics_module_provider_daily(self):
+        """Return daily analytics rollup table for module providers."""
+        if self._analytics_module_provider_daily is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._analytics_module_provider_daily
+
+    @property
+    def analytics_token_daily(self):
+        """Return daily analytics rollup table for analytics tokens."""
+        if self._analytics_token_daily is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._analytics_token_daily
+
     @property
     def example_file(self):
         """Return analytics table."""
@@ -184,6 +234,20 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._module_version_file
 
+    @property
+    def module_search_trigram(self):
+        """Return module search trigram table."""
+        if self._module_search_trigram is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._module_search_trigram
+
+    @property
+    def module_indexing_job(self):
+        """Return module indexing job table."""
+        if self._module_indexing_job is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._module_indexing_job
+
     @property
     def audit_history(self):
         """Audit history table."""
@@ -405,7 +469,9 @@ class Database():
             sqlalchemy.Column('infracost', Database.medium_blob()),
             sqlalchemy.Column('terraform_graph', Database.medium_blob()),
             sqlalchemy.Column('terraform_modules', Database.medium_blob()),
-            sqlalchemy.Column('terraform_version', Database.medium_blob())
+            sqlalchemy.Column('terraform_version', Database.medium_blob()),
+            # Pre-computed graph JSON, for each combination of graph label options
+            sqlalchemy.Column('terraform_graph_json', Database.medium_blob())
         )
 
         self._module_version = sqlalchemy.Table(
@@ -442,7 +508,10 @@ class Database():
             sqlalchemy.Column('variable_template', Database.medium_blob()),
             sqlalchemy.Column('internal', sqlalchemy.Boolean, nullable=False),
             sqlalchemy.Column('published', sqlalchemy.Boolean),
-            sqlalchemy.Column('extraction_version', sqlalchemy.Integer)
+            sqlalchemy.Column('extraction_version', sqlalchemy.Integer),
+            # SHA-256 digest and size of generated source archive
+            sqlalchemy.Column('archive_sha256', sqlalchemy.String(64), nullable=True),
+            sqlalchemy.Column('archive_size', sqlalchemy.BigInteger, nullable=True)
         )
 
         self._sub_module = sqlalchemy.Table(
@@ -488,6 +557,44 @@ class Database():
             sqlalchemy.Column('provider_name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
         )
 
+        # Daily rollups of analytics, maintained when analytics are recorded.
+        # Rows are unique per key, so that counts can be incremented using an upsert.
+        # As with analytics, module version IDs are not foreign keys, as
+        # analytics are migrated to new module versions when re-indexed.
+        self._analytics_module_version_daily = sqlalchemy.Table(
+            'analytics_module_version_daily', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
+            sqlalchemy.Column('date', sqlalchemy.Date, index=True, nullable=False),
+            sqlalchemy.Column('module_version_id', sqlalchemy.Integer, index=True, nullable=False),
+            sqlalchemy.Column('download_count', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.UniqueConstraint('date', 'module_version_id', name='uq_analytics_module_version_daily_key'),
+        )
+
+        self._analytics_module_provider_daily = sqlalchemy.Table(
+            'analytics_module_provider_daily', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
+            sqlalchemy.Column('date', sqlalchemy.Date, index=True, nullable=False),
+            sqlalchemy.Column('module_provider_id', sqlalchemy.Integer, index=True, nullable=False),
+            sqlalchemy.Column('download_count', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.UniqueConstraint('date', 'module_provider_id', name='uq_analytics_module_provider_daily_key'),
+        )
+
+        self._analytics_token_daily = sqlalchemy.Table(
+            'analytics_token_daily', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
+            sqlalchemy.Column('date', sqlalchemy.Date, index=True, nullable=False),
+            sqlalchemy.Column('module_version_id', sqlalchemy.Integer, index=True, nullable=False),
+            # Empty analytics tokens and environments are stored as empty strings,
+            # as NULL values are not considered equal by the unique constraint
+            sqlalchemy.Column('analytics_token', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False, server_default=''),
+            sqlalchemy.Column('environment', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False, server_default=''),
+            sqlalchemy.Column('has_auth_token', sqlalchemy.Boolean, nullable=False),
+            sqlalchemy.Column('download_count', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.UniqueConstraint(
+                'date', 'module_version_id', 'analytics_token', 'environment', 'has_auth_token',
+                name='uq_analytics_token_daily_key'),
+        )
+
         self._example_file = sqlalchemy.Table(
             'example_file', meta,
             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
@@ -521,6 +628,48 @@ class Database():
             sqlalchemy.Column('content', Database.medium_blob())
         )
 
+        # Search index, containing trigrams of the searchable
+        # attributes of each module provider and its latest version
+        self._module_search_trigram = sqlalchemy.Table(
+            'module_search_trigram', meta,
+            sqlalchemy.Column('trigram', sqlalchemy.String(3), primary_key=True),
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_module_search_trigram_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                primary_key=True,
+                index=True,
+                nullable=False
+            )
+        )
+
+        # Queue of module versions to be indexed by background workers
+        self._module_indexing_job = sqlalchemy.Table(
+            'module_indexing_job', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_module_indexing_job_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                nullable=False
+            ),
+            sqlalchemy.Column('version', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('status', sqlalchemy.String(GENERAL_COLUMN_SIZE), index=True, nullable=False),
+            sqlalchemy.Column('username', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('attempts', sqlalchemy.Integer, nullable=False, default=0),
+            sqlalchemy.Column('error', sqlalchemy.String(LARGE_COLUMN_SIZE)),
+            sqlalchemy.Column('created_at', sqlalchemy.DateTime),
+            sqlalchemy.Column('updated_at', sqlalchemy.DateTime),
+            sqlalchemy.Column('next_attempt_at', sqlalchemy.DateTime),
+            sqlalchemy.Column('lease_expires_at', sqlalchemy.DateTime)
+        )
+
         self._audit_history = sqlalchemy.Table(
             'audit_history', meta,
             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
@@ -568,6 +717,24 @@ class Database():
 
         return None
 
+    @classmethod
+    def call_after_commit(cls, callback):
+        """
+        Call callback once the current transaction has been committed,
+        or immediately, if not within a transaction.
+
+        Callbacks are discarded if the transaction is rolled back.
+        """
+        if has_request_context():
+            transaction_context = flask.g.get('database_transaction_context', None)
+        else:
+            transaction_context = cls.get().transaction_context
+
+        if transaction_context is None:
+            callback()
+        else:
+            transaction_context.add_after_commit_callback(callback)
+
     @classmethod
     def start_transaction(cls):
         """Start DB transaction, store in current context and return"""
@@ -590,6 +757,54 @@ class Database():
         return cls.get().get_engine().connect()
 
 
+class RequestRowCache:
+    """
+    Request-scoped cache of database rows for model objects.
+
+    Model objects are constructed by name throughout a request,
+    so rows are stored against the current request context and
+    shared between instances representing the same database row.
+    Outside of a request context, no rows are cached.
+    """
+
+    @staticmethod
+    def _get_cache():
+        """Return cache dictionary for current request context."""
+        if not has_request_context():
+            return None
+        if flask.g.get('request_row_cache', None) is None:
+            flask.g.request_row_cache = {}
+        return flask.g.request_row_cache
+
+    @classmethod
+    def get(cls, key):
+        """Return cached row for key, if present."""
+        cache = cls._get_cache()
+        if cache is None:
+            return None
+        return cache.get(key, None)
+
+    @classmethod
+    def set(cls, key, row):
+        """Store row against key, ignoring non-existent rows."""
+        cache = cls._get_cache()
+        if cache is not None and row is not None:
+            cache[key] = row
+
+    @classmethod
+    def invalidate(cls, key):
+        """Remove cached row for key."""
+        cache = cls._get_cache()
+        if cache is not None and key in cache:
+            del cache[key]
+
+    @classmethod
+    def clear(cls):
+        """Remove all cached rows for the current request."""
+        if has_request_context():
+            flask.g.request_row_cache = None
+
+
 class TransactionConnectionWrapper:
 
     def __init__(self, transaction):
@@ -622,6 +837,11 @@ class Transaction:
         """Store database connection."""
         self._connection = connection
         self._transaction_outer = None
+        self._after_commit_callbacks = []
+
+    def add_after_commit_callback(self, callback):
+        """Add callback to be called once the transaction has been committed."""
+        self._after_commit_callbacks.append(callback)
     
     def __enter__(self):
         """Start transaction and store in current context."""
@@ -633,8 +853,10 @@ class Transaction:
         # returned by any get_connection methods
         if has_request_context():
             flask.g.database_transaction_connection = self._connection
+            flask.g.database_transaction_context = self
         else:
-            Database.get().transaction = self._connection
+            Database.get().transaction_connection = self._connection
+            Database.get().transaction_context = self
 
         return self
 
@@ -642,8 +864,24 @@ class Transaction:
         """End transaction and remove from current context."""
         if has_request_context():
             flask.g.database_transaction_connection = None
+            flask.g.database_transaction_context = None
         else:
-            Database.get().transaction = None
+            Database.get().transaction_connection = None
+            Database.get().transaction_context = None
+
+        # If the transaction is being rolled back due to an exception,
+        # remove any rows cached during the transaction
+        if args and args[0] is not None:
+            RequestRowCache.clear()
+
+        # Transaction is only committed if it has not been rolled back
+        # and no exception has been raised
+        is_committing = self._transaction_outer.is_active and not (args and args[0] is not None)
 
         self._transaction_outer.__exit__(*args, **kwargs)
 
+        if is_committing:
+            for callback in self._after_commit_callbacks:
+                callback()
+        self._after_commit_callbacks = []
+
@@ -262,3 +262,15 @@ class PresignedUrlsNotConfiguredError(TerraregError):
     """Missing configurations for pre-signed URLs"""
 
     pass
+
+
+class ArtifactStorageNotConfiguredError(TerraregError):
+    """Artifact storage backend is not correctly configured"""
+
+    pass
+
+
+class InvalidTerraformGraphError(TerraregError):
+    """Terraform graph data could not be parsed"""
+
+    pass
@@ -0,0 +1,206 @@
+"""Provide content-addressed cache of module analysis results."""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+import uuid
+
+from terrareg.config import Config
+from terrareg.constants import EXTRACTION_VERSION
+
+
+class ExtractionCache:
+    """
+    Cache of analysis results (terraform-docs, tfsec, graph, Infracost etc.) for module directories.
+
+    Results are keyed by a hash of the content of the analysed directory, any local modules
+    that it references, the versions of the analysis tools and Terraform and the extraction configuration,
+    so that unchanged root modules, submodules and examples are not re-analysed when re-indexed.
+    """
+
+    # Directories that are not part of the module source
+    EXCLUDED_DIRECTORIES = ['.git', '.terraform']
+
+    # Match local module sources, e.g. source = "../../"
+    LOCAL_MODULE_SOURCE_RE = re.compile(r'^\s*source\s*=\s*"(\.{1,2}/[^"]*|\.{1,2})"', re.MULTILINE)
+
+    # Match module blocks and sources, used to find modules that are not local
+    MODULE_BLOCK_RE = re.compile(r'^\s*module\s+"[^"]*"\s*\{', re.MULTILINE)
+    MODULE_SOURCE_RE = re.compile(r'^\s*source\s*=\s*"([^"]*)"', re.MULTILINE)
+    LOCAL_SOURCE_RE = re.compile(r'^\.{1,2}(/|$)')
+
+    # Commands used to determine versions of analysis tools
+    TOOL_VERSION_COMMANDS = {
+        'terraform-docs': ['terraform-docs', '--version'],
+        'tfsec': ['tfsec', '--version'],
+        'infracost': ['infracost', '--version'],
+    }
+
+    _TOOL_VERSIONS = None
+    _TOOL_VERSIONS_LOCK = threading.Lock()
+
+    @classmethod
+    def is_enabled(cls):
+        """Whether caching of analysis results is enabled"""
+        return Config().MODULE_EXTRACTION_CACHE
+
+    @staticmethod
+    def get_cache_directory():
+        """Return directory containing cached analysis results"""
+        return os.path.join(Config().DATA_DIRECTORY, 'extraction-cache')
+
+    @classmethod
+    def get_tool_versions(cls):
+        """Return versions of analysis tools, which are obtained once per process."""
+        if cls._TOOL_VERSIONS is None:
+            with cls._TOOL_VERSIONS_LOCK:
+                if cls._TOOL_VERSIONS is None:
+                    tool_versions = {}
+                    for tool, command in cls.TOOL_VERSION_COMMANDS.items():
+                        try:
+                            tool_versions[tool] = subprocess.check_output(
+                                command, stderr=subprocess.STDOUT
+                            ).decode('utf-8').strip()
+                        except (OSError, subprocess.CalledProcessError):
+                            tool_versions[tool] = None
+                    cls._TOOL_VERSIONS = tool_versions
+        return cls._TOOL_VERSIONS
+
+    @classmethod
+    def _get_local_module_directories(cls, directory, base_directory):
+        """
+        Return directory and all local module directories that it references, recursively.
+
+        Returns None if a local module outside of the base directory is referenced.
+        """
+        base_directory = os.path.realpath(base_directory)
+        directories = set()
+        to_scan = [os.path.realpath(directory)]
+        while to_scan:
+            scan_directory = to_scan.pop()
+            if scan_directory in directories:
+                continue
+            if os.path.commonpath([base_directory, scan_directory]) != base_directory:
+                return None
+            directories.add(scan_directory)
+
+            if not os.path.isdir(scan_directory):
+                continue
+            for file_name in os.listdir(scan_directory):
+                if not file_name.endswith('.tf'):
+                    continue
+                with open(os.path.join(scan_directory, file_name), 'r', errors='replace') as tf_fh:
+                    for source in cls.LOCAL_MODULE_SOURCE_RE.findall(tf_fh.read()):
+                        to_scan.append(os.path.realpath(os.path.join(scan_directory, source)))
+
+        return directories
+
+    @classmethod
+    def has_remote_modules(cls, directory, base_directory):
+        """
+        Whether directory, or any local module that it references, uses modules that are not local.
+
+        Remote modules are obtained by terraform init and may change without any local file changing.
+        """
+        directories = cls._get_local_module_directories(directory=directory, base_directory=base_directory)
+        if directories is None:
+            return True
+
+        for scan_directory in directories:
+            if not os.path.isdir(scan_directory):
+                continue
+            for file_name in os.listdir(scan_directory):
+                if not file_name.endswith('.tf'):
+                    continue
+                with open(os.path.join(scan_directory, file_name), 'r', errors='replace') as tf_fh:
+                    content = tf_fh.read()
+                for module_match in cls.MODULE_BLOCK_RE.finditer(content):
+                    source_match = cls.MODULE_SOURCE_RE.search(content, module_match.end())
+                    if source_match and not cls.LOCAL_SOURCE_RE.match(source_match.group(1)):
+                        return True
+        return False
+
+    @classmethod
+    def get_key(cls, directory, base_directory, include_infracost, terraform_version=None):
+        """
+        Return cache key for analysis of directory, using the given version of Terraform.
+
+        Returns None if the analysis cannot be cached.
+        """
+        directories = cls._get_local_module_directories(directory=directory, base_directory=base_directory)
+        if directories is None:
+            return None
+
+        real_base_directory = os.path.realpath(base_directory)
+
+        # Obtain all files within the directories, de-duplicating
+        # files from directories that are within another directory
+        file_paths = set()
+        for hash_directory in directories:
+            for root, dirs, files in os.walk(hash_directory):
+                dirs[:] = [dir_ for dir_ in dirs if dir_ not in cls.EXCLUDED_DIRECTORIES]
+                for file_name in files:
+                    file_paths.add(os.path.join(root, file_name))
+
+        key_hash = hashlib.sha256()
+        key_hash.update(json.dumps({
+            'extraction_version': EXTRACTION_VERSION,
+            'tool_versions': cls.get_tool_versions(),
+            # Paths in results (e.g. tfsec) are relative to the base directory
+            'path': os.path.relpath(os.path.realpath(directory), real_base_directory),
+            'infracost': include_infracost,
+            'terraform_version': terraform_version,
+            'default_terraform_version': Config().DEFAULT_TERRAFORM_VERSION,
+            'terraform_archive_mirror': Config().TERRAFORM_ARCHIVE_MIRROR,
+        }, sort_keys=True).encode('utf-8'))
+
+        for file_path in sorted(file_paths):
+            key_hash.update(os.path.relpath(file_path, real_base_directory).encode('utf-8'))
+            key_hash.update(b'\0')
+            if os.path.islink(file_path):
+                key_hash.update(os.readlink(file_path).encode('utf-8'))
+            else:
+                with open(file_path, 'rb') as file_fh:
+                    for chunk in iter(lambda: file_fh.read(65536), b''):
+                        key_hash.update(chunk)
+            key_hash.update(b'\0')
+
+        return key_hash.hexdigest()
+
+    @classmethod
+    def _get_path(cls, key):
+        """Return path of cache file for key"""
+        return os.path.join(cls.get_cache_directory(), key[:2], f'{key}.json')
+
+    @classmethod
+    def get(cls, key):
+        """Return cached analysis for key, if present and not expired."""
+        path = cls._get_path(key)
+        try:
+            max_age = Config().MODULE_EXTRACTION_CACHE_MAX_AGE
+            if max_age > 0 and os.path.getmtime(path) < (time.time() - (max_age * 86400)):
+                return None
+
+            with open(path, 'r') as cache_fh:
+                return json.load(cache_fh)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def set(cls, key, analysis):
+        """Store analysis for key."""
+        path = cls._get_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to temporary file and move into place, as
+            # the file may be read by concurrent extractions
+            temp_path = f'{path}.{uuid.uuid4().hex}'
+            with open(temp_path, 'w') as cache_fh:
+                json.dump(analysis, cache_fh)
+            os.replace(temp_path, path)
+        except OSError as exc:
+            print(f'Failed to store extraction cache: {exc}')
@@ -0,0 +1,273 @@
+"""Provide local cache of bare git mirrors for cloning module repositories."""
+
+import contextvars
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+
+from terrareg.config import Config
+
+
+class GitMirrorCache:
+    """
+    Cache of bare mirrors of git repositories.
+
+    Each repository is mirrored once and updated by fetching from the remote,
+    with module versions cloned locally from the mirror, rather than cloning
+    the full repository from the remote for each version.
+
+    Mirrors are locked whilst being updated or cloned from, both between threads
+    and processes, and the least recently used mirrors are removed once the
+    total size of the cache exceeds GIT_MIRROR_CACHE_MAX_SIZE.
+
+    When the cache is disabled, a temporary mirror of a repository can be used
+    whilst cloning many tags of the repository, using temporary_mirror().
+    Temporary mirrors are only used within the context that created them,
+    and any contexts copied from it, such as threads running jobs
+    for a bulk import, so other extractions of the repository are unaffected.
+    """
+
+    _REPOSITORY_LOCKS = {}
+    _REPOSITORY_LOCKS_LOCK = threading.Lock()
+
+    # Directories containing temporary mirrors available to the current context, by repository key.
+    # The dictionary is replaced, rather than modified, when entering and exiting temporary_mirror()
+    _TEMPORARY_CACHE_DIRECTORIES = contextvars.ContextVar('git_mirror_temporary_cache_directories', default={})
+
+    @classmethod
+    def is_enabled(cls, git_url=None):
+        """Whether git mirror cache is enabled, or a temporary mirror is available for the git URL"""
+        if Config().GIT_MIRROR_CACHE_DIRECTORY:
+            return True
+        return git_url is not None and cls._is_temporary(cls.get_repository_key(git_url))
+
+    @classmethod
+    def _is_temporary(cls, key):
+        """Whether a temporary mirror of the repository is available to the current context"""
+        return key in cls._TEMPORARY_CACHE_DIRECTORIES.get()
+
+    @classmethod
+    def get_cache_directory(cls, key=None):
+        """Return directory containing git mirrors, or containing temporary mirror of repository"""
+        if key is not None and cls._is_temporary(key):
+            return cls._TEMPORARY_CACHE_DIRECTORIES.get()[key]
+        return Config().GIT_MIRROR_CACHE_DIRECTORY
+
+    @staticmethod
+    def get_repository_key(git_url):
+        """Return key for repository, used for directory and lock names"""
+        return hashlib.sha256(git_url.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_mirror_directory(cls, git_url):
+        """Return path of mirror for git URL"""
+        key = cls.get_repository_key(git_url)
+        return os.path.join(cls.get_cache_directory(key), f'{key}.git')
+
+    @classmethod
+    @contextmanager
+    def temporary_mirror(cls, git_url):
+        """
+        Use temporary mirror of repository for clones within the context, if the cache is disabled.
+
+        The repository is mirrored from the remote on first use and the mirror is removed on exit.
+        The mirror is only used by the current context and contexts copied from it
+        (e.g. using contextvars.copy_context() when submitting work to other threads).
+        """
+        key = cls.get_repository_key(git_url)
+        # Nested contexts use the existing temporary mirror
+        if Config().GIT_MIRROR_CACHE_DIRECTORY or cls._is_temporary(key):
+            yield
+            return
+
+        temporary_directory = tempfile.mkdtemp(prefix='terrareg-git-mirror-')
+        token = cls._TEMPORARY_CACHE_DIRECTORIES.set(
+            dict(cls._TEMPORARY_CACHE_DIRECTORIES.get(), **{key: temporary_directory})
+        )
+        try:
+            yield
+        finally:
+            cls._TEMPORARY_CACHE_DIRECTORIES.reset(token)
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+
+    @classmethod
+    def _get_thread_lock(cls, key):
+        """Return in-process lock for repository"""
+        with cls._REPOSITORY_LOCKS_LOCK:
+            if key not in cls._REPOSITORY_LOCKS:
+                cls._REPOSITORY_LOCKS[key] = threading.Lock()
+            return cls._REPOSITORY_LOCKS[key]
+
+    @classmethod
+    @contextmanager
+    def _lock_repository(cls, key, blocking=True):
+        """
+        Lock repository mirror, between threads and processes.
+
+        Yields whether the lock was obtained.
+        """
+        thread_lock = cls._get_thread_lock(key)
+        if not thread_lock.acquire(blocking=blocking):
+            yield False
+            return
+
+        try:
+            os.makedirs(cls.get_cache_directory(key), exist_ok=True)
+            with open(os.path.join(cls.get_cache_directory(key), f'{key}.lock'), 'w') as lock_fh:
+                try:
+                    fcntl.flock(lock_fh, fcntl.LOCK_EX if blocking else (fcntl.LOCK_EX | fcntl.LOCK_NB))
+                except BlockingIOError:
+                    yield False
+                    return
+
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_fh, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+    @staticmethod
+    def _has_tag(mirror_directory, tag, env):
+        """Whether mirror contains tag"""
+        try:
+            subprocess.check_output(
+                ['git', 'rev-parse', '--verify', '--quiet', f'refs/tags/{tag}'],
+                cwd=mirror_directory,
+                stderr=subprocess.STDOUT,
+                env=env
+            )
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    @classmethod
+    def _update_mirror(cls, git_url, env, timeout, tag=None):
+        """
+        Create mirror of repository or fetch latest changes into existing mirror.
+
+        Existing temporary mirrors are only updated if they do not contain the required tag.
+        """
+        mirror_directory = cls.get_mirror_directory(git_url)
+        is_temporary = cls._is_temporary(cls.get_repository_key(git_url))
+
+        if os.path.isdir(mirror_directory):
+            # Temporary mirrors are only used for a short period,
+            # so are only updated if the tag has been created since
+            # the repository was mirrored
+            if is_temporary and (tag is None or cls._has_tag(mirror_directory, tag, env)):
+                return mirror_directory
+            subprocess.check_output(
+                ['git', 'remote', 'update', '--prune'],
+                cwd=mirror_directory,
+                stderr=subprocess.STDOUT,
+                env=env,
+                timeout=timeout
+            )
+        else:
+            # Clone into temporary directory and move into place,
+            # so that a partially cloned mirror is never used
+            temp_mirror_directory = f'{mirror_directory}.{uuid.uuid4().hex}'
+            try:
+                subprocess.check_output(
+                    ['git', 'clone', '--mirror', git_url, temp_mirror_directory],
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    timeout=timeout
+                )
+                os.rename(temp_mirror_directory, mirror_directory)
+            finally:
+                if os.path.isdir(temp_mirror_directory):
+                    shutil.rmtree(temp_mirror_directory)
+
+        # Update modification time of mirror, used for LRU eviction
+        os.utime(mirror_directory)
+        return mirror_directory
+
+    @classmethod
+    def clone(cls, git_url, tag, destination, env, timeout):
+        """Clone tag of repository into destination, via mirror of repository."""
+        key = cls.get_repository_key(git_url)
+        with cls._lock_repository(key):
+            mirror_directory = cls._update_mirror(git_url=git_url, env=env, timeout=timeout, tag=tag)
+
+            subprocess.check_output([
+                    'git', 'clone', '--single-branch',
+                    '--branch', tag,
+                    mirror_directory,
+                    destination
+                ],
+                stderr=subprocess.STDOUT,
+                env=env,
+                timeout=timeout
+            )
+
+        cls.evict(exclude_key=key)
+
+    @classmethod
+    def get_tag_refs(cls, git_url, env, timeout):
+        """Update mirror of repository and return refs of all tags."""
+        key = cls.get_repository_key(git_url)
+        with cls._lock_repository(key):
+            mirror_directory = cls._update_mirror(git_url=git_url, env=env, timeout=timeout)
+
+            output = subprocess.check_output(
+                ['git', 'for-each-ref', '--format=%(refname)', 'refs/tags'],
+                cwd=mirror_directory,
+                stderr=subprocess.STDOUT,
+                env=env
+            )
+
+        cls.evict(exclude_key=key)
+        return [tag_ref for tag_ref in output.decode('utf-8').split('\n') if tag_ref]
+
+    @staticmethod
+    def _get_directory_size(directory):
+        """Return total size of files in directory"""
+        total_size = 0
+        for root, _, files in os.walk(directory):
+            for file_name in files:
+                try:
+                    total_size += os.lstat(os.path.join(root, file_name)).st_size
+                except OSError:
+                    pass
+        return total_size
+
+    @classmethod
+    def evict(cls, exclude_key=None):
+        """Remove least recently used mirrors, until the cache is within the maximum size."""
+        max_size = Config().GIT_MIRROR_CACHE_MAX_SIZE * 1024 * 1024
+        cache_directory = cls.get_cache_directory()
+        # Temporary mirrors are not evicted
+        if not cache_directory or not os.path.isdir(cache_directory):
+            return
+
+        mirrors = []
+        total_size = 0
+        for directory_name in os.listdir(cache_directory):
+            mirror_directory = os.path.join(cache_directory, directory_name)
+            # Ignore lock files and temporary mirrors
+            if not (directory_name.endswith('.git') and os.path.isdir(mirror_directory)):
+                continue
+            size = cls._get_directory_size(mirror_directory)
+            total_size += size
+            mirrors.append((os.path.getmtime(mirror_directory), directory_name[:-len('.git')], mirror_directory, size))
+
+        for _, key, mirror_directory, size in sorted(mirrors):
+            if total_size <= max_size:
+                break
+            if key == exclude_key:
+                continue
+
+            # Skip mirrors that are currently in use
+            with cls._lock_repository(key, blocking=False) as locked:
+                if not locked:
+                    continue
+                shutil.rmtree(mirror_directory, ignore_errors=True)
+                total_size -= size
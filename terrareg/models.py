@@ -1,25 +1,27 @@
 
+import collections
 import contextlib
 import datetime
 from enum import Enum
+import hashlib
 import os
 from distutils.version import LooseVersion
 import json
 import re
 import secrets
+import subprocess
 import urllib.parse
 
 import sqlalchemy
 import semantic_version
 import markdown
-import pygraphviz
-import networkx as nx
 
 import terrareg.analytics
-from terrareg.database import Database
+from terrareg.database import Database, RequestRowCache
 import terrareg.config
 import terrareg.audit
 import terrareg.audit_action
+import terrareg.module_search
 import terrareg.result_data
 from terrareg.errors import (
     DuplicateModuleProviderError, DuplicateNamespaceDisplayNameError, InvalidModuleNameError, InvalidModuleProviderNameError, InvalidNamespaceDisplayNameError, InvalidUserGroupNameError,
@@ -32,13 +34,19 @@ from terrareg.errors import (
     InvalidGitProviderConfigError,
     ModuleProviderCustomGitRepositoryUrlNotAllowedError,
     NoModuleDownloadMethodConfiguredError,
-    ProviderNameNotPermittedError, RepositoryUrlParseError
+    ProviderNameNotPermittedError, RepositoryUrlParseError,
+    GitCloneError
 )
 import terrareg.version_constraint
 from terrareg.utils import convert_markdown_to_html, get_public_url_details, safe_join_paths, sanitise_html_content
 from terrareg.validators import GitUrlValidator
 from terrareg.constants import EXTRACTION_VERSION
 from terrareg.presigned_url import TerraformSourcePresignedUrl
+from terrareg.git_mirror import GitMirrorCache
+from terrareg.artifact_storage import BaseArtifactStorage
+from terrareg.readme_html_cache import ReadmeHtmlCache
+from terrareg.module_specs_cache import ModuleSpecsCache
+from terrareg.terraform_graph import TerraformGraphParser
 
 
 class Session:
@@ -1012,8 +1020,23 @@ class Namespace(object):
         self._name = name
         self._cache_db_row = None
 
+    @classmethod
+    def _from_db_row(cls, row):
+        """Create namespace object from pre-fetched database row."""
+        namespace = cls(name=row['namespace'])
+        namespace._cache_db_row = row
+        return namespace
+
+    @property
+    def _row_cache_key(self):
+        """Return key for request row cache."""
+        return ('namespace', self._name)
+
     def _get_db_row(self):
         """Return database row for namespace."""
+        if self._cache_db_row is None:
+            self._cache_db_row = RequestRowCache.get(self._row_cache_key)
+
         if self._cache_db_row is None:
             db = Database.get()
             select = db.namespace.select(
@@ -1023,6 +1046,7 @@ class Namespace(object):
             with db.get_connection() as conn:
                 res = conn.execute(select)
                 self._cache_db_row = res.fetchone()
+            RequestRowCache.set(self._row_cache_key, self._cache_db_row)
 
         return self._cache_db_row
 
@@ -1091,6 +1115,11 @@ class Namespace(object):
 
         # Remove cached DB row
         self._cache_db_row = None
+        RequestRowCache.invalidate(self._row_cache_key)
+
+        # Update search index for module providers, if name has changed
+        if 'namespace' in kwargs:
+            terrareg.module_search.ModuleSearchIndex.update_namespace(self.pk)
 
     def get_view_url(self):
         """Return view URL"""
@@ -1151,6 +1180,9 @@ class Namespace(object):
         with db.get_connection() as conn:
             conn.execute(delete)
 
+        self._cache_db_row = None
+        RequestRowCache.clear()
+
     def create_data_directory(self):
         """Create data directory and data directories of parents."""
         # Check if data directory exists
@@ -1239,6 +1271,11 @@ class Module(object):
 class ModuleDetails:
     """Object to store common details between root module, submodules and examples."""
 
+    # Version of generated graph JSON, which should be incremented
+    # when changing the output of graph JSON generation, to regenerate
+    # previously stored graph JSON
+    GRAPH_JSON_VERSION = 1
+
     @classmethod
     def create(cls):
         """Create instance of object in database."""
@@ -1258,59 +1295,101 @@ class ModuleDetails:
     @property
     def terraform_docs(self):
         """Return terraform_docs column"""
-        if self._get_db_row():
-            return self._get_db_row()['terraform_docs']
-        return None
+        return self._get_column('terraform_docs')
 
     @property
     def readme_content(self):
         """Return readme_content column"""
-        if self._get_db_row():
-            return self._get_db_row()['readme_content']
-        return None
+        return self._get_column('readme_content')
 
     @property
     def tfsec(self):
         """Return tfsec data."""
         # If module scanning is disabled, do not return the tfsec output
-        if (terrareg.config.Config().ENABLE_SECURITY_SCANNING and
-                self._get_db_row() is not None and
-                self._get_db_row()['tfsec']):
-            return json.loads(self._get_db_row()['tfsec'])
+        if terrareg.config.Config().ENABLE_SECURITY_SCANNING:
+            tfsec = self._get_column('tfsec')
+            if tfsec:
+                return json.loads(tfsec)
         return {'results': None}
 
     @property
     def infracost(self):
         """Return Infracost data."""
-        db_row = self._get_db_row()
-        if (db_row is not None and
-                db_row['infracost']):
-            return json.loads(db_row['infracost'])
+        infracost = self._get_column('infracost')
+        if infracost:
+            return json.loads(infracost)
         return {}
 
     @property
     def terraform_graph(self):
         """Return decoded terraform graph data."""
-        db_row = self._get_db_row()
-        if db_row and db_row["terraform_graph"]:
-            return Database.decode_blob(db_row["terraform_graph"])
+        terraform_graph = self._get_column('terraform_graph')
+        if terraform_graph:
+            return Database.decode_blob(terraform_graph)
+        return None
+
+    @staticmethod
+    def _get_graph_json_key(full_resource_names, full_module_names):
+        """Return key of pre-computed graph JSON for label options"""
+        return '{}_resource_names,{}_module_names'.format(
+            'full' if full_resource_names else 'short',
+            'full' if full_module_names else 'short'
+        )
+
+    def _get_precomputed_graph_json(self):
+        """Return pre-computed graph JSON for all label options, if it is present and up-to-date."""
+        terraform_graph_json = self._get_column('terraform_graph_json')
+        if terraform_graph_json:
+            data = json.loads(Database.decode_blob(terraform_graph_json))
+            if data.get("version") == self.GRAPH_JSON_VERSION:
+                return data["graphs"]
         return None
 
+    def update_graph_json(self):
+        """
+        Generate graph JSON for all combinations of label options
+        and store in database, returning the generated graph JSON.
+        """
+        if not self.terraform_graph:
+            return None
+
+        graphs = {}
+        for full_resource_names in [False, True]:
+            for full_module_names in [False, True]:
+                graphs[self._get_graph_json_key(full_resource_names, full_module_names)] = self._generate_graph_json(
+                    full_resource_names=full_resource_names,
+                    full_module_names=full_module_names
+                )
+
+        self.update_attributes(terraform_graph_json=json.dumps({
+            "version": self.GRAPH_JSON_VERSION,
+            "graphs": graphs
+        }))
+        return graphs
+
     def get_graph_json(self, full_resource_names=False, full_module_names=False):
+        """Return graph JSON for resources, generating and storing graph JSON if it has not been pre-computed."""
+        graphs = self._get_precomputed_graph_json()
+        if graphs is None:
+            graphs = self.update_graph_json()
+            if graphs is None:
+                return None
+        return graphs[self._get_graph_json_key(full_resource_names, full_module_names)]
+
+    def _generate_graph_json(self, full_resource_names, full_module_names):
         """Return graph JSON for resources."""
         terraform_graph = self.terraform_graph
         if not terraform_graph:
             return None
 
-        # Generate NX graph from terraform graphviz output
-        graph = pygraphviz.AGraph(terraform_graph)
-        nx_graph = nx.nx_agraph.from_agraph(graph)
+        # Obtain nodes and edges from terraform graphviz output
+        graph_nodes, graph_edges = TerraformGraphParser.parse(terraform_graph)
 
         infracost = self.infracost
         resource_costs = {}
         remove_item_iteration_re = re.compile(r'\[[^\]]+\]')
         if infracost:
-            for resource in self.infracost["projects"][0]["breakdown"]["resources"]:
+            for resource in infracost["projects"][0]["breakdown"]["resources"]:
                 if not resource["monthlyCost"]:
                     continue
 
@@ -1338,7 +1417,7 @@ class ModuleDetails:
         # Store node renames, to be renamed after initial iteration
         renames = {}
         # Store nodes to be removed
-        to_remove = []
+        to_remove = set()
         # Store labels to be pushed to graph JSON
         labels = {}
         # Store type mappings for determine node attributes
@@ -1348,11 +1427,10 @@ class ModuleDetails:
         parents = {}
 
         def remove_node(node):
-            """Add a node to the remove_nodes list, if they are not already present"""
-            if node not in to_remove:
-                to_remove.append(node)
+            """Mark node for removal"""
+            to_remove.add(node)
 
-        for node_label in nx_graph.nodes:
+        for node_label in graph_nodes:
             # Remove leading '[root] ' name and expand/close suffices from node names
             name = node_label.replace('[root] ', '').replace(' (expand)', '').replace(' (close)', '')
 
@@ -1417,12 +1495,32 @@ class ModuleDetails:
                     remove_node(name)
                     print("Unable to match node to type", name)
 
-        # Perform rename of nodes
-        nx_graph = nx.relabel_nodes(nx_graph, renames)
+        # Perform rename of nodes, merging nodes that are renamed to the same name,
+        # and remove any nodes marked for removal
+        nodes = [
+            node
+            for node in dict.fromkeys(renames.get(node_label, node_label) for node_label in graph_nodes)
+            if node not in to_remove
+        ]
+
+        # Group edges by renamed source node and then target node,
+        # retaining parallel edges
+        adjacency = {}
+        for source, target in graph_edges:
+            source_adjacency = adjacency.setdefault(renames.get(source, source), {})
+            target = renames.get(target, target)
+            source_adjacency[target] = source_adjacency.get(target, 0) + 1
+
+        edges = [
+            (source, target)
+            for source in nodes
+            for target, edge_count in adjacency.get(source, {}).items()
+            if target not in to_remove
+            for _ in range(edge_count)
+        ]
 
-        # Remove any nodes marked for removal
-        for node in to_remove:
-            nx_graph.remove_node(node)
+        # Count number of child nodes of each parent
+        child_counts = collections.Counter(parents.values())
 
         # Convert to JSON for cytoscape
         cytoscape_json = {
@@ -1430,11 +1528,11 @@ class ModuleDetails:
             "edges": []
         }
 
-        for node in nx_graph.nodes:
+        for node in nodes:
             data = {
                 "id": node,
                 "label": labels.get(node),
-                "child_count": list(parents.values()).count(node)
+                "child_count": child_counts[node]
             }
 
             style = {}
@@ -1462,15 +1560,15 @@ class ModuleDetails:
             })
 
         # Add edges to graph
-        seen_module_links = []
-        for edge in nx_graph.edges:
+        seen_module_links = set()
+        for edge in edges:
             # Only add edges for module-module links
             if (type_mapping[edge[0]] == "module" and type_mapping[edge[1]] == "module" and
                     # Only link modules in one direction, where module is a sub-module of another,
                     # to avoid links in both directions
                     edge[0] in edge[1]):
                 # Mark module as having been seen in edges
-                seen_module_links.append(edge[1])
+                seen_module_links.add(edge[1])
 
                 cytoscape_json["edges"].append({
                     "data": {
@@ -1505,9 +1603,9 @@ class ModuleDetails:
     @property
     def terraform_version(self):
         """Return terraform version output"""
-        db_row = self._get_db_row()
-        if db_row and db_row["terraform_version"]:
-            data = Database.decode_blob(db_row["terraform_version"])
+        terraform_version = self._get_column('terraform_version')
+        if terraform_version:
+            data = Database.decode_blob(terraform_version)
             if data:
                 try:
                     return json.loads(data)
@@ -1518,10 +1616,10 @@ class ModuleDetails:
     @property
     def terraform_modules(self):
         """Return terraform modules output"""
-        db_row = self._get_db_row()
+        terraform_modules = self._get_column('terraform_modules')
         data = None
-        if db_row and db_row["terraform_modules"]:
-            data = Database.decode_blob(db_row["terraform_modules"])
+        if terraform_modules:
+            data = Database.decode_blob(terraform_modules)
             if data:
                 try:
                     data = json.loads(data)
@@ -1534,21 +1632,27 @@ class ModuleDetails:
     def __init__(self, id: int):
         """Store member variables."""
         self._id = id
-        self._cache_db_row = None
+        self._cache_columns = {}
 
-    def _get_db_row(self):
-        """Return database row for module details."""
-        if self._cache_db_row is None:
+    def _get_column(self, column):
+        """
+        Return value of column for module details.
+
+        Each column is selected from the database on first access, rather than selecting the entire row,
+        to avoid transferring unused blobs (such as the terraform graph and Infracost output) from the database.
+        """
+        if column not in self._cache_columns:
             db = Database.get()
-            select = db.module_details.select(
+            select = sqlalchemy.select(
+                db.module_details.c[column]
             ).where(
                 db.module_details.c.id == self.pk
             )
             with db.get_connection() as conn:
-                res = conn.execute(select)
-                self._cache_db_row = res.fetchone()
+                row = conn.execute(select).fetchone()
+            self._cache_columns[column] = row[column] if row is not None else None
 
-        return self._cache_db_row
+        return self._cache_columns[column]
 
     def get_db_where(self, db: Database, statement):
         """Return DB where statement"""
@@ -1561,7 +1665,8 @@ class ModuleDetails:
         # Check for any blob and encode the values
         for kwarg in kwargs:
             if kwarg in ['readme_content', 'terraform_docs', 'tfsec', 'infracost',
-                         'terraform_graph', 'terraform_modules', 'terraform_version']:
+                         'terraform_graph', 'terraform_modules', 'terraform_version',
+                         'terraform_graph_json']:
                 kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
 
         db = Database.get()
@@ -1571,8 +1676,13 @@ class ModuleDetails:
         with db.get_connection() as conn:
             conn.execute(update)
 
-        # Remove cached DB row
-        self._cache_db_row = None
+        # Remove cached column values
+        self._cache_columns = {}
+
+        if 'readme_content' in kwargs:
+            ReadmeHtmlCache.delete(self.pk)
+        if 'terraform_docs' in kwargs:
+            ModuleSpecsCache.delete(self.pk)
 
     def delete(self):
         """Delete from database."""
@@ -1586,6 +1696,10 @@ class ModuleDetails:
             )
             conn.execute(delete_statement)
 
+        # Remove rendered README HTML and parsed specs, as IDs of deleted rows may be re-used
+        ReadmeHtmlCache.delete(self.pk)
+        ModuleSpecsCache.delete(self.pk)
+
 
 class ProviderLogo:
 
@@ -1971,6 +2085,34 @@ class ModuleProvider(object):
         # Otherwise, return object
         return obj
 
+    @classmethod
+    def get_by_pk(cls, pk):
+        """Get module provider by pk"""
+        if not pk:
+            return None
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.namespace.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider
+        ).select_from(
+            db.module_provider
+        ).join(
+            db.namespace,
+            db.module_provider.c.namespace_id==db.namespace.c.id
+        ).where(
+            db.module_provider.c.id==pk
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if not row:
+            return None
+
+        namespace = Namespace.get(row['namespace'])
+        return cls.get(module=Module(namespace=namespace, name=row['module']), name=row['provider'], include_redirect=False)
+
     def get_logo(self):
         """Return logo for provider."""
         return ProviderLogo(provider=self.name)
@@ -2170,6 +2312,59 @@ class ModuleProvider(object):
         self._module = module
         self._name = name
         self._cache_db_row = None
+        self._cache_latest_version = None
+
+    @classmethod
+    def _from_db_row(cls, module, row, latest_version_row=None):
+        """
+        Create module provider object from pre-fetched database row.
+
+        If the row for the latest module version is provided,
+        this is used to populate the latest version of the module provider.
+        """
+        module_provider = cls(module=module, name=row['provider'])
+        module_provider._cache_db_row = row
+        if latest_version_row is not None:
+            module_provider._cache_latest_version = ModuleVersion._from_db_row(
+                module_provider=module_provider,
+                row=latest_version_row
+            )
+        return module_provider
+
+    @classmethod
+    def get_from_joined_latest_version_rows(cls, rows):
+        """
+        Create module provider objects from rows of a select
+        generated by Database.select_module_provider_joined_latest_module_version,
+        which must contain all columns from the namespace, module_provider and
+        module_version tables.
+
+        The namespace, module provider and latest module version objects
+        are populated using the rows, avoiding further queries for each result.
+        """
+        db = Database.get()
+        namespaces = {}
+        modules = {}
+        module_providers = []
+        for row in rows:
+            namespace_row = {column.name: row[column] for column in db.namespace.c}
+            module_provider_row = {column.name: row[column] for column in db.module_provider.c}
+            module_version_row = {column.name: row[column] for column in db.module_version.c}
+
+            if namespace_row['id'] not in namespaces:
+                namespaces[namespace_row['id']] = Namespace._from_db_row(namespace_row)
+            namespace = namespaces[namespace_row['id']]
+
+            module_key = (namespace_row['id'], module_provider_row['module'])
+            if module_key not in modules:
+                modules[module_key] = Module(namespace=namespace, name=module_provider_row['module'])
+
+            module_providers.append(cls._from_db_row(
+                module=modules[module_key],
+                row=module_provider_row,
+                latest_version_row=module_version_row
+            ))
+        return module_providers
 
     def get_db_where(self, db, statement):
         """Filter DB query by where for current object."""
@@ -2177,8 +2372,16 @@ class ModuleProvider(object):
             db.module_provider.c.id==self.pk
         )
 
+    @property
+    def _row_cache_key(self):
+        """Return key for request row cache."""
+        return ('module_provider', self._module._namespace.pk, self._module.name, self.name)
+
     def _get_db_row(self):
         """Return database row for module provider."""
+        if self._cache_db_row is None:
+            self._cache_db_row = RequestRowCache.get(self._row_cache_key)
+
         if self._cache_db_row is None:
             db = Database.get()
             select = db.module_provider.select(
@@ -2193,6 +2396,7 @@ class ModuleProvider(object):
             with db.get_connection() as conn:
                 res = conn.execute(select)
                 self._cache_db_row = res.fetchone()
+            RequestRowCache.set(self._row_cache_key, self._cache_db_row)
 
         return self._cache_db_row
 
@@ -2202,6 +2406,9 @@ class ModuleProvider(object):
         for module_version in self.get_versions(include_beta=True, include_unpublished=True):
             module_version.delete()
 
+        # Delete download rollups for module provider
+        terrareg.analytics.AnalyticsEngine.delete_analytics_for_module_provider(self)
+
         terrareg.audit.AuditEvent.create_audit_event(
             action=terrareg.audit_action.AuditAction.MODULE_PROVIDER_DELETE,
             object_type=self.__class__.__name__,
@@ -2228,6 +2435,8 @@ class ModuleProvider(object):
                 # during normal conditions
                 print(f'An error occured when attempting to remove module provider directory: {str(exc)}')
 
+        terrareg.module_search.ModuleSearchIndex.delete_module_provider(self.pk)
+
         with db.get_connection() as conn:
             # Delete module from module_version table
             delete_statement = db.module_provider.delete().where(
@@ -2235,6 +2444,10 @@ class ModuleProvider(object):
             )
             conn.execute(delete_statement)
 
+        self._cache_db_row = None
+        self._cache_latest_version = None
+        RequestRowCache.clear()
+
     def get_git_provider(self):
         """Return the git provider associated with this module provider."""
         if self._get_db_row()['git_provider_id']:
@@ -2268,6 +2481,10 @@ class ModuleProvider(object):
 
     def update_attributes(self, **kwargs):
         """Update DB row."""
+        # Obtain ID before updating, as changes to names
+        # will prevent the row from being obtained afterwards
+        pk = self.pk
+
         db = Database.get()
         update = self.get_db_where(
             db=db, statement=db.module_provider.update()
@@ -2276,7 +2493,13 @@ class ModuleProvider(object):
             conn.execute(update)
 
         # Remove cached DB row
+        RequestRowCache.invalidate(self._row_cache_key)
         self._cache_db_row = None
+        self._cache_latest_version = None
+
+        # Update search index, if any searchable attributes have changed
+        if set(kwargs).intersection(['namespace_id', 'module', 'provider', 'verified', 'latest_version_id']):
+            terrareg.module_search.ModuleSearchIndex.update_module_provider(pk)
 
     def update_verified(self, verified):
         """Update verified flag of module provider."""
@@ -2557,6 +2780,9 @@ class ModuleProvider(object):
 
     def get_latest_version(self):
         """Return latest published version of module."""
+        if self._cache_latest_version is not None:
+            return self._cache_latest_version
+
         db = Database.get()
         select = sqlalchemy.select(db.module_version.c.version).select_from(db.module_provider).join(
             db.module_version,
@@ -2640,6 +2866,59 @@ class ModuleProvider(object):
         )
         return module_versions
 
+    def get_git_tag_refs(self):
+        """Return refs of all tags in git repository."""
+        git_url = self.get_git_clone_url()
+
+        # Copy current environment variables to add GIT SSH option
+        env = os.environ.copy()
+        # Set SSH to auto-accept new host keys
+        env['GIT_SSH_COMMAND'] = 'ssh -o StrictHostKeyChecking=accept-new'
+
+        try:
+            # Obtain tags from mirror, if enabled, so that the mirror
+            # is updated once for subsequent imports of the tags
+            if GitMirrorCache.is_enabled(git_url=git_url):
+                return GitMirrorCache.get_tag_refs(git_url=git_url, env=env, timeout=terrareg.config.Config().GIT_CLONE_TIMEOUT)
+
+            output = subprocess.check_output(
+                ['git', 'ls-remote', '--tags', '--refs', git_url],
+                stderr=subprocess.STDOUT,
+                env=env,
+                timeout=terrareg.config.Config().GIT_CLONE_TIMEOUT
+            )
+        except subprocess.CalledProcessError as exc:
+            error = 'Unknown error occurred whilst obtaining git tags'
+            for line in exc.output.decode('utf-8').split('\n'):
+                if line.startswith('fatal:'):
+                    error = 'Error occurred whilst obtaining git tags: {}'.format(line)
+            raise GitCloneError(error)
+
+        return [
+            line.split('\t', 1)[1]
+            for line in output.decode('utf-8').split('\n')
+            if '\t' in line
+        ]
+
+    def get_unindexed_git_tag_versions(self):
+        """
+        Return versions of git tags that match the git tag format and have not been indexed.
+
+        Returns list of tuples of version and tag, in ascending version order.
+        """
+        indexed_versions = set(
+            module_version.version
+            for module_version in self.get_versions(include_beta=True, include_unpublished=True)
+        )
+
+        tag_versions = {}
+        for tag_ref in self.get_git_tag_refs():
+            version = self.get_version_from_tag_ref(tag_ref)
+            if version and version not in indexed_versions:
+                tag_versions[version] = tag_ref[len('refs/tags/'):]
+
+        return sorted(tag_versions.items(), key=lambda x: LooseVersion(x[0]))
+
     def get_api_outline(self):
         """Return dict of basic provider details for API response."""
         return {
@@ -2888,18 +3167,63 @@ module "{self.module_version.module_provider.module.name}" {{
             if module_details:
                 raw_json = Database.decode_blob(module_details.terraform_docs)
                 if raw_json:
-                    module_specs = json.loads(raw_json)
+                    # Parsed specs are shared between instances, keyed by the module details
+                    # and a hash of the terraform-docs output, to guard against re-use of IDs
+                    # by other processes
+                    cache_key = (module_details.pk, hashlib.sha1(raw_json.encode('utf-8')).digest())
+                    module_specs = ModuleSpecsCache.get(cache_key)
+                    if module_specs is None:
+                        module_specs = json.loads(raw_json)
+                        ModuleSpecsCache.set(cache_key, module_specs, len(raw_json))
             self._module_specs = module_specs
         return self._module_specs
 
+    def _get_readme_html_render_context(self):
+        """Return module version attributes and configuration used when replacing example sources in README"""
+        module_version = self.module_version
+        config = terrareg.config.Config()
+        published_at = module_version._get_db_row()['published_at']
+        return {
+            'module_provider_id': module_version.module_provider.id,
+            'version': module_version.version,
+            # Identifies the extraction of the module version
+            'published_at': published_at.isoformat() if published_at else None,
+            'published': module_version.published,
+            'beta': module_version.beta,
+            'is_latest_version': module_version.is_latest_version,
+            'public_url': config.PUBLIC_URL,
+            'domain_name': config.DOMAIN_NAME,
+            'example_analytics_token': None if config.DISABLE_ANALYTICS else config.EXAMPLE_ANALYTICS_TOKEN,
+            'example_version_template': config.TERRAFORM_EXAMPLE_VERSION_TEMPLATE,
+        }
+
     def get_readme_html(self, server_hostname):
         """Replace examples in README and convert readme markdown to HTML"""
+        module_details = self.module_details
+        cache_key = None
+        # The request hostname is only used in the README when no public URL
+        # or domain name is configured. Entries for hostnames provided by requests
+        # are only held in memory, so that arbitrary Host headers
+        # cannot create unbounded entries in the data directory.
+        _, configured_domain, _ = get_public_url_details()
+        if module_details and ReadmeHtmlCache.is_enabled():
+            cache_key = ReadmeHtmlCache.get_key(
+                server_hostname=configured_domain or server_hostname,
+                render_context=self._get_readme_html_render_context()
+            )
+            readme_html = ReadmeHtmlCache.get(module_details.pk, cache_key)
+            if readme_html is not None:
+                return readme_html
+
         readme_md = self.get_readme_content(sanitise=False)
         if readme_md:
             readme_md = self.replace_source_in_file(
                 readme_md, server_hostname)
             readme_html = convert_markdown_to_html(file_name='README.md', markdown_html=readme_md)
-            return sanitise_html_content(readme_html, allow_markdown_html=True)
+            readme_html = sanitise_html_content(readme_html, allow_markdown_html=True)
+            if cache_key:
+                ReadmeHtmlCache.set(module_details.pk, cache_key, readme_html, persist=bool(configured_domain))
+            return readme_html
         return None
 
     @property
@@ -3253,6 +3577,27 @@ class ModuleVersion(TerraformSpecsObject):
         """Return name of the archive file"""
         return '{0}.zip'.format(self.source_file_prefix)
 
+    @property
+    def archive_key_prefix(self):
+        """Return key of module version directory in artifact storage."""
+        return '/'.join([
+            'modules',
+            self._module_provider._module._namespace.name,
+            self._module_provider._module.name,
+            self._module_provider.name,
+            self._version
+        ])
+
+    @property
+    def archive_key_tar_gz(self):
+        """Return key of the archive file in artifact storage."""
+        return '{0}/{1}'.format(self.archive_key_prefix, self.archive_name_tar_gz)
+
+    @property
+    def archive_key_zip(self):
+        """Return key of the archive file in artifact storage."""
+        return '{0}/{1}'.format(self.archive_key_prefix, self.archive_name_zip)
+
     @property
     def archive_path_tar_gz(self):
         """Return full path of the archive file."""
@@ -3263,6 +3608,16 @@ class ModuleVersion(TerraformSpecsObject):
         """Return full path of the archive file."""
         return safe_join_paths(self.base_directory, self.archive_name_zip)
 
+    @property
+    def archive_sha256(self):
+        """Return SHA-256 digest of zip archive, if it has been generated."""
+        return self._get_db_row()['archive_sha256']
+
+    @property
+    def archive_size(self):
+        """Return size of zip archive, if it has been generated."""
+        return self._get_db_row()['archive_size']
+
     @property
     def beta(self):
         """Return whether module version is a beta version."""
@@ -3407,14 +3762,29 @@ class ModuleVersion(TerraformSpecsObject):
         self._cache_db_row = None
         super(ModuleVersion, self).__init__()
 
+    @classmethod
+    def _from_db_row(cls, module_provider, row):
+        """Create module version object from pre-fetched database row."""
+        module_version = cls(module_provider=module_provider, version=row['version'])
+        module_version._cache_db_row = row
+        return module_version
+
     def __eq__(self, __o):
         """Check if two module versions are the same"""
         if isinstance(__o, self.__class__):
             return self.pk == __o.pk
         return super(ModuleVersion, self).__eq__(__o)
 
+    @property
+    def _row_cache_key(self):
+        """Return key for request row cache."""
+        return ('module_version', self._module_provider.pk, self._version)
+
     def _get_db_row(self):
         """Get object from database"""
+        if self._cache_db_row is None:
+            self._cache_db_row = RequestRowCache.get(self._row_cache_key)
+
         if self._cache_db_row is None:
             db = Database.get()
             select = db.module_version.select().join(
@@ -3426,6 +3796,7 @@ class ModuleVersion(TerraformSpecsObject):
             with db.get_connection() as conn:
                 res = conn.execute(select)
                 self._cache_db_row = res.fetchone()
+            RequestRowCache.set(self._row_cache_key, self._cache_db_row)
         return self._cache_db_row
 
     def get_terraform_example_version_string(self):
@@ -3776,6 +4147,11 @@ class ModuleVersion(TerraformSpecsObject):
 
         # Clear cached DB row
         self._cache_db_row = None
+        RequestRowCache.invalidate(self._row_cache_key)
+
+        # Update search index, if any searchable attributes have changed
+        if set(kwargs).intersection(['description', 'owner', 'published', 'beta', 'internal']):
+            terrareg.module_search.ModuleSearchIndex.update_module_provider(self._module_provider.pk)
 
     def delete(self, delete_related_analytics=True):
         """Delete module version and all associated submodules."""
@@ -3804,21 +4180,10 @@ class ModuleVersion(TerraformSpecsObject):
         )
 
         # Delete archives for module version and version directory
-        if os.path.isfile(self.archive_path_tar_gz):
-            os.unlink(self.archive_path_tar_gz)
-        if os.path.isfile(self.archive_path_zip):
-            os.unlink(self.archive_path_zip)
-        if os.path.isdir(self.base_directory):
-            try:
-                os.rmdir(self.base_directory)
-            except OSError as exc:
-                # Handle OSError which can be caused when
-                # files that are not managed by Terrareg
-                # exist in the module version data directory.
-                # This is safer than forcefully deleting
-                # all data in the directory and should not happen
-                # during normal conditions
-                print(f'An error occured when attempting to remove module provider directory: {str(exc)}')
+        artifact_storage = BaseArtifactStorage.get()
+        artifact_storage.delete(self.archive_key_tar_gz)
+        artifact_storage.delete(self.archive_key_zip)
+        artifact_storage.delete_directory(self.archive_key_prefix)
 
         with db.get_connection() as conn:
             # Delete module from module_version table
@@ -3829,6 +4194,7 @@ class ModuleVersion(TerraformSpecsObject):
 
             # Invalidate cache for previous DB row
             self._cache_db_row = None
+            RequestRowCache.clear()
 
         # Update latest version of parent module
         new_latest_version = self._module_provider.calculate_latest_version()
@@ -0,0 +1,262 @@
+"""Provide generation of source archives for module versions."""
+
+import contextlib
+import gzip
+import hashlib
+import os
+import stat
+import tarfile
+import zipfile
+
+from terrareg.config import Config
+
+
+class ArchiveFormat:
+    """Archive formats that can be generated"""
+
+    ZIP = 'zip'
+    TAR_GZ = 'tar.gz'
+
+
+class ArchiveDigest:
+    """SHA-256 digest and size of generated archive"""
+
+    def __init__(self, sha256, size):
+        """Store member variables."""
+        self.sha256 = sha256
+        self.size = size
+
+
+class _DigestWriter:
+    """
+    Non-seekable file wrapper that calculates the digest and
+    size of all data written to the file.
+    """
+
+    def __init__(self, fh):
+        """Store member variables."""
+        self._fh = fh
+        self._hash = hashlib.sha256()
+        self._size = 0
+
+    def write(self, data):
+        """Write data to file, updating digest."""
+        self._fh.write(data)
+        self._hash.update(data)
+        self._size += len(data)
+        return len(data)
+
+    def tell(self):
+        """Return position in file"""
+        return self._size
+
+    def flush(self):
+        """Flush file"""
+        self._fh.flush()
+
+    def get_digest(self):
+        """Return digest of data written"""
+        return ArchiveDigest(sha256=self._hash.hexdigest(), size=self._size)
+
+
+class _TeeReader:
+    """File wrapper that writes all data read from the file to a second file object."""
+
+    def __init__(self, fh, tee_fh):
+        """Store member variables."""
+        self._fh = fh
+        self._tee_fh = tee_fh
+
+    def read(self, size=-1):
+        """Read from file, writing data to tee file object."""
+        data = self._fh.read(size)
+        if data and self._tee_fh is not None:
+            self._tee_fh.write(data)
+        return data
+
+
+class ModuleArchiveGenerator:
+    """
+    Generate zip and tar.gz archives of a directory in a single walk,
+    reading each file once and writing it to all requested archives.
+
+    Entries are added in sorted order with fixed timestamps, ownership and
+    normalised permissions, so that archives of identical content are identical.
+    """
+
+    # Top-level directories that are not included in archives
+    EXCLUDED_DIRECTORIES = ['.git']
+
+    # Timestamp of all archive entries (1980-01-01, the earliest date supported by zip)
+    ENTRY_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+    ENTRY_MTIME = 315532800
+
+    # Size of chunks read from files
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, source_directory, compression_level=None):
+        """Store member variables."""
+        self._source_directory = source_directory
+        self._compression_level = (
+            Config().MODULE_ARCHIVE_COMPRESSION_LEVEL
+            if compression_level is None else
+            compression_level
+        )
+
+    def _get_entries(self, directory=None, relative_directory=''):
+        """Yield tuples of relative path and lstat result of all entries, in sorted order."""
+        directory = self._source_directory if directory is None else directory
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        for entry in entries:
+            relative_path = f'{relative_directory}{entry.name}'
+            if not relative_directory and entry.name in self.EXCLUDED_DIRECTORIES:
+                continue
+
+            entry_stat = entry.stat(follow_symlinks=False)
+            yield relative_path, entry_stat
+
+            if stat.S_ISDIR(entry_stat.st_mode):
+                yield from self._get_entries(entry.path, f'{relative_path}/')
+
+    @staticmethod
+    def _get_mode(entry_stat):
+        """Return normalised permissions of entry"""
+        if stat.S_ISDIR(entry_stat.st_mode) or entry_stat.st_mode & stat.S_IXUSR:
+            return 0o755
+        return 0o644
+
+    def _get_tar_info(self, relative_path, entry_stat):
+        """Return tar header for entry"""
+        tar_info = tarfile.TarInfo(name=relative_path)
+        tar_info.mtime = self.ENTRY_MTIME
+        tar_info.uid = tar_info.gid = 0
+        tar_info.uname = tar_info.gname = ''
+        tar_info.mode = self._get_mode(entry_stat)
+        return tar_info
+
+    def _get_zip_info(self, relative_path, entry_stat):
+        """Return zip header for entry"""
+        zip_info = zipfile.ZipInfo(filename=relative_path, date_time=self.ENTRY_DATE_TIME)
+        zip_info.compress_type = zipfile.ZIP_DEFLATED
+        # ZipFile.open does not apply the compression level of the ZipFile
+        # to provided ZipInfo objects. The attribute is public from Python 3.13,
+        # before which it is only available as a private attribute.
+        if hasattr(zip_info, 'compress_level'):
+            zip_info.compress_level = self._compression_level
+        else:
+            zip_info._compresslevel = self._compression_level
+        zip_info.external_attr = (stat.S_IFREG | self._get_mode(entry_stat)) << 16
+        return zip_info
+
+    def _resolve_symlink(self, path):
+        """Return real path of symlink target, if it is a file within the source directory."""
+        real_path = os.path.realpath(path)
+        real_source_directory = os.path.realpath(self._source_directory)
+        if real_path.startswith(f'{real_source_directory}{os.sep}') and os.path.isfile(real_path):
+            return real_path
+        return None
+
+    def _add_entry(self, relative_path, entry_stat, tar, zip_file):
+        """Add entry to archives"""
+        path = os.path.join(self._source_directory, relative_path)
+
+        if stat.S_ISDIR(entry_stat.st_mode):
+            if tar is not None:
+                tar_info = self._get_tar_info(relative_path, entry_stat)
+                tar_info.type = tarfile.DIRTYPE
+                tar.addfile(tar_info)
+            if zip_file is not None:
+                zip_info = self._get_zip_info(f'{relative_path}/', entry_stat)
+                zip_info.compress_type = zipfile.ZIP_STORED
+                zip_info.external_attr = (stat.S_IFDIR | 0o755) << 16 | 0x10
+                zip_file.writestr(zip_info, b'')
+
+        elif stat.S_ISLNK(entry_stat.st_mode):
+            # Symlinks are retained in tar archives. Zip archives contain the
+            # content of the target file, as zip consumers do not support symlinks
+            if tar is not None:
+                tar_info = self._get_tar_info(relative_path, entry_stat)
+                tar_info.type = tarfile.SYMTYPE
+                tar_info.linkname = os.readlink(path)
+                tar.addfile(tar_info)
+            if zip_file is not None and (target_path := self._resolve_symlink(path)):
+                target_stat = os.stat(target_path)
+                zip_info = self._get_zip_info(relative_path, target_stat)
+                zip_info.file_size = target_stat.st_size
+                with open(target_path, 'rb') as source_fh, zip_file.open(zip_info, 'w') as zip_fh:
+                    while data := source_fh.read(self.CHUNK_SIZE):
+                        zip_fh.write(data)
+
+        elif stat.S_ISREG(entry_stat.st_mode):
+            zip_info = None
+            if zip_file is not None:
+                zip_info = self._get_zip_info(relative_path, entry_stat)
+                zip_info.file_size = entry_stat.st_size
+
+            with open(path, 'rb') as source_fh, \
+                    (zip_file.open(zip_info, 'w') if zip_file is not None else contextlib.nullcontext()) as zip_fh:
+                if tar is not None:
+                    # Write file content to zip whilst tar reads it
+                    tar_info = self._get_tar_info(relative_path, entry_stat)
+                    tar_info.size = entry_stat.st_size
+                    tar.addfile(tar_info, fileobj=_TeeReader(source_fh, zip_fh))
+                else:
+                    while data := source_fh.read(self.CHUNK_SIZE):
+                        zip_fh.write(data)
+
+    def generate(self, zip_path=None, tar_gz_path=None):
+        """
+        Generate archives of source directory.
+
+        Archives are generated for each path that is provided and are
+        written to a temporary file before being moved into place.
+
+        Returns dict of ArchiveDigest for each generated archive format.
+        """
+        if not zip_path and not tar_gz_path:
+            return {}
+
+        temp_paths = {}
+        digest_writers = {}
+        try:
+            with contextlib.ExitStack() as stack:
+                tar = None
+                zip_file = None
+                if tar_gz_path:
+                    temp_paths[tar_gz_path] = f'{tar_gz_path}.tmp'
+                    digest_writers[ArchiveFormat.TAR_GZ] = _DigestWriter(
+                        stack.enter_context(open(temp_paths[tar_gz_path], 'wb'))
+                    )
+                    gzip_fh = stack.enter_context(gzip.GzipFile(
+                        filename='', mode='wb', fileobj=digest_writers[ArchiveFormat.TAR_GZ],
+                        compresslevel=self._compression_level, mtime=0
+                    ))
+                    tar = stack.enter_context(tarfile.open(fileobj=gzip_fh, mode='w', format=tarfile.PAX_FORMAT))
+                if zip_path:
+                    temp_paths[zip_path] = f'{zip_path}.tmp'
+                    digest_writers[ArchiveFormat.ZIP] = _DigestWriter(
+                        stack.enter_context(open(temp_paths[zip_path], 'wb'))
+                    )
+                    # As the digest writer is not seekable, entry sizes are written
+                    # after the content of each entry, rather than updating headers
+                    zip_file = stack.enter_context(zipfile.ZipFile(
+                        digest_writers[ArchiveFormat.ZIP], 'w', zipfile.ZIP_DEFLATED,
+                        compresslevel=self._compression_level
+                    ))
+
+                for relative_path, entry_stat in self._get_entries():
+                    self._add_entry(relative_path, entry_stat, tar=tar, zip_file=zip_file)
+
+            for path, temp_path in temp_paths.items():
+                os.replace(temp_path, path)
+        finally:
+            for temp_path in temp_paths.values():
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+
+        return {
+            archive_format: digest_writer.get_digest()
+            for archive_format, digest_writer in digest_writers.items()
+        }
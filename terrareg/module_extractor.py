@@ -1,16 +1,19 @@
 """Provide extraction method of modules."""
 
+import concurrent.futures
+import contextlib
 from contextlib import contextmanager
 import os
+import shutil
 import threading
 from typing import Type
 import tempfile
 import uuid
 import zipfile
-import tarfile
 import subprocess
 import json
 import datetime
+import fcntl
 import re
 import glob
 import pathlib
@@ -34,25 +37,53 @@ from terrareg.errors import (
 from terrareg.utils import PathDoesNotExistError, get_public_url_details, safe_iglob, safe_join_paths
 from terrareg.config import Config
 from terrareg.constants import EXTRACTION_VERSION
+from terrareg.extraction_cache import ExtractionCache
+from terrareg.git_mirror import GitMirrorCache
+from terrareg.module_archive import ArchiveFormat, ModuleArchiveGenerator
+from terrareg.artifact_storage import BaseArtifactStorage
 
 
 class ModuleExtractor:
     """Provide extraction method of modules."""
 
     TERRAREG_METADATA_FILES = ['terrareg.json', '.terrareg.json']
-    TERRAFORM_LOCK = threading.Lock()
+    # Lock held whilst tfswitch installs/resolves Terraform versions,
+    # as tfswitch is not safe to run concurrently
+    TFSWITCH_LOCK = threading.Lock()
+    # Lock held whilst running terraform init, as the shared
+    # plugin cache directory is not safe for concurrent use
+    TERRAFORM_INIT_LOCK = threading.Lock()
 
     def __init__(self, module_version: ModuleVersion):
         """Create temporary directories and store member variables."""
         self._module_version = module_version
         self._extract_directory = tempfile.TemporaryDirectory()  # noqa: R1732
         self._upload_directory = tempfile.TemporaryDirectory()  # noqa: R1732
+        # Terraform binary selected for the current thread by _switch_terraform_versions
+        self._terraform_binary_state = threading.local()
 
     @property
     def terraform_binary(self):
-        """Return path of terraform binary"""
+        """Return path of terraform binary for the current thread"""
+        terraform_binary = getattr(self._terraform_binary_state, 'path', None)
+        if terraform_binary:
+            return terraform_binary
         return os.path.join(os.getcwd(), "bin", "terraform")
 
+    @property
+    def terraform_binary_version(self):
+        """Return version of terraform binary selected for the current thread, if one has been selected"""
+        terraform_binary = getattr(self._terraform_binary_state, 'path', None)
+        if terraform_binary:
+            # Binaries in the Terraform binary cache are stored in a directory for each version
+            return os.path.basename(os.path.dirname(terraform_binary))
+        return None
+
+    @staticmethod
+    def get_terraform_binary_cache_directory():
+        """Return directory containing Terraform binaries for each version"""
+        return os.path.join(os.getcwd(), "bin", "terraform-versions")
+
     @property
     def terraform_rc_file(self):
         """Return path to terraformrc file"""
@@ -106,42 +137,86 @@ class ModuleExtractor:
 
         return json.loads(terradocs_output)
 
-    @contextmanager
-    def _switch_terraform_versions(self, module_path):
-        """Switch terraform to required version for module"""
-        # Wait for global lock on terraform, so that only
-        # instance can run terraform at a time
-        if not ModuleExtractor.TERRAFORM_LOCK.acquire(blocking=True, timeout=60):
-            raise UnableToGetGlobalTerraformLockError(
-                "Unable to obtain global Terraform lock in 60 seconds"
-            )
+    @staticmethod
+    def _get_terraform_binary_version(terraform_binary):
+        """Return version of Terraform binary"""
+        version_output = subprocess.check_output([terraform_binary, "-version", "-json"]).decode("utf-8")
         try:
-            default_terraform_version = Config().DEFAULT_TERRAFORM_VERSION
-            tfswitch_env = os.environ.copy()
+            version = json.loads(version_output)["terraform_version"]
+        except (ValueError, KeyError):
+            # Terraform versions before 0.13 do not support JSON output
+            version_match = re.match(r"^Terraform v(\S+)", version_output)
+            version = version_match.group(1) if version_match else None
+
+        if not version or not re.match(r"^[0-9a-zA-Z.+-]+$", version):
+            raise TerraformVersionSwitchError("Unable to determine version of Terraform binary")
+        return version
+
+    def _install_terraform_version(self, module_path):
+        """
+        Use tfswitch to obtain the required Terraform version for the module,
+        returning path of immutable binary for the version in the Terraform binary cache.
+        """
+        default_terraform_version = Config().DEFAULT_TERRAFORM_VERSION
+        tfswitch_env = os.environ.copy()
+
+        if default_terraform_version:
+            tfswitch_env["TF_VERSION"] = default_terraform_version
+
+        cache_directory = self.get_terraform_binary_cache_directory()
+        os.makedirs(cache_directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(dir=cache_directory, prefix=".tfswitch-") as tfswitch_directory:
+            tfswitch_binary = os.path.join(tfswitch_directory, "terraform")
+
+            # Wait for lock on tfswitch, as only one instance can
+            # install Terraform versions at a time
+            if not ModuleExtractor.TFSWITCH_LOCK.acquire(blocking=True, timeout=60):
+                raise UnableToGetGlobalTerraformLockError(
+                    "Unable to obtain global Terraform lock in 60 seconds"
+                )
+            try:
+                # Run tfswitch
+                try:
+                    subprocess.check_output(
+                        ["tfswitch", "--mirror", Config().TERRAFORM_ARCHIVE_MIRROR, "--bin", tfswitch_binary],
+                        env=tfswitch_env,
+                        cwd=module_path
+                    )
+                    version = self._get_terraform_binary_version(tfswitch_binary)
+                except subprocess.CalledProcessError as exc:
+                    print("An error occured whilst running tfswitch:", str(exc))
+                    raise TerraformVersionSwitchError(
+                        "An error occurred whilst initialising Terraform version" +
+                        (f": {str(exc)}: {exc.output.decode('utf-8')}" if Config().DEBUG else "")
+                    )
+            finally:
+                ModuleExtractor.TFSWITCH_LOCK.release()
 
-            if default_terraform_version:
-                tfswitch_env["TF_VERSION"] = default_terraform_version
+            # Add binary to cache, if the version is not already present,
+            # moving into place so that a partially copied binary is never used
+            terraform_binary = os.path.join(cache_directory, version, "terraform")
+            if not os.path.isfile(terraform_binary):
+                os.makedirs(os.path.dirname(terraform_binary), exist_ok=True)
+                temp_binary = os.path.join(tfswitch_directory, "terraform-copy")
+                shutil.copy2(tfswitch_binary, temp_binary)
+                os.replace(temp_binary, terraform_binary)
 
-            # Run tfswitch
-            try:
-                subprocess.check_output(
-                    ["tfswitch", "--mirror", Config().TERRAFORM_ARCHIVE_MIRROR, "--bin", self.terraform_binary],
-                    env=tfswitch_env,
-                    cwd=module_path
-                )
-            except subprocess.CalledProcessError as exc:
-                print("An error occured whilst running tfswitch:", str(exc))
-                raise TerraformVersionSwitchError(
-                    "An error occurred whilst initialising Terraform version" +
-                    (f": {str(exc)}: {exc.output.decode('utf-8')}" if Config().DEBUG else "")
-                )
+        return terraform_binary
 
+    @contextmanager
+    def _switch_terraform_versions(self, module_path):
+        """Select terraform binary of required version for module, for the current thread"""
+        previous_terraform_binary = getattr(self._terraform_binary_state, 'path', None)
+        self._terraform_binary_state.path = self._install_terraform_version(module_path)
+        try:
             yield
         finally:
-            ModuleExtractor.TERRAFORM_LOCK.release()
+            self._terraform_binary_state.path = previous_terraform_binary
 
-    def _run_tfsec(self, module_path):
-        """Run tfsec and return output."""
+    def _run_tfsec(self, module_path, base_directory=None):
+        """Run tfsec and return output, with paths relative to base directory (defaults to extract directory)."""
+        base_directory = self._extract_directory.name if base_directory is None else base_directory
         try:
             raw_output = subprocess.check_output([
                 'tfsec',
@@ -160,7 +235,7 @@ class ModuleExtractor:
         # Strip the extraction directory from all paths in results
         if tfsec_results['results']:
             for result in tfsec_results['results']:
-                result['location']['filename'] = result['location']['filename'].replace(self._extract_directory.name, '')
+                result['location']['filename'] = result['location']['filename'].replace(base_directory, '')
                 # Replace leading slash if it exists in filename
                 if result['location']['filename'].startswith('/'):
                     result['location']['filename'] = result['location']['filename'][1:]
@@ -192,8 +267,12 @@ credentials "{domain_name}" {{
   token = "{config.INTERNAL_EXTRACTION_ANALYTICS_TOKEN}"
 }}
 """
-            with open(self.terraform_rc_file, "w") as terraform_rc_fh:
+            # Write to temporary file and move into place, as the file
+            # may be read by concurrently running terraform processes
+            temp_terraform_rc_file = f"{self.terraform_rc_file}.{uuid.uuid4().hex}"
+            with open(temp_terraform_rc_file, "w") as terraform_rc_fh:
                 terraform_rc_fh.write(terraform_rc_file_content)
+            os.replace(temp_terraform_rc_file, self.terraform_rc_file)
 
     def _override_tf_backend(self, module_path):
         """Attempt to find any files that set terraform backend and create override"""
@@ -224,13 +303,30 @@ terraform {{
     """)
         return override_filename
 
+    @contextmanager
+    def _lock_terraform_init(self):
+        """
+        Obtain lock for running terraform init, between threads and processes,
+        so that only one terraform init uses the plugin cache directory at a time.
+        """
+        with ModuleExtractor.TERRAFORM_INIT_LOCK:
+            lock_directory = os.path.join(os.path.expanduser('~'), '.terraform.d')
+            os.makedirs(lock_directory, exist_ok=True)
+            with open(os.path.join(lock_directory, 'plugin-cache.lock'), 'w') as lock_fh:
+                fcntl.flock(lock_fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
     def _run_tf_init(self, module_path):
         """Perform terraform init"""
         self._create_terraform_rc_file()
         self._override_tf_backend(module_path=module_path)
 
         try:
-            subprocess.check_call([self.terraform_binary, "init"], cwd=module_path)
+            with self._lock_terraform_init():
+                subprocess.check_call([self.terraform_binary, "init"], cwd=module_path)
         except subprocess.CalledProcessError:
             return False
         return True
@@ -344,36 +440,27 @@ terraform {{
                 module_version_file.update_attributes(content=file_content)
 
     def _generate_archive(self):
-        """Generate archive of extracted module"""
-        # Create data directory path.
-        # This should have been created during namespace, module, version creation,
-        # however, in situations where the users do not use/care about generated archives
-        # and DELETE_EXTERNALLY_HOSTED_ARTIFACTS has not been disabled and
-        # the data directory has not been mounted outside of ephemeral storage,
-        # the parent directories may have been lost
-        os.makedirs(self._module_version.base_directory, exist_ok=True)
-
-        def tar_filter(tarinfo):
-            """Filter files being added to tar archive"""
-            # Do not include .git directory in archive
-            if tarinfo.name == ".git":
-                return None
-            return tarinfo
-
-        # Create tar.gz
-        with tarfile.open(self._module_version.archive_path_tar_gz, "w:gz") as tar:
-            tar.add(self.extract_directory, arcname='', recursive=True, filter=tar_filter)
-
-        # Create zip
-        # Use 'cwd' to ensure zip file is generated with directory structure
-        # from the root of the module.
-        # Use subprocess to execute zip, rather than shutil.make_archive,
-        # as make_archive is not thread-safe and changes the CWD of the main
-        # process.
-        # Exclude .git directory from archive
-        subprocess.call(
-            ['zip', '-r', self._module_version.archive_path_zip, '--exclude=./.git/*', '.'],
-            cwd=self.extract_directory
+        """Generate archive of extracted module and store in artifact storage"""
+        archive_formats = Config().MODULE_ARCHIVE_FORMATS
+        artifact_storage = BaseArtifactStorage.get()
+        with contextlib.ExitStack() as stack:
+            zip_path = None
+            if ArchiveFormat.ZIP in archive_formats:
+                zip_path = stack.enter_context(artifact_storage.write_path(self._module_version.archive_key_zip))
+            tar_gz_path = None
+            if ArchiveFormat.TAR_GZ in archive_formats:
+                tar_gz_path = stack.enter_context(artifact_storage.write_path(self._module_version.archive_key_tar_gz))
+
+            digests = ModuleArchiveGenerator(source_directory=self.extract_directory).generate(
+                zip_path=zip_path,
+                tar_gz_path=tar_gz_path
+            )
+
+        # Store digest of zip archive, which is served by the source download endpoint
+        zip_digest = digests.get(ArchiveFormat.ZIP)
+        self._module_version.update_attributes(
+            archive_sha256=zip_digest.sha256 if zip_digest else None,
+            archive_size=zip_digest.size if zip_digest else None
         )
 
     def _create_module_details(self, readme_content, terraform_docs, tfsec, terraform_graph, terraform_modules, terraform_version, infracost=None):
@@ -388,6 +475,14 @@ terraform {{
             terraform_version=terraform_version,
             terraform_modules=terraform_modules
         )
+
+        # Pre-compute graph JSON, so that it is not generated when graphs are viewed
+        if terraform_graph:
+            try:
+                module_details.update_graph_json()
+            except Exception as exc:
+                print(f'Failed to generate graph JSON: {exc}')
+
         return module_details
 
     def _insert_database(
@@ -429,57 +524,220 @@ terraform {{
             extraction_version=EXTRACTION_VERSION
         )
 
-    def _process_submodule(self, submodule: BaseSubmodule):
-        """Process submodule."""
-        submodule_dir = safe_join_paths(self.module_directory, submodule.path)
+    def _run_terraform_analysis(self, module_path: str):
+        """Run terraform init and obtain graph, modules and version, using the selected Terraform binary."""
+        terraform_graph = None
+        terraform_modules = None
+        terraform_version = None
+        if self._run_tf_init(module_path):
+            terraform_graph = self._get_graph_data(module_path)
+            terraform_modules = self._get_terraform_modules(module_path)
+            terraform_version = self._get_terraform_version(module_path)
+
+        return {
+            'terraform_graph': terraform_graph,
+            'terraform_modules': terraform_modules,
+            'terraform_version': terraform_version
+        }
+
+    def _run_cached_analysis(self, directory: str, base_directory: str, include_infracost: bool, analysis_function):
+        """
+        Run analysis function and Terraform analysis for directory, returning previous
+        results for identical content, if extraction caching is enabled.
+
+        Results of Terraform analysis are not cached for directories using remote modules,
+        as these are obtained by terraform init and may change without the directory changing.
+        """
+        with self._switch_terraform_versions(directory):
+            cache_key = None
+            cache_terraform_analysis = False
+            if ExtractionCache.is_enabled():
+                # Obtain key before performing analysis, as
+                # analysis may modify files in the directory
+                cache_key = ExtractionCache.get_key(
+                    directory=directory,
+                    base_directory=base_directory,
+                    include_infracost=include_infracost,
+                    terraform_version=self.terraform_binary_version
+                )
+                cache_terraform_analysis = not ExtractionCache.has_remote_modules(
+                    directory=directory,
+                    base_directory=base_directory
+                )
+                if cache_key and (analysis := ExtractionCache.get(cache_key)) is not None:
+                    if cache_terraform_analysis:
+                        return analysis
+                    return dict(analysis, **self._run_terraform_analysis(directory))
+
+            analysis = analysis_function()
+            terraform_analysis = self._run_terraform_analysis(directory)
+
+            if cache_key:
+                ExtractionCache.set(
+                    cache_key,
+                    dict(analysis, **terraform_analysis) if cache_terraform_analysis else analysis
+                )
+            return dict(analysis, **terraform_analysis)
 
-        # Extract example files before performing
-        # any other analysis, as the analysis may modify
-        # files in the repository, which should not
-        # be present in the stored files in the database
-        if isinstance(submodule, Example):
-            self._extract_example_files(example=submodule)
+    def _analyse_root_module(self):
+        """Run analysis of root module, returning attributes for module details, excluding Terraform analysis."""
+        terraform_docs = self._run_terraform_docs(self.module_directory)
+        tfsec = self._run_tfsec(self.module_directory)
+        readme_content = self._get_readme_content(self.module_directory)
 
+        return {
+            'terraform_docs': terraform_docs,
+            'readme_content': readme_content,
+            'tfsec': tfsec,
+        }
+
+    def _analyse_submodule(self, submodule_path: str, is_example: bool, module_directory: str, base_directory: str=None):
+        """
+        Run analysis of submodule, returning attributes for module details.
+
+        This does not access the database, so may be run in a worker thread.
+        """
+        submodule_dir = safe_join_paths(module_directory, submodule_path)
+        include_infracost = bool(is_example and Config().INFRACOST_API_KEY)
+
+        return self._run_cached_analysis(
+            directory=submodule_dir,
+            base_directory=self.extract_directory if base_directory is None else base_directory,
+            include_infracost=include_infracost,
+            analysis_function=lambda: self._perform_submodule_analysis(
+                submodule_path=submodule_path,
+                submodule_dir=submodule_dir,
+                include_infracost=include_infracost,
+                module_directory=module_directory,
+                base_directory=base_directory
+            )
+        )
+
+    def _perform_submodule_analysis(self, submodule_path: str, submodule_dir: str, include_infracost: bool, module_directory: str, base_directory: str=None):
+        """Run analysis tools, excluding Terraform analysis, against submodule."""
         tf_docs = self._run_terraform_docs(submodule_dir)
-        tfsec = self._run_tfsec(submodule_dir)
+        tfsec = self._run_tfsec(submodule_dir, base_directory=base_directory)
         readme_content = self._get_readme_content(submodule_dir)
 
-        terraform_graph = None
-        terraform_modules = None
-        terraform_version = None
-        with self._switch_terraform_versions(submodule_dir):
-            if self._run_tf_init(submodule_dir):
-                terraform_graph = self._get_graph_data(submodule_dir)
-                terraform_modules = self._get_terraform_modules(submodule_dir)
-                terraform_version = self._get_terraform_version(submodule_dir)
-
         infracost = None
         # Run Infracost on examples, if API key is set
-        if isinstance(submodule, Example) and Config().INFRACOST_API_KEY:
+        if include_infracost:
             try:
-                infracost = self._run_infracost(example=submodule)
+                infracost = self._run_infracost(example_path=submodule_path, module_directory=module_directory)
             except UnableToProcessTerraformError as exc:
                 print('An error occured whilst running infracost against example')
 
-        # Create module details row
-        module_details = self._create_module_details(
-            terraform_docs=tf_docs,
-            readme_content=readme_content,
-            tfsec=tfsec,
-            infracost=infracost,
-            terraform_graph=terraform_graph,
-            terraform_modules=terraform_modules,
-            terraform_version=terraform_version
-        )
+        return {
+            'terraform_docs': tf_docs,
+            'readme_content': readme_content,
+            'tfsec': tfsec,
+            'infracost': infracost,
+        }
+
+    def _insert_submodule_details(self, submodule: BaseSubmodule, analysis: dict):
+        """Create module details row for submodule from analysis."""
+        module_details = self._create_module_details(**analysis)
 
         submodule.update_attributes(
             module_details_id=module_details.pk
         )
 
-    def _run_infracost(self, example: Example):
+    def _process_submodule(self, submodule: BaseSubmodule):
+        """Process submodule."""
+        # Extract example files before performing
+        # any other analysis, as the analysis may modify
+        # files in the repository, which should not
+        # be present in the stored files in the database
+        if isinstance(submodule, Example):
+            self._extract_example_files(example=submodule)
+
+        analysis = self._analyse_submodule(
+            submodule_path=submodule.path,
+            is_example=isinstance(submodule, Example),
+            module_directory=self.module_directory
+        )
+        self._insert_submodule_details(submodule=submodule, analysis=analysis)
+
+    def _copy_module_tree(self, destination: str):
+        """Copy extracted module to destination directory, excluding git and terraform state directories."""
+        shutil.copytree(
+            self.extract_directory, destination,
+            symlinks=True,
+            ignore=shutil.ignore_patterns('.git', '.terraform'),
+            dirs_exist_ok=True
+        )
+
+    def _process_submodules_parallel(self, submodules: list, parallelism: int):
+        """
+        Process submodules using a pool of worker threads.
+
+        Each worker performs analysis in its own copy of the module,
+        so that files generated by terraform do not conflict.
+        Database rows are created by the calling thread, once all analysis
+        has completed, so that they are created in the current transaction.
+        """
+        # Obtain submodule details from the database, as workers
+        # do not have access to the current transaction
+        submodule_details = [
+            (submodule, submodule.path, isinstance(submodule, Example))
+            for submodule in submodules
+        ]
+
+        # Extract example files before performing analysis
+        for submodule, _, is_example in submodule_details:
+            if is_example:
+                self._extract_example_files(example=submodule)
+
+        relative_module_directory = os.path.relpath(self.module_directory, self.extract_directory)
+        worker_state = threading.local()
+        worker_directories = []
+        worker_directories_lock = threading.Lock()
+
+        def analyse_submodule(submodule_path, is_example):
+            """Analyse submodule in worker's copy of the module."""
+            if getattr(worker_state, 'directory', None) is None:
+                worker_directory = tempfile.TemporaryDirectory()  # noqa: R1732
+                with worker_directories_lock:
+                    worker_directories.append(worker_directory)
+                self._copy_module_tree(worker_directory.name)
+                worker_state.directory = worker_directory.name
+
+            return self._analyse_submodule(
+                submodule_path=submodule_path,
+                is_example=is_example,
+                module_directory=os.path.normpath(os.path.join(worker_state.directory, relative_module_directory)),
+                base_directory=worker_state.directory
+            )
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+                futures = [
+                    executor.submit(analyse_submodule, submodule_path, is_example)
+                    for _, submodule_path, is_example in submodule_details
+                ]
+                analysis_results = [future.result() for future in futures]
+        finally:
+            for worker_directory in worker_directories:
+                worker_directory.cleanup()
+
+        for (submodule, _, _), analysis in zip(submodule_details, analysis_results):
+            self._insert_submodule_details(submodule=submodule, analysis=analysis)
+
+    def _process_submodules(self, submodules: list):
+        """Process submodules, in parallel if configured."""
+        parallelism = Config().MODULE_EXTRACTION_PARALLELISM
+        if parallelism > 1 and len(submodules) > 1:
+            self._process_submodules_parallel(submodules=submodules, parallelism=parallelism)
+        else:
+            for submodule in submodules:
+                self._process_submodule(submodule=submodule)
+
+    def _run_infracost(self, example_path: str, module_directory: str=None):
         """Run Infracost to obtain cost of examples."""
+        module_directory = self.module_directory if module_directory is None else module_directory
+
         # Ensure example path is within root module
-        safe_join_paths(self.module_directory, example.path)
+        safe_join_paths(module_directory, example_path)
 
         infracost_env = dict(os.environ)
         _, domain_name, _ = get_public_url_details()
@@ -493,9 +751,9 @@ terraform {{
             output_file.close()
             try:
                 subprocess.check_output(
-                    ['infracost', 'breakdown', '--path', example.path,
+                    ['infracost', 'breakdown', '--path', example_path,
                      '--format', 'json', '--out-file', output_file.name],
-                    cwd=self.module_directory,
+                    cwd=module_directory,
                     env=infracost_env
                 )
             except subprocess.CalledProcessError as exc:
@@ -533,14 +791,14 @@ terraform {{
                 )
 
     def _scan_submodules(self, subdirectory: str, submodule_class: Type[BaseSubmodule]):
-        """Scan for submodules and extract details."""
+        """Scan for submodules, creating and returning submodule objects."""
         try:
             submodule_base_directory = safe_join_paths(self.module_directory, subdirectory, is_dir=True)
         except PathDoesNotExistError:
             # If the modules directory does not exist,
             # ignore and return
             print('No modules directory found')
-            return
+            return []
 
         module_directory_re = re.compile('^{}'.format(
             re.escape(
@@ -568,12 +826,12 @@ terraform {{
             if submodule_name not in submodules:
                 submodules.append(submodule_name)
 
-        # Extract all submodules
-        for submodule_path in submodules:
-            obj = submodule_class.create(
+        return [
+            submodule_class.create(
                 module_version=self._module_version,
                 module_path=submodule_path)
-            self._process_submodule(submodule=obj)
+            for submodule_path in submodules
+        ]
 
     def _extract_description(self, readme_content):
         """Extract description from README"""
@@ -649,18 +907,12 @@ terraform {{
             self._generate_archive()
 
         # Run terraform-docs on module content and obtain README
-        terraform_docs = self._run_terraform_docs(self.module_directory)
-        tfsec = self._run_tfsec(self.module_directory)
-        readme_content = self._get_readme_content(self.module_directory)
-
-        terraform_graph = None
-        terraform_modules = None
-        terraform_version = None
-        with self._switch_terraform_versions(self.module_directory):
-            if self._run_tf_init(self.module_directory):
-                terraform_graph = self._get_graph_data(self.module_directory)
-                terraform_modules = self._get_terraform_modules(self.module_directory)
-                terraform_version = self._get_terraform_version(self.module_directory)
+        analysis = self._run_cached_analysis(
+            directory=self.module_directory,
+            base_directory=self.extract_directory,
+            include_infracost=False,
+            analysis_function=self._analyse_root_module
+        )
 
         # Check for any terrareg metadata files
         terrareg_metadata = self._get_terrareg_metadata(self.module_directory)
@@ -669,27 +921,23 @@ terraform {{
         description = terrareg_metadata.get('description', None)
         if not description:
             # Otherwise, attempt to extract description from README
-            description = self._extract_description(readme_content)
+            description = self._extract_description(analysis['readme_content'])
 
         self._insert_database(
             description=description,
-            readme_content=readme_content,
-            tfsec=tfsec,
-            terraform_docs=terraform_docs,
             terrareg_metadata=terrareg_metadata,
-            terraform_graph=terraform_graph,
-            terraform_modules=terraform_modules,
-            terraform_version=terraform_version
+            **analysis
         )
 
         self._extract_additional_tab_files()
 
-        self._scan_submodules(
+        submodules = self._scan_submodules(
             submodule_class=Submodule,
             subdirectory=Config().MODULES_DIRECTORY)
-        self._scan_submodules(
+        submodules += self._scan_submodules(
             submodule_class=Example,
             subdirectory=Config().EXAMPLES_DIRECTORY)
+        self._process_submodules(submodules=submodules)
 
 
 class ApiUploadModuleExtractor(ModuleExtractor):
@@ -759,16 +1007,25 @@ class GitModuleExtractor(ModuleExtractor):
         git_url = self._module_version._module_provider.get_git_clone_url()
 
         try:
-            subprocess.check_output([
-                    'git', 'clone', '--single-branch',
-                    '--branch', self._module_version.source_git_tag,
-                    git_url,
-                    self.extract_directory
-                ],
-                stderr=subprocess.STDOUT,
-                env=env,
-                timeout=Config().GIT_CLONE_TIMEOUT
-            )
+            if GitMirrorCache.is_enabled(git_url=git_url):
+                GitMirrorCache.clone(
+                    git_url=git_url,
+                    tag=self._module_version.source_git_tag,
+                    destination=self.extract_directory,
+                    env=env,
+                    timeout=Config().GIT_CLONE_TIMEOUT
+                )
+            else:
+                subprocess.check_output([
+                        'git', 'clone', '--single-branch',
+                        '--branch', self._module_version.source_git_tag,
+                        git_url,
+                        self.extract_directory
+                    ],
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    timeout=Config().GIT_CLONE_TIMEOUT
+                )
         except subprocess.CalledProcessError as exc:
             error = 'Unknown error occurred during git clone'
             for line in exc.output.decode('utf-8').split('\n'):
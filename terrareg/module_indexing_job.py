@@ -0,0 +1,429 @@
+"""Provide queue of module versions to be indexed by background workers."""
+
+from contextlib import contextmanager
+import datetime
+from enum import Enum
+import threading
+import traceback
+
+from flask import g
+import sqlalchemy
+
+from terrareg.database import Database
+from terrareg.config import Config
+import terrareg.auth
+import terrareg.errors
+import terrareg.models
+import terrareg.module_extractor
+
+
+class ModuleIndexingJobStatus(Enum):
+    """Status of module indexing job"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+
+class ModuleIndexingJob:
+    """Job to index a module version from git, processed by a ModuleIndexingJobWorker."""
+
+    # Terrareg errors that may succeed when retried. Other Terrareg errors,
+    # such as invalid metadata or tags, fail the job without retrying,
+    # whereas all exceptions that are not Terrareg errors are retried.
+    RETRYABLE_ERRORS = (
+        terrareg.errors.GitCloneError,
+        terrareg.errors.UnableToGetGlobalTerraformLockError,
+    )
+
+    @classmethod
+    def create(cls, module_provider, version):
+        """
+        Queue indexing of module version.
+
+        If a job is already queued for the module version, the existing job is returned.
+        """
+        db = Database.get()
+        with db.get_connection() as conn:
+            existing_row = conn.execute(
+                sqlalchemy.select(
+                    db.module_indexing_job.c.id
+                ).where(
+                    db.module_indexing_job.c.module_provider_id==module_provider.pk,
+                    db.module_indexing_job.c.version==version,
+                    db.module_indexing_job.c.status==ModuleIndexingJobStatus.QUEUED.value
+                ).order_by(
+                    db.module_indexing_job.c.id
+                ).limit(1)
+            ).fetchone()
+            if existing_row:
+                return cls(pk=existing_row['id'])
+
+            now = datetime.datetime.now()
+            res = conn.execute(db.module_indexing_job.insert().values(
+                module_provider_id=module_provider.pk,
+                version=version,
+                status=ModuleIndexingJobStatus.QUEUED.value,
+                username=terrareg.auth.AuthFactory().get_current_auth_method().get_username(),
+                attempts=0,
+                created_at=now,
+                updated_at=now,
+                next_attempt_at=now
+            ))
+            return cls(pk=res.inserted_primary_key[0])
+
+    @classmethod
+    def get(cls, pk):
+        """Return job by pk, if it exists."""
+        obj = cls(pk=pk)
+        if obj._get_db_row() is None:
+            return None
+        return obj
+
+    @staticmethod
+    def _get_claimable_condition(db, now):
+        """
+        Return condition matching jobs that can be claimed: queued jobs and
+        running jobs whose lease has expired, as the worker processing them has stopped.
+        """
+        return sqlalchemy.or_(
+            db.module_indexing_job.c.status==ModuleIndexingJobStatus.QUEUED.value,
+            sqlalchemy.and_(
+                db.module_indexing_job.c.status==ModuleIndexingJobStatus.RUNNING.value,
+                db.module_indexing_job.c.lease_expires_at<now
+            )
+        )
+
+    @classmethod
+    def _fail_abandoned_jobs(cls):
+        """Mark jobs that have been abandoned by workers, and have no remaining attempts, as failed."""
+        db = Database.get()
+        now = datetime.datetime.now()
+        with db.get_connection() as conn:
+            conn.execute(db.module_indexing_job.update().where(
+                db.module_indexing_job.c.status==ModuleIndexingJobStatus.RUNNING.value,
+                db.module_indexing_job.c.lease_expires_at<now,
+                db.module_indexing_job.c.attempts>=Config().MODULE_INDEXING_JOB_MAX_ATTEMPTS
+            ).values(
+                status=ModuleIndexingJobStatus.FAILED.value,
+                error='Worker processing the job stopped before the job completed',
+                lease_expires_at=None,
+                updated_at=now
+            ))
+
+    @classmethod
+    def claim_next(cls):
+        """
+        Obtain next queued job that is due to be run, marking it as running.
+
+        Jobs are claimed by conditionally updating the status, so that
+        each job is only claimed by a single worker, across all instances.
+        Running jobs whose lease has expired are re-claimed.
+        """
+        cls._fail_abandoned_jobs()
+
+        db = Database.get()
+        now = datetime.datetime.now()
+        with db.get_connection() as conn:
+            candidates = conn.execute(
+                sqlalchemy.select(
+                    db.module_indexing_job.c.id
+                ).where(
+                    cls._get_claimable_condition(db=db, now=now),
+                    db.module_indexing_job.c.next_attempt_at<=now
+                ).order_by(
+                    db.module_indexing_job.c.next_attempt_at,
+                    db.module_indexing_job.c.id
+                ).limit(10)
+            ).fetchall()
+
+        for candidate in candidates:
+            job = cls(pk=candidate['id'])
+            if job.claim():
+                return job
+        return None
+
+    def __init__(self, pk):
+        """Store member variables."""
+        self._pk = pk
+        self._cache_db_row = None
+
+    def _get_db_row(self):
+        """Return database row for job."""
+        if self._cache_db_row is None:
+            db = Database.get()
+            with db.get_connection() as conn:
+                self._cache_db_row = conn.execute(db.module_indexing_job.select().where(
+                    db.module_indexing_job.c.id==self._pk
+                )).fetchone()
+        return self._cache_db_row
+
+    @property
+    def pk(self):
+        """Return pk of job"""
+        return self._pk
+
+    @property
+    def module_provider(self):
+        """Return module provider that the job indexes a version of"""
+        return terrareg.models.ModuleProvider.get_by_pk(self._get_db_row()['module_provider_id'])
+
+    @property
+    def version(self):
+        """Return version being indexed"""
+        return self._get_db_row()['version']
+
+    @property
+    def status(self):
+        """Return status of job"""
+        return ModuleIndexingJobStatus(self._get_db_row()['status'])
+
+    @property
+    def username(self):
+        """Return username of user that queued the job"""
+        return self._get_db_row()['username']
+
+    @property
+    def attempts(self):
+        """Return number of attempts made to run the job"""
+        return self._get_db_row()['attempts']
+
+    @property
+    def error(self):
+        """Return error from latest failed attempt"""
+        return self._get_db_row()['error']
+
+    @property
+    def next_attempt_at(self):
+        """Return time that queued job can next be attempted"""
+        return self._get_db_row()['next_attempt_at']
+
+    @property
+    def lease_expires_at(self):
+        """Return time that lease of running job expires"""
+        return self._get_db_row()['lease_expires_at']
+
+    def claim(self):
+        """
+        Mark queued job, or running job whose lease has expired, as running, returning whether the job was claimed.
+
+        If the job cannot be claimed, e.g. has been claimed by another worker, False is returned.
+        """
+        db = Database.get()
+        now = datetime.datetime.now()
+        with db.get_connection() as conn:
+            res = conn.execute(db.module_indexing_job.update().where(
+                db.module_indexing_job.c.id==self._pk,
+                self._get_claimable_condition(db=db, now=now)
+            ).values(
+                status=ModuleIndexingJobStatus.RUNNING.value,
+                attempts=db.module_indexing_job.c.attempts + 1,
+                lease_expires_at=now + datetime.timedelta(seconds=Config().MODULE_INDEXING_JOB_LEASE_DURATION),
+                updated_at=now
+            ))
+        self._cache_db_row = None
+        return res.rowcount == 1
+
+    def renew_lease(self):
+        """Extend lease of running job"""
+        db = Database.get()
+        now = datetime.datetime.now()
+        with db.get_connection() as conn:
+            conn.execute(db.module_indexing_job.update().where(
+                db.module_indexing_job.c.id==self._pk,
+                db.module_indexing_job.c.status==ModuleIndexingJobStatus.RUNNING.value
+            ).values(
+                lease_expires_at=now + datetime.timedelta(seconds=Config().MODULE_INDEXING_JOB_LEASE_DURATION),
+                updated_at=now
+            ))
+        self._cache_db_row = None
+
+    @contextmanager
+    def _hold_lease(self):
+        """Renew lease of job in a background thread, whilst in context"""
+        stop_event = threading.Event()
+        renew_interval = max(Config().MODULE_INDEXING_JOB_LEASE_DURATION / 3, 1)
+
+        def renew():
+            while not stop_event.wait(timeout=renew_interval):
+                try:
+                    self.renew_lease()
+                except Exception as exc:
+                    print(f'Failed to renew lease of module indexing job {self.pk}: {exc}')
+
+        thread = threading.Thread(target=renew, name=f'module-indexing-lease-{self.pk}', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop_event.set()
+            thread.join()
+
+    @staticmethod
+    def _truncate_error(error):
+        """Truncate error message to size of error column"""
+        max_length = Database.get().module_indexing_job.c.error.type.length
+        if len(error) > max_length:
+            error = error[:max_length - 3] + '...'
+        return error
+
+    @staticmethod
+    def _get_error_message(exc):
+        """
+        Return error message for exception, to be stored in the job.
+
+        Job errors are returned by the API, so details of exceptions other than
+        Terrareg errors are only included when debug is enabled.
+        """
+        if isinstance(exc, terrareg.errors.TerraregError):
+            return str(exc)
+        message = 'An unexpected error occurred whilst indexing the module version'
+        if Config().DEBUG:
+            message += f': {exc}'
+        return message
+
+    def _update_attributes(self, **kwargs):
+        """Update attributes of job in database"""
+        kwargs['updated_at'] = datetime.datetime.now()
+        if kwargs.get('error'):
+            kwargs['error'] = self._truncate_error(kwargs['error'])
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_indexing_job.update().where(
+                db.module_indexing_job.c.id==self._pk
+            ).values(**kwargs))
+        self._cache_db_row = None
+
+    @classmethod
+    def _is_retryable_error(cls, exc):
+        """Whether job should be retried after exception"""
+        return isinstance(exc, cls.RETRYABLE_ERRORS) or not isinstance(exc, terrareg.errors.TerraregError)
+
+    def run(self):
+        """
+        Index module version, marking job as succeeded or,
+        on a retryable failure, re-queue the job with a backoff until
+        the maximum number of attempts has been reached.
+        """
+        module_provider = self.module_provider
+        if module_provider is None:
+            self._update_attributes(
+                status=ModuleIndexingJobStatus.FAILED.value,
+                error='Module provider no longer exists',
+                lease_expires_at=None
+            )
+            return
+
+        try:
+            with self._hold_lease(), Database.start_transaction():
+                module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version=self.version)
+                with module_version.module_create_extraction_wrapper():
+                    with terrareg.module_extractor.GitModuleExtractor(module_version=module_version) as me:
+                        me.process_upload()
+
+        except Exception as exc:
+            print(f'Module indexing job {self.pk} attempt {self.attempts} failed: {traceback.format_exc()}')
+            config = Config()
+            error = self._get_error_message(exc)
+            if not self._is_retryable_error(exc) or self.attempts >= config.MODULE_INDEXING_JOB_MAX_ATTEMPTS:
+                self._update_attributes(
+                    status=ModuleIndexingJobStatus.FAILED.value,
+                    error=error,
+                    lease_expires_at=None
+                )
+            else:
+                retry_delay = config.MODULE_INDEXING_JOB_RETRY_DELAY * (2 ** (self.attempts - 1))
+                self._update_attributes(
+                    status=ModuleIndexingJobStatus.QUEUED.value,
+                    error=error,
+                    next_attempt_at=datetime.datetime.now() + datetime.timedelta(seconds=retry_delay),
+                    lease_expires_at=None
+                )
+        else:
+            self._update_attributes(
+                status=ModuleIndexingJobStatus.SUCCEEDED.value,
+                error=None,
+                lease_expires_at=None
+            )
+
+    def get_api_outline(self):
+        """Return API details for job"""
+        row = self._get_db_row()
+        module_provider = self.module_provider
+        return {
+            'id': self.pk,
+            'module_provider_id': module_provider.id if module_provider else None,
+            'version': self.version,
+            'status': self.status.value,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+            'updated_at': row['updated_at'].isoformat() if row['updated_at'] else None,
+        }
+
+
+class ModuleIndexingJobWorker:
+    """Background workers, processing queued module indexing jobs."""
+
+    POLL_INTERVAL = 5
+
+    _INSTANCE = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    @classmethod
+    def start_instance(cls, app):
+        """Start singleton worker, if not already running."""
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is None:
+                instance = cls(app=app)
+                instance.start()
+                cls._INSTANCE = instance
+        return cls._INSTANCE
+
+    @classmethod
+    def stop_instance(cls):
+        """Stop singleton worker, if running."""
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is not None:
+                cls._INSTANCE.stop()
+                cls._INSTANCE = None
+
+    def __init__(self, app):
+        """Setup member variables."""
+        self._app = app
+        self._worker_count = Config().MODULE_INDEXING_JOB_WORKERS
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start background worker threads."""
+        for itx in range(self._worker_count):
+            thread = threading.Thread(target=self._run, name=f'module-indexing-{itx}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def process_job(self, job):
+        """Run job within application context, attributing actions to the user that queued the job."""
+        with self._app.app_context():
+            setattr(g, terrareg.auth.AuthFactory.FLASK_GLOBALS_AUTH_KEY,
+                    terrareg.auth.ModuleIndexingJobAuthMethod(username=job.username))
+            job.run()
+
+    def _run(self):
+        """Process jobs until stopped, waiting for poll interval when no jobs are available."""
+        while not self._stop_event.is_set():
+            try:
+                job = ModuleIndexingJob.claim_next()
+                if job is not None:
+                    self.process_job(job)
+                    continue
+            except Exception as exc:
+                print(f'Failed to process module indexing job: {exc}')
+            self._stop_event.wait(timeout=self.POLL_INTERVAL)
+
+    def stop(self):
+        """Stop background worker threads."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,93 @@
+"""Provide bulk import of module versions from git tags."""
+
+import concurrent.futures
+import contextvars
+import datetime
+import threading
+import time
+
+from terrareg.config import Config
+from terrareg.git_mirror import GitMirrorCache
+from terrareg.module_indexing_job import ModuleIndexingJob, ModuleIndexingJobStatus, ModuleIndexingJobWorker
+
+
+class ModuleProviderBulkImport:
+    """
+    Import all versions of a module provider from git tags that have not yet been indexed.
+
+    An indexing job is created for each version, which are either processed by background
+    workers or by a bounded pool of threads, using run() or, in a background thread, start().
+
+    All versions are cloned from a single mirror of the repository, using a temporary mirror
+    if the git mirror cache is disabled.
+    """
+
+    def __init__(self, module_provider, app, concurrency=None, progress_callback=None):
+        """Store member variables."""
+        self._module_provider = module_provider
+        self._app = app
+        self._concurrency = Config().MODULE_BULK_IMPORT_CONCURRENCY if concurrency is None else concurrency
+        self._progress_callback = progress_callback
+
+    def queue(self):
+        """
+        Create indexing jobs for each git tag version that has not been indexed.
+
+        Returns list of jobs, in ascending version order.
+        """
+        return [
+            ModuleIndexingJob.create(module_provider=self._module_provider, version=version)
+            for version, _ in self._module_provider.get_unindexed_git_tag_versions()
+        ]
+
+    def _run_job(self, worker, job):
+        """Run job, including any retries, until it has succeeded or failed."""
+        while job.claim():
+            worker.process_job(job)
+
+            job = ModuleIndexingJob.get(job.pk)
+            if job.status is not ModuleIndexingJobStatus.QUEUED:
+                break
+
+            # Wait for retry of failed job
+            wait_seconds = (job.next_attempt_at - datetime.datetime.now()).total_seconds()
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+        return ModuleIndexingJob.get(job.pk)
+
+    def run(self, jobs):
+        """
+        Process jobs, using a pool of threads, returning jobs with their final state.
+
+        Jobs that are claimed by other workers are not processed.
+        """
+        worker = ModuleIndexingJobWorker(app=self._app)
+        completed_jobs = []
+        with GitMirrorCache.temporary_mirror(self._module_provider.get_git_clone_url()), \
+                concurrent.futures.ThreadPoolExecutor(max_workers=max(self._concurrency, 1)) as executor:
+            # Copy context for each job, so that the temporary mirror
+            # is used by the threads processing the jobs
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._run_job, worker, job)
+                for job in jobs
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                job = future.result()
+                completed_jobs.append(job)
+                if self._progress_callback:
+                    self._progress_callback(job=job, completed=len(completed_jobs), total=len(jobs))
+
+        return sorted(completed_jobs, key=lambda job: job.pk)
+
+    def _run_background(self, jobs):
+        """Process jobs, logging any errors"""
+        try:
+            self.run(jobs)
+        except Exception as exc:
+            print(f'Failed to bulk import module versions: {exc}')
+
+    def start(self, jobs):
+        """Process jobs in a background thread, returning the thread."""
+        thread = threading.Thread(target=self._run_background, args=(jobs,), name='module-bulk-import', daemon=True)
+        thread.start()
+        return thread
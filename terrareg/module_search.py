@@ -1,8 +1,10 @@
 
 import datetime
+import re
+import threading
 
 import sqlalchemy
-from terrareg.config import Config
+from terrareg.config import Config, ModuleSearchBackend
 
 from terrareg.database import Database
 import terrareg.models
@@ -10,6 +12,347 @@ from terrareg.filters import NamespaceTrustFilter
 import terrareg.result_data
 
 
+class ModuleSearchIndex(object):
+    """
+    Trigram index of searchable attributes of module providers.
+
+    The index is used to obtain candidate module providers for each search
+    term, so that the wildcard matches used for search relevance are only
+    evaluated against module providers that contain the term.
+    """
+
+    # Characters that are not indexed, as they are
+    # treated as wildcards/escape characters in LIKE matches
+    _LIKE_SPECIAL_CHARACTERS = '%_\\'
+
+    @classmethod
+    def _is_indexable_trigram(cls, trigram):
+        """Return whether trigram can be stored in/queried from the index."""
+        for char in trigram:
+            # Only index printable ASCII characters, as database collations
+            # may match other characters case/accent insensitively
+            if not (33 <= ord(char) <= 126) or char in cls._LIKE_SPECIAL_CHARACTERS:
+                return False
+        return True
+
+    @classmethod
+    def get_trigrams(cls, value):
+        """Return set of indexable trigrams for value."""
+        if not value:
+            return set()
+        value = value.lower()
+        return set(
+            value[itx:itx + 3]
+            for itx in range(len(value) - 2)
+            if cls._is_indexable_trigram(value[itx:itx + 3])
+        )
+
+    @staticmethod
+    def get_index_select():
+        """Return select for searchable attributes of module providers and their latest version."""
+        db = Database.get()
+        return db.select_module_provider_joined_latest_module_version(
+            db.module_provider.c.id,
+            db.namespace.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider,
+            db.module_provider.c.verified,
+            db.module_version.c.description,
+            db.module_version.c.owner,
+            db.module_version.c.published,
+            db.module_version.c.beta,
+            db.module_version.c.internal
+        )
+
+    @classmethod
+    def update_module_provider(cls, module_provider_id):
+        """Re-index module provider, using attributes of the latest version."""
+        db = Database.get()
+        select = cls.get_index_select().where(
+            db.module_provider.c.id == module_provider_id
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+            conn.execute(db.module_search_trigram.delete().where(
+                db.module_search_trigram.c.module_provider_id == module_provider_id
+            ))
+
+            # Only index module providers with a latest version,
+            # as others cannot be returned in search results
+            trigrams = set()
+            if row is not None:
+                for attribute in ['namespace', 'module', 'provider', 'description', 'owner']:
+                    trigrams.update(cls.get_trigrams(row[attribute]))
+
+            if trigrams:
+                conn.execute(
+                    db.module_search_trigram.insert(),
+                    [
+                        {'module_provider_id': module_provider_id, 'trigram': trigram}
+                        for trigram in trigrams
+                    ]
+                )
+
+        InMemoryModuleSearchIndex.update_module_provider_if_loaded(module_provider_id)
+
+    @classmethod
+    def update_namespace(cls, namespace_id):
+        """Re-index all module providers in namespace."""
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider.c.id
+        ).where(
+            db.module_provider.c.namespace_id == namespace_id
+        )
+        with db.get_connection() as conn:
+            module_provider_ids = [r['id'] for r in conn.execute(select)]
+
+        for module_provider_id in module_provider_ids:
+            cls.update_module_provider(module_provider_id)
+
+    @classmethod
+    def delete_module_provider(cls, module_provider_id):
+        """Remove module provider from index."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_search_trigram.delete().where(
+                db.module_search_trigram.c.module_provider_id == module_provider_id
+            ))
+
+        InMemoryModuleSearchIndex.update_module_provider_if_loaded(module_provider_id)
+
+    @classmethod
+    def get_candidate_select(cls, query_part):
+        """
+        Return select of IDs of module providers that may match the search term.
+
+        Returns None if the search term does not contain any indexable trigrams,
+        in which case, the candidates cannot be filtered.
+        """
+        trigrams = cls.get_trigrams(query_part)
+        if not trigrams:
+            return None
+
+        db = Database.get()
+        return sqlalchemy.select(
+            db.module_search_trigram.c.module_provider_id
+        ).where(
+            db.module_search_trigram.c.trigram.in_(trigrams)
+        ).group_by(
+            db.module_search_trigram.c.module_provider_id
+        ).having(
+            sqlalchemy.func.count() == len(trigrams)
+        )
+
+
+class InMemoryModuleSearchIndex(object):
+    """
+    In-memory index of module providers, used by the 'memory' module search backend.
+
+    Each module provider is stored with the searchable attributes of its latest
+    version, along with an inverted index of trigrams to module provider IDs,
+    which is used to obtain candidates for each search term.
+    Relevance is calculated using the same matches and weights as
+    ModuleSearch._get_search_query_filter.
+    """
+
+    _INSTANCE = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """Return singleton instance, building the index on first use."""
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    instance = cls()
+                    instance.build()
+                    cls._INSTANCE = instance
+        return cls._INSTANCE
+
+    @classmethod
+    def reset(cls):
+        """Remove singleton instance, causing index to be rebuilt on next use."""
+        cls._INSTANCE = None
+
+    @classmethod
+    def update_module_provider_if_loaded(cls, module_provider_id):
+        """
+        Update module provider in index from the database, if the index has been built.
+
+        If within a transaction, the index is updated once the transaction
+        has been committed, so that it does not contain changes that are rolled back.
+        """
+        if cls._INSTANCE is not None:
+            Database.call_after_commit(lambda: cls._reload_module_provider(module_provider_id))
+
+    @classmethod
+    def _reload_module_provider(cls, module_provider_id):
+        """Replace module provider in index with committed row from database."""
+        instance = cls._INSTANCE
+        if instance is None:
+            return
+
+        db = Database.get()
+        select = ModuleSearchIndex.get_index_select().where(
+            db.module_provider.c.id == module_provider_id
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+        instance.update_module_provider(module_provider_id, row)
+
+    @staticmethod
+    def _like(pattern, value):
+        """Perform case-insensitive match of value against SQL LIKE pattern."""
+        if value is None:
+            return False
+        regex = ''.join(
+            '.*' if char == '%' else '.' if char == '_' else re.escape(char)
+            for char in pattern
+        )
+        return re.fullmatch(regex, value, flags=re.IGNORECASE | re.DOTALL) is not None
+
+    def __init__(self):
+        """Setup member variables."""
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._trigram_index = {}
+
+    def build(self):
+        """Build index from all module providers in database."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            rows = conn.execute(ModuleSearchIndex.get_index_select()).fetchall()
+
+        with self._lock:
+            self._entries = {}
+            self._trigram_index = {}
+            for row in rows:
+                self._add_entry(row['id'], row)
+
+    def _add_entry(self, module_provider_id, row):
+        """Add module provider to index."""
+        entry = {
+            attribute: row[attribute]
+            for attribute in ['namespace', 'module', 'provider', 'verified',
+                              'description', 'owner', 'published', 'beta', 'internal']
+        }
+        entry['trigrams'] = set()
+        for attribute in ['namespace', 'module', 'provider', 'description', 'owner']:
+            entry['trigrams'].update(ModuleSearchIndex.get_trigrams(entry[attribute]))
+
+        self._entries[module_provider_id] = entry
+        for trigram in entry['trigrams']:
+            self._trigram_index.setdefault(trigram, set()).add(module_provider_id)
+
+    def _remove_entry(self, module_provider_id):
+        """Remove module provider from index."""
+        entry = self._entries.pop(module_provider_id, None)
+        if entry is None:
+            return
+        for trigram in entry['trigrams']:
+            module_provider_ids = self._trigram_index.get(trigram)
+            if module_provider_ids is not None:
+                module_provider_ids.discard(module_provider_id)
+                if not module_provider_ids:
+                    del self._trigram_index[trigram]
+
+    def update_module_provider(self, module_provider_id, row):
+        """Replace module provider in index with row, removing it if row is None."""
+        with self._lock:
+            self._remove_entry(module_provider_id)
+            if row is not None:
+                self._add_entry(module_provider_id, row)
+
+    def _get_relevance(self, entry, query_parts):
+        """
+        Return relevance of entry for search query parts,
+        or None if entry does not match all query parts.
+        """
+        relevance = 0
+        for query_part in query_parts:
+            wildcarded_query_part = '%{0}%'.format(query_part)
+
+            if not (self._like(query_part, entry['provider']) or
+                    self._like(wildcarded_query_part, entry['module']) or
+                    self._like(wildcarded_query_part, entry['description']) or
+                    self._like(wildcarded_query_part, entry['owner']) or
+                    self._like(wildcarded_query_part, entry['namespace'])):
+                return None
+
+            for attribute, pattern, value in [
+                    ('module', query_part, 20),
+                    ('namespace', query_part, 18),
+                    ('provider', query_part, 14),
+                    ('description', query_part, 13),
+                    ('owner', query_part, 12),
+                    ('module', wildcarded_query_part, 5),
+                    ('description', wildcarded_query_part, 4),
+                    ('owner', wildcarded_query_part, 3),
+                    ('namespace', wildcarded_query_part, 2)]:
+                if self._like(pattern, entry[attribute]):
+                    relevance += value
+                    break
+        return relevance
+
+    def search(self, query, namespaces=None, modules=None, providers=None,
+               verified=False, include_internal=False,
+               namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED):
+        """
+        Return list of tuples of module provider ID and entry for matching module providers,
+        ordered by relevance.
+        """
+        query_parts = query.split() if query else []
+        trusted_namespaces = Config().TRUSTED_NAMESPACES
+
+        with self._lock:
+            # Obtain candidate module providers that contain
+            # all trigrams of each of the query parts
+            candidate_ids = None
+            for query_part in query_parts:
+                trigrams = ModuleSearchIndex.get_trigrams(query_part)
+                for trigram in trigrams:
+                    trigram_ids = self._trigram_index.get(trigram, set())
+                    candidate_ids = set(trigram_ids) if candidate_ids is None else candidate_ids.intersection(trigram_ids)
+
+            if candidate_ids is None:
+                candidate_ids = self._entries.keys()
+
+            candidates = [
+                (module_provider_id, self._entries[module_provider_id])
+                for module_provider_id in candidate_ids
+            ]
+
+        results = []
+        for module_provider_id, entry in candidates:
+            if not entry['published'] or entry['beta']:
+                continue
+            if providers and entry['provider'] not in providers:
+                continue
+            if namespaces and entry['namespace'] not in namespaces:
+                continue
+            if modules and entry['module'] not in modules:
+                continue
+            if verified and not entry['verified']:
+                continue
+            if not include_internal and entry['internal']:
+                continue
+            if namespace_trust_filters is not NamespaceTrustFilter.UNSPECIFIED:
+                trusted = entry['namespace'] in trusted_namespaces
+                if not ((NamespaceTrustFilter.TRUSTED_NAMESPACES in namespace_trust_filters and trusted) or
+                        (NamespaceTrustFilter.CONTRIBUTED in namespace_trust_filters and not trusted)):
+                    continue
+
+            relevance = self._get_relevance(entry, query_parts)
+            if relevance is None:
+                continue
+            results.append((relevance, module_provider_id, entry))
+
+        results.sort(key=lambda result: (-result[0], result[1]))
+        return [(module_provider_id, entry) for _, module_provider_id, entry in results]
+
+
 class ModuleSearch(object):
 
     @classmethod
@@ -22,7 +365,14 @@ class ModuleSearch(object):
         if query:
             for query_part in query.split():
 
-                wildcarded_query_part = '%{0}%'.format(query_part)               
+                wildcarded_query_part = '%{0}%'.format(query_part)
+
+                # Limit matches to module providers containing all
+                # trigrams of the query part, using the search index
+                candidate_select = ModuleSearchIndex.get_candidate_select(query_part)
+                if candidate_select is not None:
+                    wheres.append(db.module_provider.c.id.in_(candidate_select))
+
                 point_value = sqlalchemy.cast(
                     sqlalchemy.case(
                             (db.module_provider.c.module.like(query_part), 20),
@@ -94,6 +444,14 @@ class ModuleSearch(object):
         limit = 1 if limit < 1 else limit
         offset = 0 if offset < 0 else offset
 
+        if Config().MODULE_SEARCH_BACKEND is ModuleSearchBackend.MEMORY:
+            return cls._search_module_providers_in_memory(
+                offset=offset, limit=limit, query=query,
+                namespaces=namespaces, modules=modules, providers=providers,
+                verified=verified, include_internal=include_internal,
+                namespace_trust_filters=namespace_trust_filters
+            )
+
         db = Database.get()
 
         select = cls._get_search_query_filter(query)
@@ -153,11 +511,10 @@ class ModuleSearch(object):
 
             count = count_result.fetchone()['count']
 
-            module_providers = []
-            for r in res:
-                namespace = terrareg.models.Namespace(name=r['namespace'])
-                module = terrareg.models.Module(namespace=namespace, name=r['module'])
-                module_providers.append(terrareg.models.ModuleProvider(module=module, name=r['provider']))
+            # Populate module provider objects using the search result rows,
+            # to avoid querying each namespace, module provider and
+            # latest version individually
+            module_providers = terrareg.models.ModuleProvider.get_from_joined_latest_version_rows(res)
 
         return terrareg.result_data.ResultData(
             offset=offset,
@@ -166,9 +523,74 @@ class ModuleSearch(object):
             count=count
         )
 
+    @classmethod
+    def _search_module_providers_in_memory(cls, offset, limit, **kwargs):
+        """Search for module providers using in-memory search index."""
+        results = InMemoryModuleSearchIndex.get().search(**kwargs)
+        page_ids = [module_provider_id for module_provider_id, _ in results[offset:offset + limit]]
+
+        module_providers = []
+        if page_ids:
+            # Obtain rows for the page of results in a single query
+            db = Database.get()
+            select = db.select_module_provider_joined_latest_module_version(
+                db.module_provider,
+                db.module_version,
+                db.namespace
+            ).where(
+                db.module_provider.c.id.in_(page_ids)
+            )
+            with db.get_connection() as conn:
+                rows = conn.execute(select).fetchall()
+            rows.sort(key=lambda row: page_ids.index(row[db.module_provider.c.id]))
+            module_providers = terrareg.models.ModuleProvider.get_from_joined_latest_version_rows(rows)
+
+        return terrareg.result_data.ResultData(
+            offset=offset,
+            limit=limit,
+            rows=module_providers,
+            count=len(results)
+        )
+
+    @classmethod
+    def _get_search_filters_in_memory(cls, query):
+        """Get search filter counts using in-memory search index."""
+        results = InMemoryModuleSearchIndex.get().search(query=query)
+        return cls._build_search_filters(
+            (entry['namespace'], entry['provider'], 1, 1 if entry['verified'] else 0)
+            for _, entry in results
+        )
+
+    @staticmethod
+    def _build_search_filters(grouped_counts):
+        """
+        Return search filter counts from iterable of tuples of
+        namespace, provider, module provider count and verified module provider count.
+        """
+        trusted_namespaces = Config().TRUSTED_NAMESPACES
+        filters = {
+            'verified': 0,
+            'trusted_namespaces': 0,
+            'contributed': 0,
+            'providers': {},
+            'namespaces': {}
+        }
+        for namespace, provider, count, verified_count in grouped_counts:
+            filters['verified'] += verified_count
+            if namespace in trusted_namespaces:
+                filters['trusted_namespaces'] += count
+            else:
+                filters['contributed'] += count
+            filters['providers'][provider] = filters['providers'].get(provider, 0) + count
+            filters['namespaces'][namespace] = filters['namespaces'].get(namespace, 0) + count
+        return filters
+
     @classmethod
     def get_search_filters(cls, query):
         """Get list of search filters and filter counts."""
+        if Config().MODULE_SEARCH_BACKEND is ModuleSearchBackend.MEMORY:
+            return cls._get_search_filters_in_memory(query)
+
         db = Database.get()
         main_select = cls._get_search_query_filter(query)
 
@@ -177,76 +599,31 @@ class ModuleSearch(object):
             db.module_version.c.internal == False
         )
 
-        with db.get_connection() as conn:
-            verified_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        db.module_provider.c.verified==True
-                    ).subquery()
-                )
-            ).fetchone()['count']
-
-            trusted_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        db.namespace.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
-                    ).subquery()
-                )
-            ).fetchone()['count']
-
-            contributed_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        ~db.namespace.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
-                    ).subquery()
-                )
-            ).fetchone()['count']
-
-            provider_subquery = main_select.group_by(
-                db.namespace.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ).subquery()
-            provider_res = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count'), provider_subquery.c.provider]
-                ).select_from(
-                    provider_subquery
-                ).group_by(provider_subquery.c.provider)
-            )
+        # Obtain counts of matching module providers, grouped by namespace and provider,
+        # along with count of verified module providers, in a single query
+        # and calculate all filter counts from the grouped rows
+        search_subquery = main_select.subquery()
+        select = sqlalchemy.select(
+            search_subquery.c.namespace,
+            search_subquery.c.provider,
+            sqlalchemy.func.count().label('count'),
+            sqlalchemy.func.sum(
+                sqlalchemy.case((search_subquery.c.verified == True, 1), else_=0)
+            ).label('verified_count')
+        ).select_from(
+            search_subquery
+        ).group_by(
+            search_subquery.c.namespace,
+            search_subquery.c.provider
+        )
 
-            namespace_subquery = main_select.group_by(
-                db.namespace.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ).subquery()
-            namespace_res = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count'), namespace_subquery.c.namespace]
-                ).select_from(
-                    namespace_subquery
-                ).group_by(namespace_subquery.c.namespace)
-            )
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
 
-            return {
-                'verified': verified_count,
-                'trusted_namespaces': trusted_count,
-                'contributed': contributed_count,
-                'providers': {
-                    r['provider']: r['count']
-                    for r in provider_res
-                },
-                'namespaces': {
-                    r['namespace']: r['count']
-                    for r in namespace_res
-                }
-            }
+        return cls._build_search_filters(
+            (row['namespace'], row['provider'], row['count'], int(row['verified_count'] or 0))
+            for row in rows
+        )
 
     @staticmethod
     def get_most_recently_published():
@@ -272,13 +649,8 @@ class ModuleSearch(object):
         if not row:
             return None
 
-        namespace = terrareg.models.Namespace(name=row['namespace'])
-        module = terrareg.models.Module(namespace=namespace,
-                                        name=row['module'])
-        module_provider = terrareg.models.ModuleProvider(module=module,
-                                                         name=row['provider'])
-        return terrareg.models.ModuleVersion(module_provider=module_provider,
-                                             version=row['version'])
+        module_provider = terrareg.models.ModuleProvider.get_from_joined_latest_version_rows([row])[0]
+        return module_provider.get_latest_version()
 
     @staticmethod
     def get_most_downloaded_module_provider_this_Week():
@@ -286,16 +658,16 @@ class ModuleSearch(object):
         db = Database.get()
         counts = sqlalchemy.select(
             [
-                sqlalchemy.func.count().label('download_count'),
+                sqlalchemy.func.sum(db.analytics_module_version_daily.c.download_count).label('download_count'),
                 db.namespace.c.namespace,
                 db.module_provider.c.module,
                 db.module_provider.c.provider
             ]
         ).select_from(
-            db.analytics
+            db.analytics_module_version_daily
         ).join(
             db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
+            db.module_version.c.id == db.analytics_module_version_daily.c.module_version_id
         ).join(
             db.module_provider,
             db.module_provider.c.id == db.module_version.c.module_provider_id
@@ -303,10 +675,10 @@ class ModuleSearch(object):
             db.namespace,
             db.module_provider.c.namespace_id == db.namespace.c.id
         ).where(
-            db.analytics.c.timestamp >= (
+            db.analytics_module_version_daily.c.date >= (
                 datetime.datetime.now() -
                 datetime.timedelta(days=7)
-            ),
+            ).date(),
             db.module_version.c.published == True,
             db.module_version.c.beta == False,
             db.module_version.c.internal == False
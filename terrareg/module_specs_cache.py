@@ -0,0 +1,71 @@
+"""Provide process-level cache of parsed terraform-docs output."""
+
+from collections import OrderedDict
+import threading
+
+from terrareg.config import Config
+
+
+class ModuleSpecsCache:
+    """
+    Cache of parsed terraform-docs output for module details, shared between model instances and requests.
+
+    Entries are keyed by module details ID and a hash of the terraform-docs JSON, so that specs
+    are not returned for different output if module details IDs are re-used. Least recently used
+    entries are evicted once the total size of the terraform-docs JSON for cached entries exceeds
+    MODULE_SPECS_CACHE_SIZE.
+
+    Cached specs are shared and must not be modified by callers.
+    """
+
+    _CACHE = OrderedDict()
+    _CACHE_SIZE = 0
+    _CACHE_LOCK = threading.Lock()
+
+    @staticmethod
+    def get_size_limit():
+        """Return maximum total size of cached entries, in bytes"""
+        return Config().MODULE_SPECS_CACHE_SIZE * 1024 * 1024
+
+    @classmethod
+    def get(cls, key):
+        """Return cached specs for key, if present."""
+        with cls._CACHE_LOCK:
+            entry = cls._CACHE.get(key)
+            if entry is None:
+                return None
+            cls._CACHE.move_to_end(key)
+            return entry[1]
+
+    @classmethod
+    def set(cls, key, specs, size):
+        """Store specs, with size of the JSON that they were parsed from, evicting least recently used entries."""
+        size_limit = cls.get_size_limit()
+        # Do not cache entries larger than the cache
+        if size > size_limit:
+            return
+
+        with cls._CACHE_LOCK:
+            previous_entry = cls._CACHE.pop(key, None)
+            if previous_entry is not None:
+                cls._CACHE_SIZE -= previous_entry[0]
+
+            cls._CACHE[key] = (size, specs)
+            cls._CACHE_SIZE += size
+            while cls._CACHE_SIZE > size_limit:
+                _, (evicted_size, _) = cls._CACHE.popitem(last=False)
+                cls._CACHE_SIZE -= evicted_size
+
+    @classmethod
+    def delete(cls, module_details_id):
+        """Remove cached specs for module details."""
+        with cls._CACHE_LOCK:
+            for key in [key for key in cls._CACHE if key[0] == module_details_id]:
+                cls._CACHE_SIZE -= cls._CACHE.pop(key)[0]
+
+    @classmethod
+    def clear(cls):
+        """Remove all cached specs."""
+        with cls._CACHE_LOCK:
+            cls._CACHE.clear()
+            cls._CACHE_SIZE = 0
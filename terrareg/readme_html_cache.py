@@ -0,0 +1,110 @@
+"""Provide cache of rendered README HTML."""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+from terrareg.config import Config
+from terrareg.constants import EXTRACTION_VERSION
+
+
+class ReadmeHtmlCache:
+    """
+    Cache of rendered README HTML for root modules, submodules and examples.
+
+    Entries are stored in the data directory, grouped by module details ID, and are keyed by
+    the extraction version, the server hostname and the render context, which contains the
+    module version attributes and configuration used when replacing example sources in the README.
+
+    Recently used entries are held in memory, in front of the persistent store.
+    Entries that are not persisted (e.g. for hostnames provided by requests) are only held in memory.
+    """
+
+    _MEMORY_CACHE = OrderedDict()
+    _MEMORY_CACHE_LOCK = threading.Lock()
+
+    @classmethod
+    def is_enabled(cls):
+        """Whether caching of rendered README HTML is enabled"""
+        return Config().README_HTML_CACHE
+
+    @staticmethod
+    def get_cache_directory():
+        """Return directory containing cached README HTML"""
+        return os.path.join(Config().DATA_DIRECTORY, 'readme-html-cache')
+
+    @staticmethod
+    def get_key(server_hostname, render_context):
+        """Return cache key for rendered README."""
+        return hashlib.sha256(json.dumps({
+            'extraction_version': EXTRACTION_VERSION,
+            'server_hostname': server_hostname,
+            'render_context': render_context,
+        }, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _get_path(cls, module_details_id, key):
+        """Return path of cache file for key"""
+        return os.path.join(cls.get_cache_directory(), str(module_details_id), f'{key}.html')
+
+    @classmethod
+    def _set_memory(cls, module_details_id, key, readme_html):
+        """Store entry in memory cache, evicting least recently used entries."""
+        max_entries = Config().README_HTML_CACHE_MEMORY_ENTRIES
+        if max_entries <= 0:
+            return
+        with cls._MEMORY_CACHE_LOCK:
+            cls._MEMORY_CACHE[(module_details_id, key)] = readme_html
+            cls._MEMORY_CACHE.move_to_end((module_details_id, key))
+            while len(cls._MEMORY_CACHE) > max_entries:
+                cls._MEMORY_CACHE.popitem(last=False)
+
+    @classmethod
+    def get(cls, module_details_id, key):
+        """Return cached README HTML, if present."""
+        with cls._MEMORY_CACHE_LOCK:
+            readme_html = cls._MEMORY_CACHE.get((module_details_id, key))
+            if readme_html is not None:
+                cls._MEMORY_CACHE.move_to_end((module_details_id, key))
+                return readme_html
+
+        try:
+            with open(cls._get_path(module_details_id, key), 'r', encoding='utf-8') as cache_fh:
+                readme_html = cache_fh.read()
+        except OSError:
+            return None
+
+        cls._set_memory(module_details_id, key, readme_html)
+        return readme_html
+
+    @classmethod
+    def set(cls, module_details_id, key, readme_html, persist=True):
+        """Store rendered README HTML for key, storing in data directory if persist is set."""
+        cls._set_memory(module_details_id, key, readme_html)
+        if not persist:
+            return
+
+        path = cls._get_path(module_details_id, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to temporary file and move into place, as
+            # the file may be read by concurrent requests
+            temp_path = f'{path}.{uuid.uuid4().hex}'
+            with open(temp_path, 'w', encoding='utf-8') as cache_fh:
+                cache_fh.write(readme_html)
+            os.replace(temp_path, path)
+        except OSError as exc:
+            print(f'Failed to store README HTML cache: {exc}')
+
+    @classmethod
+    def delete(cls, module_details_id):
+        """Remove all cached README HTML for module details."""
+        with cls._MEMORY_CACHE_LOCK:
+            for cache_key in [cache_key for cache_key in cls._MEMORY_CACHE if cache_key[0] == module_details_id]:
+                del cls._MEMORY_CACHE[cache_key]
+
+        shutil.rmtree(os.path.join(cls.get_cache_directory(), str(module_details_id)), ignore_errors=True)
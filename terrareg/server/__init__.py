@@ -8,9 +8,12 @@ import sentry_sdk
 from sentry_sdk.integrations.flask import FlaskIntegration
 from waitress import serve
 
+import terrareg.analytics
 import terrareg.config
 import terrareg.database
 import terrareg.models
+import terrareg.module_search
+import terrareg.module_indexing_job
 import terrareg.errors
 import terrareg.auth
 from terrareg.server.api.terrareg_module_providers import ApiTerraregModuleProviders
@@ -131,6 +134,18 @@ class Server(BaseHandler):
         terrareg.database.Database.get().initialise()
         terrareg.models.GitProvider.initialise_from_config()
 
+        # Build in-memory search index, if enabled
+        if terrareg.config.Config().MODULE_SEARCH_BACKEND is terrareg.config.ModuleSearchBackend.MEMORY:
+            terrareg.module_search.InMemoryModuleSearchIndex.get()
+
+        # Start removal of old analytics, if retention is enabled
+        if terrareg.config.Config().ANALYTICS_RETENTION_DAYS >= 0:
+            terrareg.analytics.AnalyticsCompactionWorker.start_instance()
+
+        # Start processing of queued module indexing jobs
+        if terrareg.config.Config().MODULE_INDEXING_JOB_QUEUE and terrareg.config.Config().MODULE_INDEXING_JOB_WORKERS > 0:
+            terrareg.module_indexing_job.ModuleIndexingJobWorker.start_instance(app=self._app)
+
         self._register_routes()
 
     def _get_upload_directory(self):
@@ -335,6 +350,10 @@ class Server(BaseHandler):
             ApiTerraregGlobalUsageStats,
             '/v1/terrareg/analytics/global/usage_stats'
         )
+        self._api.add_resource(
+            ApiTerraregGlobalVersionStats,
+            '/v1/terrareg/analytics/global/version_stats'
+        )
         self._api.add_resource(
             ApiTerraregModuleProviderAnalyticsTokenVersions,
             '/v1/terrareg/analytics/<string:namespace>/<string:name>/<string:provider>/token_versions'
@@ -441,6 +460,14 @@ class Server(BaseHandler):
             ApiModuleVersionImport,
             '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/import'
         )
+        self._api.add_resource(
+            ApiModuleVersionBulkImport,
+            '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/bulk_import'
+        )
+        self._api.add_resource(
+            ApiTerraregModuleIndexingJob,
+            '/v1/terrareg/module_indexing_jobs/<int:job_id>'
+        )
         self._api.add_resource(
             ApiModuleVersionSourceDownload,
             '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/<string:version>/source.zip'
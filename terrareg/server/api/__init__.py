@@ -8,6 +8,7 @@ from .module_version_create_github_hook import ApiModuleVersionCreateGitHubHook
 from .module_version_create_gitlab_hook import ApiModuleVersionCreateGitLabHook
 from .module_version_create import ApiModuleVersionCreate
 from .module_version_import import ApiModuleVersionImport
+from .module_version_bulk_import import ApiModuleVersionBulkImport
 from .module_version_details import ApiModuleVersionDetails
 from .module_version_download import ApiModuleVersionDownload
 from .module_version_source_download import ApiModuleVersionSourceDownload
@@ -31,6 +32,7 @@ from .terrareg_example_readme_html import ApiTerraregExampleReadmeHtml
 from .terrareg_git_providers import ApiTerraregGitProviders
 from .terrareg_global_stats_summary import ApiTerraregGlobalStatsSummary
 from .terrareg_global_usage_stats import ApiTerraregGlobalUsageStats
+from .terrareg_global_version_stats import ApiTerraregGlobalVersionStats
 from .terrareg_health import ApiTerraregHealth
 from .terrareg_initial_setup_data import ApiTerraregInitialSetupData
 from .terrareg_is_authenticated import ApiTerraregIsAuthenticated
@@ -63,5 +65,6 @@ from .terrareg_user_group import ApiTerraregAuthUserGroup
 from .terrareg_graph_data import ApiTerraregGraphData
 from .terrareg_module_provider_redirects import ApiTerraregModuleProviderRedirects
 from .terrareg_module_provider_redirect_delete import ApiTerraregModuleProviderRedirectDelete
+from .terrareg_module_indexing_job import ApiTerraregModuleIndexingJob
 from .github_login_initiate import GithubLoginInitiate
 from .github_login_callback import GithubLoginCallback
@@ -53,6 +53,10 @@ class ApiModuleSearch(ErrorCatchingResource):
             'include_count', type=inputs.boolean, location='args', default=False,
             help='Whether to include total result count. This is not part of the Terraform API spec.'
         )
+        parser.add_argument(
+            'include_search_filters', type=inputs.boolean, location='args', default=False,
+            help='Whether to include search filters and filter counts for search query. This is not part of the Terraform API spec.'
+        )
         parser.add_argument(
             'target_terraform_version', type=str, location='args', default=None,
             help='Provide terraform version to show compatibility with search results. This is not part of the Terraform API spec.'
@@ -94,4 +98,6 @@ class ApiModuleSearch(ErrorCatchingResource):
         }
         if args.include_count:
             res['count'] = search_results.count
+        if args.include_search_filters:
+            res['search_filters'] = terrareg.module_search.ModuleSearch.get_search_filters(query=args.q)
         return res
@@ -0,0 +1,51 @@
+from flask import current_app
+
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.auth_wrapper
+import terrareg.config
+import terrareg.errors
+import terrareg.module_provider_bulk_import
+
+
+class ApiModuleVersionBulkImport(ErrorCatchingResource):
+    """
+    Provide interface to import all versions of git-backed modules
+    from git tags that have not already been indexed.
+
+    Versions are indexed in the background and the status of each version
+    can be obtained from the module indexing job endpoint.
+    """
+
+    method_decorators = [terrareg.auth_wrapper.auth_wrapper('can_upload_module_version', request_kwarg_map={'namespace': 'namespace'})]
+
+    def _post(self, namespace, name, provider):
+        """Import module versions for all git tags."""
+        _, _, module_provider, error = self.get_module_provider_by_names(namespace, name, provider)
+        if error:
+            return error[0], 400
+
+        # Ensure that the module provider has a repository url configured.
+        if not module_provider.get_git_clone_url():
+            return {'status': 'Error', 'message': 'Module provider is not configured with a repository'}, 400
+
+        bulk_import = terrareg.module_provider_bulk_import.ModuleProviderBulkImport(
+            module_provider=module_provider,
+            app=current_app._get_current_object()
+        )
+
+        try:
+            jobs = bulk_import.queue()
+        except terrareg.errors.TerraregError as exc:
+            return {'status': 'Error', 'message': str(exc)}, 500
+
+        # Process jobs in the background, unless they are processed by queue workers
+        if not terrareg.config.Config().MODULE_INDEXING_JOB_QUEUE:
+            bulk_import.start(jobs)
+
+        return {
+            'status': 'Queued',
+            'versions': {
+                job.version: {'status': job.status.value, 'job_id': job.pk}
+                for job in jobs
+            }
+        }, 202
@@ -10,6 +10,7 @@ import terrareg.database
 import terrareg.config
 import terrareg.models
 import terrareg.module_extractor
+import terrareg.module_indexing_job
 import terrareg.errors
 
 
@@ -82,6 +83,15 @@ class ApiModuleVersionCreateBitBucketHook(ErrorCatchingResource):
                 if not version:
                     continue
 
+                # Queue import from git, if enabled
+                if terrareg.config.Config().MODULE_INDEXING_JOB_QUEUE:
+                    job = terrareg.module_indexing_job.ModuleIndexingJob.create(module_provider=module_provider, version=version)
+                    imported_versions[version] = {
+                        'status': 'Queued',
+                        'job_id': job.pk
+                    }
+                    continue
+
                 # Create module version
                 module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version=version)
 
@@ -114,6 +124,12 @@ class ApiModuleVersionCreateBitBucketHook(ErrorCatchingResource):
                     'message': 'One or more tags failed to import',
                     'tags': imported_versions
                 }, 500
+            if terrareg.config.Config().MODULE_INDEXING_JOB_QUEUE:
+                return {
+                    'status': 'Queued',
+                    'message': 'Queued import of all provided tags',
+                    'tags': imported_versions
+                }, 202
             return {
                 'status': 'Success',
                 'message': 'Imported all provided tags',
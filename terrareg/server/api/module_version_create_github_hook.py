@@ -10,6 +10,7 @@ import terrareg.database
 import terrareg.config
 import terrareg.models
 import terrareg.module_extractor
+import terrareg.module_indexing_job
 import terrareg.errors
 
 
@@ -82,6 +83,15 @@ class ApiModuleVersionCreateGitHubHook(ErrorCatchingResource):
                 return {
                     'status': 'Success'
                 }
+            elif terrareg.config.Config().MODULE_INDEXING_JOB_QUEUE:
+                # Queue import from git
+                job = terrareg.module_indexing_job.ModuleIndexingJob.create(module_provider=module_provider, version=version)
+                return {
+                    'status': 'Queued',
+                    'message': 'Queued import of provided tag',
+                    'tag': tag_ref,
+                    'job_id': job.pk
+                }, 202
             else:
                 # Perform import from git
                 try:
@@ -6,6 +6,8 @@ import terrareg.auth_wrapper
 import terrareg.models
 import terrareg.database
 import terrareg.module_extractor
+import terrareg.module_indexing_job
+import terrareg.config
 
 
 class ApiModuleVersionImport(ErrorCatchingResource):
@@ -76,6 +78,14 @@ class ApiModuleVersionImport(ErrorCatchingResource):
                                 'Ensure it matches the git_tag_format template for this module provider'
                     }, 400
 
+            # Queue indexing of module version, if enabled
+            if terrareg.config.Config().MODULE_INDEXING_JOB_QUEUE:
+                job = terrareg.module_indexing_job.ModuleIndexingJob.create(module_provider=module_provider, version=version)
+                return {
+                    'status': 'Queued',
+                    'job_id': job.pk
+                }, 202
+
             module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version=version)
 
             with module_version.module_create_extraction_wrapper():
@@ -1,16 +1,51 @@
 
+import os
+import urllib.parse
 
-from flask import send_from_directory, request
+from flask import Response, send_file, send_from_directory, redirect, request
 
+from terrareg.artifact_storage import BaseArtifactStorage
 from terrareg.errors import InvalidPresignedUrlKeyError
 from terrareg.presigned_url import TerraformSourcePresignedUrl
 from terrareg.server.error_catching_resource import ErrorCatchingResource
 import terrareg.config
+from terrareg.config import SourceDownloadOffloadMode
 
 
 class ApiModuleVersionSourceDownload(ErrorCatchingResource):
     """Return source package of module version"""
 
+    # Max age of cached archives of published module versions (1 year)
+    IMMUTABLE_MAX_AGE = 31536000
+
+    def _get_offload_response(self, offload_mode, module_version, local_path, archive_sha256):
+        """
+        Return empty response, instructing fronting web server to serve archive from disk.
+
+        Conditional requests against the archive digest are handled here,
+        whilst Range requests are left to the web server.
+        """
+        config = terrareg.config.Config()
+        response = Response(mimetype='application/zip')
+        # Content-Length is provided by the web server, once the archive is served
+        response.automatically_set_content_length = False
+        # Match default caching of archives served by send_file
+        response.cache_control.no_cache = True
+
+        if archive_sha256:
+            response.set_etag(archive_sha256)
+            response.make_conditional(request, accept_ranges=False)
+
+        if response.status_code == 200:
+            if offload_mode is SourceDownloadOffloadMode.X_ACCEL_REDIRECT:
+                response.headers['X-Accel-Redirect'] = urllib.parse.quote(
+                    config.SOURCE_DOWNLOAD_X_ACCEL_REDIRECT_LOCATION + module_version.archive_key_zip
+                )
+            elif offload_mode is SourceDownloadOffloadMode.X_SENDFILE:
+                response.headers['X-Sendfile'] = local_path
+
+        return response
+
     def _get(self, namespace, name, provider, version):
         """Return static file."""
         config = terrareg.config.Config()
@@ -28,5 +63,68 @@ class ApiModuleVersionSourceDownload(ErrorCatchingResource):
         if error:
             return error
 
-        return send_from_directory(module_version.base_directory, module_version.archive_name_zip)
+        artifact_storage = BaseArtifactStorage.get()
+
+        # Redirect to storage backend, if supported, to avoid serving archive
+        download_url = artifact_storage.get_download_url(module_version.archive_key_zip)
+        if download_url:
+            response = redirect(download_url)
+            # Presigned URLs expire, so redirects must not be cached
+            response.cache_control.no_store = True
+            return response
+
+        archive_sha256 = module_version.archive_sha256
+        local_path = artifact_storage.get_local_path(module_version.archive_key_zip)
+        if local_path:
+            # Use digest of archive as a strong ETag, if it matches the archive on disk.
+            # Conditional and Range requests are handled by send_from_directory
+            try:
+                if archive_sha256 and os.path.getsize(local_path) != module_version.archive_size:
+                    archive_sha256 = None
+            except OSError:
+                archive_sha256 = None
+
+            offload_mode = config.SOURCE_DOWNLOAD_OFFLOAD_MODE
+            if offload_mode is not SourceDownloadOffloadMode.NONE:
+                response = self._get_offload_response(
+                    offload_mode=offload_mode,
+                    module_version=module_version,
+                    local_path=local_path,
+                    archive_sha256=archive_sha256
+                )
+            else:
+                # When running under waitress, the file is passed to waitress' wsgi.file_wrapper,
+                # which streams it from the I/O thread, rather than occupying a worker thread
+                response = send_from_directory(
+                    os.path.dirname(local_path),
+                    os.path.basename(local_path),
+                    etag=archive_sha256 if archive_sha256 else True
+                )
+        else:
+            # Stream archive from storage backend
+            archive_fh = artifact_storage.open(module_version.archive_key_zip)
+            if archive_fh is None:
+                return self._get_404_response()
+
+            response = send_file(
+                archive_fh,
+                mimetype='application/zip',
+                download_name=module_version.archive_name_zip,
+                etag=archive_sha256 if archive_sha256 else False
+            )
+            if module_version.archive_size is not None and response.status_code == 200:
+                response.content_length = module_version.archive_size
+
+        # Allow archives of published module versions to be cached indefinitely,
+        # as archives are only regenerated when the module version is re-indexed
+        if archive_sha256 and module_version.published:
+            response.cache_control.no_cache = None
+            if config.ALLOW_UNAUTHENTICATED_ACCESS:
+                response.cache_control.public = True
+            else:
+                response.cache_control.private = True
+            response.cache_control.max_age = self.IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+
+        return response
 
@@ -12,7 +12,7 @@ class PrometheusMetrics(ErrorCatchingResource):
         """
         Return Prometheus metrics for global statistics and module provider statistics
         """
-        response = make_response(terrareg.analytics.AnalyticsEngine.get_prometheus_metrics())
+        response = make_response(terrareg.analytics.PrometheusMetricsCache.get())
         response.headers['content-type'] = 'text/plain; version=0.0.4'
 
         return response
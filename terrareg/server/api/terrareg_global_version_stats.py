@@ -0,0 +1,18 @@
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.analytics
+import terrareg.auth_wrapper
+
+
+class ApiTerraregGlobalVersionStats(ErrorCatchingResource):
+    """Provide statistics about major, minor and patch releases across all module providers."""
+
+    method_decorators = [terrareg.auth_wrapper.auth_wrapper('can_access_read_api')]
+
+    def _get(self):
+        """Return number of major, minor and patch releases"""
+        major_count, minor_count, patch_count = terrareg.analytics.AnalyticsEngine.get_module_provider_version_statistics()
+        return {
+            'major_versions': major_count,
+            'minor_versions': minor_count,
+            'patch_versions': patch_count
+        }
@@ -0,0 +1,18 @@
+
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.auth_wrapper
+import terrareg.module_indexing_job
+
+
+class ApiTerraregModuleIndexingJob(ErrorCatchingResource):
+    """Interface to obtain status of queued module indexing job."""
+
+    method_decorators = [terrareg.auth_wrapper.auth_wrapper('can_access_read_api')]
+
+    def _get(self, job_id):
+        """Return details of module indexing job."""
+        job = terrareg.module_indexing_job.ModuleIndexingJob.get(pk=job_id)
+        if job is None:
+            return self._get_404_response()
+
+        return job.get_api_outline()
@@ -0,0 +1,266 @@
+"""Provide parser for graphviz output of terraform graph."""
+
+import re
+
+from terrareg.errors import InvalidTerraformGraphError
+
+
+class TerraformGraphParser:
+    """
+    Parser for the subset of the DOT language generated by `terraform graph`.
+
+    Statements within subgraphs are treated as belonging to the graph, attributes are discarded
+    and the nodes and edges are returned in the order that graphviz would return them.
+    """
+
+    # Match tokens, including preceding whitespace.
+    # Any other character is matched as invalid, so that tokens are contiguous.
+    TOKEN_RE = re.compile(r'''
+        \s*(?:
+            (?P<comment>//[^\n]*|\#[^\n]*|/\*.*?\*/)
+          | (?P<quoted>"(?:[^"\\]|\\.)*")
+          | (?P<edge_op>->|--)
+          | (?P<id>[A-Za-z_\x80-\U0010ffff][\w\x80-\U0010ffff]*|-?(?:\.\d+|\d+(?:\.\d*)?))
+          | (?P<punctuation>[{}\[\]=;,:])
+          | (?P<invalid>\S)
+        )
+    ''', re.VERBOSE | re.DOTALL)
+
+    # Escape sequences in quoted strings, which are handled by graphviz:
+    # escaped quotes and line continuations
+    QUOTED_ESCAPE_RE = re.compile(r'\\(["\n])')
+
+    # Match opening line of graph generated by terraform graph
+    GRAPH_HEADER_LINE_RE = re.compile(r'[ \t]*digraph(?:[ \t]+(?:"[^"\\\n]*(?:\\"[^"\\\n]*)*"|\w+))?[ \t]*\{[ \t]*')
+
+    # Match single statement in line of graph generated by terraform graph, being one of:
+    # a node or edge between two nodes, with optional attributes, a graph attribute,
+    # opening of a subgraph or closing brace
+    STATEMENT_LINE_RE = re.compile(r'''
+        [ \t]*(?:
+            "(?P<tail>[^"\\\n]*(?:\\"[^"\\\n]*)*)"[ \t]*
+            (?:->[ \t]*"(?P<head>[^"\\\n]*(?:\\"[^"\\\n]*)*)"[ \t]*)?
+            (?:\[[^\]"\n]*(?:"[^"\\\n]*(?:\\"[^"\\\n]*)*"[^\]"\n]*)*\][ \t]*)?
+          | (?P<attribute>\w+[ \t]*=[ \t]*(?:"[^"\\\n]*(?:\\"[^"\\\n]*)*"|\w+)[ \t]*)
+          | (?P<subgraph>subgraph(?:[ \t]+(?:"[^"\\\n]*(?:\\"[^"\\\n]*)*"|\w+))?[ \t]*\{[ \t]*)
+          | (?P<close>\}[ \t]*)
+        );?[ \t]*
+    ''', re.VERBOSE)
+
+    KEYWORDS = frozenset(['strict', 'graph', 'digraph', 'subgraph', 'node', 'edge'])
+
+    @classmethod
+    def _tokenize(cls, data):
+        """Yield (type, value) for each token, excluding whitespace and comments."""
+        for match in cls.TOKEN_RE.finditer(data):
+            token_type = match.lastgroup
+            value = match.group(token_type)
+            if token_type == 'quoted':
+                value = value[1:-1]
+                if '\\' in value:
+                    value = cls.QUOTED_ESCAPE_RE.sub(lambda escape: '"' if escape.group(1) == '"' else '', value)
+                yield 'id', value
+            elif token_type == 'id':
+                # Keywords are only valid as unquoted IDs
+                yield ('keyword' if value.lower() in cls.KEYWORDS else 'id'), value
+            elif token_type == 'invalid':
+                raise InvalidTerraformGraphError(f'Unexpected character in graph at position {match.start(token_type)}: {value!r}')
+            elif token_type != 'comment':
+                yield token_type, value
+
+    @classmethod
+    def _parse_lines(cls, data):
+        """
+        Parse graph containing a single statement per line, as generated by terraform graph,
+        returning dictionary of node names to order of creation and list of edges, in order of creation.
+
+        Returns None if the graph contains any other statements.
+        """
+        lines = data.splitlines()
+        line_itx = 0
+        while line_itx < len(lines) and not lines[line_itx].strip():
+            line_itx += 1
+        if line_itx == len(lines) or not cls.GRAPH_HEADER_LINE_RE.fullmatch(lines[line_itx]):
+            return None
+
+        nodes = {}
+        edges = []
+        depth = 1
+        for line in lines[line_itx + 1:]:
+            match = cls.STATEMENT_LINE_RE.fullmatch(line)
+            if match is None or depth == 0:
+                if not line.strip():
+                    continue
+                return None
+
+            tail = match.group('tail')
+            if tail is not None:
+                if '\\' in tail:
+                    tail = cls.QUOTED_ESCAPE_RE.sub('"', tail)
+                if tail not in nodes:
+                    nodes[tail] = len(nodes)
+                head = match.group('head')
+                if head is not None:
+                    if '\\' in head:
+                        head = cls.QUOTED_ESCAPE_RE.sub('"', head)
+                    if head not in nodes:
+                        nodes[head] = len(nodes)
+                    edges.append((tail, head))
+            elif match.group('subgraph') is not None:
+                depth += 1
+            elif match.group('close') is not None:
+                depth -= 1
+
+        if depth != 0:
+            return None
+        return nodes, edges
+
+    @classmethod
+    def _parse_tokens(cls, data):
+        """
+        Parse graph, returning dictionary of node names to order
+        of creation and list of edges, in order of creation.
+        """
+        # Dictionary of node name to index, used as an ordered set
+        nodes = {}
+        edges = []
+        seen_edges = set()
+
+        tokens = cls._tokenize(data)
+        pending = []
+
+        def next_token():
+            """Return next token, including any that have been pushed back"""
+            if pending:
+                return pending.pop()
+            return next(tokens, (None, None))
+
+        def skip_attributes():
+            """Skip attribute list, after opening bracket"""
+            while True:
+                token_type, value = next_token()
+                if token_type is None:
+                    raise InvalidTerraformGraphError('Unterminated attribute list in graph')
+                if value == ']' and token_type == 'punctuation':
+                    # Handle multiple consecutive attribute lists
+                    token_type, value = next_token()
+                    if not (token_type == 'punctuation' and value == '['):
+                        pending.append((token_type, value))
+                        return
+
+        def read_node_id(node_id):
+            """Return node ID, skipping any port"""
+            token_type, value = next_token()
+            while token_type == 'punctuation' and value == ':':
+                port_type, _ = next_token()
+                if port_type != 'id':
+                    raise InvalidTerraformGraphError('Invalid node port in graph')
+                token_type, value = next_token()
+            pending.append((token_type, value))
+            return node_id
+
+        token_type, value = next_token()
+        strict = False
+        if token_type == 'keyword' and value.lower() == 'strict':
+            strict = True
+            token_type, value = next_token()
+        if token_type != 'keyword' or value.lower() != 'digraph':
+            raise InvalidTerraformGraphError('Graph must be a digraph')
+        token_type, value = next_token()
+        if token_type == 'id':
+            token_type, value = next_token()
+        if value != '{':
+            raise InvalidTerraformGraphError('Expected opening brace of graph')
+
+        depth = 1
+        while depth:
+            token_type, value = next_token()
+            if token_type is None:
+                raise InvalidTerraformGraphError('Unexpected end of graph')
+
+            if token_type == 'punctuation':
+                if value == '}':
+                    depth -= 1
+                elif value == '{':
+                    # Anonymous subgraph
+                    depth += 1
+                elif value not in (';', ','):
+                    raise InvalidTerraformGraphError(f'Unexpected {value!r} in graph')
+
+            elif token_type == 'keyword':
+                keyword = value.lower()
+                if keyword == 'subgraph':
+                    token_type, value = next_token()
+                    if token_type == 'id':
+                        token_type, value = next_token()
+                    if value != '{':
+                        raise InvalidTerraformGraphError('Expected opening brace of subgraph')
+                    depth += 1
+                elif keyword in ('graph', 'node', 'edge'):
+                    # Default attribute statement
+                    token_type, value = next_token()
+                    if value != '[':
+                        raise InvalidTerraformGraphError(f'Expected attributes after {keyword}')
+                    skip_attributes()
+                else:
+                    raise InvalidTerraformGraphError(f'Unexpected {value!r} in graph')
+
+            elif token_type == 'id':
+                first_id = value
+                token_type, value = next_token()
+                if token_type == 'punctuation' and value == '=':
+                    # Graph attribute
+                    token_type, value = next_token()
+                    if token_type != 'id':
+                        raise InvalidTerraformGraphError(f'Expected value of graph attribute {first_id}')
+                    continue
+
+                pending.append((token_type, value))
+                endpoints = [read_node_id(first_id)]
+                token_type, value = next_token()
+                while token_type == 'edge_op':
+                    token_type, value = next_token()
+                    if token_type != 'id':
+                        raise InvalidTerraformGraphError('Expected node after edge operator')
+                    endpoints.append(read_node_id(value))
+                    token_type, value = next_token()
+
+                if token_type == 'punctuation' and value == '[':
+                    skip_attributes()
+                else:
+                    pending.append((token_type, value))
+
+                for endpoint in endpoints:
+                    if endpoint not in nodes:
+                        nodes[endpoint] = len(nodes)
+                for tail, head in zip(endpoints, endpoints[1:]):
+                    if strict:
+                        if (tail, head) in seen_edges:
+                            continue
+                        seen_edges.add((tail, head))
+                    edges.append((tail, head))
+
+            else:
+                raise InvalidTerraformGraphError(f'Unexpected {value!r} in graph')
+
+        if next_token()[0] is not None:
+            raise InvalidTerraformGraphError('Unexpected content after end of graph')
+
+        return nodes, edges
+
+    @classmethod
+    def parse(cls, data):
+        """
+        Parse graph, returning list of node names, in order of creation,
+        and list of (tail, head) edges, ordered by tail node, head node and then creation.
+        """
+        parsed = cls._parse_lines(data)
+        if parsed is None:
+            parsed = cls._parse_tokens(data)
+        nodes, edges = parsed
+
+        # Sort edges by tail and head node,
+        # retaining order of creation for parallel edges
+        edges.sort(key=lambda edge: (nodes[edge[0]], nodes[edge[1]]))
+
+        return list(nodes), edges
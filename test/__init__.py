@@ -15,6 +15,7 @@ from terrareg.server import Server
 import terrareg.config
 from terrareg.user_group_namespace_permission_type import UserGroupNamespacePermissionType
 from terrareg.constants import EXTRACTION_VERSION
+from terrareg.module_specs_cache import ModuleSpecsCache
 
 
 @pytest.fixture
@@ -74,6 +75,8 @@ class BaseTest:
             os.unlink(cls._get_database_path())
 
         Database.reset()
+        # Remove parsed module specs, as module details IDs are re-used after resetting the database
+        ModuleSpecsCache.clear()
         cls.SERVER = Server()
 
         # Create DB tables
@@ -113,13 +116,18 @@ class BaseTest:
             conn.execute(db.user_group.delete())
             conn.execute(db.sub_module.delete())
             conn.execute(db.module_version.delete())
+            conn.execute(db.module_indexing_job.delete())
             conn.execute(db.module_provider.delete())
             conn.execute(db.example_file.delete())
             conn.execute(db.module_details.delete())
             conn.execute(db.git_provider.delete())
             conn.execute(db.analytics.delete())
+            conn.execute(db.analytics_module_version_daily.delete())
+            conn.execute(db.analytics_module_provider_daily.delete())
+            conn.execute(db.analytics_token_daily.delete())
             conn.execute(db.session.delete())
             conn.execute(db.module_version_file.delete())
+            conn.execute(db.module_search_trigram.delete())
             conn.execute(db.namespace.delete())
 
         with cls._patch_audit_event_creation():
@@ -0,0 +1,135 @@
+
+import time
+from unittest import mock
+
+import pytest
+
+from terrareg.analytics import AnalyticsEngine, AnalyticsIngestionQueue
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestAnalyticsIngestionQueue(AnalyticsIntegrationTest):
+    """Test asynchronous ingestion of analytics."""
+
+    @pytest.fixture(autouse=True)
+    def mock_ingestion_config(self):
+        """Enable asynchronous ingestion and ensure queue is stopped after each test."""
+        AnalyticsIngestionQueue.shutdown_instance()
+        self._batch_size = 100
+        self._flush_interval = 60
+        self._max_queue_size = 100
+
+        with mock.patch('terrareg.config.Config.ANALYTICS_ASYNC_INGESTION', True), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_BATCH_SIZE', property(lambda _: self._batch_size)), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_FLUSH_INTERVAL', property(lambda _: self._flush_interval)), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_MAX_QUEUE_SIZE', property(lambda _: self._max_queue_size)):
+            try:
+                yield
+            finally:
+                AnalyticsIngestionQueue.shutdown_instance()
+
+    def _record_downloads(self, count):
+        """Record downloads for test module version."""
+        module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider'), '1.5.0')
+        for _ in range(count):
+            AnalyticsEngine.record_module_version_download(
+                namespace_name='testnamespace', module_name='publishedmodule', provider_name='testprovider',
+                module_version=module_version, terraform_version='1.5.2',
+                analytics_token='ingestion-test', user_agent=None, auth_token=None)
+
+    def test_downloads_queued_until_flush(self):
+        """Test that downloads are queued and inserted on flush."""
+        initial_downloads = AnalyticsEngine.get_total_downloads()
+
+        self._record_downloads(3)
+
+        assert AnalyticsIngestionQueue.get().get_queue_depth() == 3
+        assert AnalyticsEngine.get_total_downloads() == initial_downloads
+
+        AnalyticsIngestionQueue.get().flush()
+
+        assert AnalyticsIngestionQueue.get().get_queue_depth() == 0
+        assert AnalyticsEngine.get_total_downloads() == initial_downloads + 3
+
+    def test_downloads_inserted_in_batches(self):
+        """Test that queued downloads are inserted using multi-row inserts of batch size."""
+        self._batch_size = 2
+        self._record_downloads(5)
+
+        with mock.patch.object(AnalyticsIngestionQueue, '_insert_batch') as mock_insert_batch:
+            AnalyticsIngestionQueue.get().flush()
+
+        assert [len(call.args[0]) for call in mock_insert_batch.call_args_list] == [2, 2, 1]
+
+    def test_worker_inserts_on_batch_size(self):
+        """Test that worker inserts downloads once batch size is reached, without waiting for flush interval."""
+        self._batch_size = 2
+        initial_downloads = AnalyticsEngine.get_total_downloads()
+
+        self._record_downloads(2)
+
+        for _ in range(50):
+            if AnalyticsEngine.get_total_downloads() == initial_downloads + 2:
+                break
+            time.sleep(0.1)
+        assert AnalyticsEngine.get_total_downloads() == initial_downloads + 2
+        assert AnalyticsIngestionQueue.get().get_queue_depth() == 0
+
+    def test_shutdown_inserts_queued_downloads(self):
+        """Test that queued downloads are inserted on shutdown."""
+        initial_downloads = AnalyticsEngine.get_total_downloads()
+        self._record_downloads(2)
+
+        AnalyticsIngestionQueue.shutdown_instance()
+
+        assert AnalyticsEngine.get_total_downloads() == initial_downloads + 2
+
+    def test_full_queue_inserts_synchronously(self):
+        """Test that downloads are inserted directly when the queue is full."""
+        self._max_queue_size = 1
+        initial_downloads = AnalyticsEngine.get_total_downloads()
+
+        self._record_downloads(3)
+
+        assert AnalyticsIngestionQueue.get().get_queue_depth() == 1
+        assert AnalyticsEngine.get_total_downloads() == initial_downloads + 2
+
+    def test_prometheus_queue_depth_metric(self):
+        """Test that queue depth is reported in Prometheus metrics."""
+        self._record_downloads(2)
+
+        assert """
+# HELP analytics_ingestion_queue_depth Number of module downloads waiting to be inserted into the database
+# TYPE analytics_ingestion_queue_depth gauge
+analytics_ingestion_queue_depth 2
+""".strip() in AnalyticsEngine.get_prometheus_metrics()
+
+    def test_failed_batch_inserted_individually(self):
+        """Test that downloads of a failed batch are inserted individually and failed downloads are counted."""
+        initial_downloads = AnalyticsEngine.get_total_downloads()
+        self._record_downloads(3)
+
+        ingestion_queue = AnalyticsIngestionQueue.get()
+        original_insert_batch = ingestion_queue._insert_batch
+        insert_batch_calls = []
+        def insert_batch(batch):
+            insert_batch_calls.append(len(batch))
+            # Fail the multi-row insert and the insert of the second download
+            if len(insert_batch_calls) in [1, 3]:
+                raise Exception('Unable to insert')
+            original_insert_batch(batch)
+
+        with mock.patch.object(ingestion_queue, '_insert_batch', side_effect=insert_batch):
+            ingestion_queue.flush()
+
+        assert insert_batch_calls == [3, 1, 1, 1]
+        assert ingestion_queue.get_queue_depth() == 0
+        assert ingestion_queue.get_dropped_count() == 1
+        assert AnalyticsEngine.get_total_downloads() == initial_downloads + 2
+
+        assert """
+# HELP analytics_ingestion_dropped_count Number of module downloads that could not be inserted into the database
+# TYPE analytics_ingestion_dropped_count counter
+analytics_ingestion_dropped_count 1
+""".strip() in AnalyticsEngine.get_prometheus_metrics()
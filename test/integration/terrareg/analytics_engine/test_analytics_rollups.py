@@ -0,0 +1,232 @@
+
+import datetime
+from unittest import mock
+
+import pytest
+import sqlalchemy.exc
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_search import ModuleSearch
+from . import AnalyticsIntegrationTest
+
+
+class TestAnalyticsRollups(AnalyticsIntegrationTest):
+    """Test daily rollups of analytics."""
+
+    def setup_method(self, method):
+        """Delete any analytics data"""
+        self._delete_analytics()
+        return super().setup_method(method)
+
+    def teardown_method(self, method):
+        """Delete any analytics data"""
+        self._delete_analytics()
+        return super().teardown_method(method)
+
+    @staticmethod
+    def _delete_analytics():
+        """Delete analytics and rollups."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            for table in [db.analytics, db.analytics_module_version_daily,
+                          db.analytics_module_provider_daily, db.analytics_token_daily]:
+                conn.execute(table.delete())
+
+    @staticmethod
+    def _get_module_version(module, provider, version):
+        """Return module version from testnamespace."""
+        return ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), module), provider), version)
+
+    def _record_download(self, module_version, timestamp=None):
+        """Record download for module version at given timestamp."""
+        timestamp = timestamp if timestamp is not None else datetime.datetime.now()
+        module_provider = module_version.module_provider
+        with mock.patch('terrareg.analytics.AnalyticsEngine.get_datetime_now', mock.MagicMock(return_value=timestamp)):
+            AnalyticsEngine.record_module_version_download(
+                namespace_name=module_provider.module.namespace.name,
+                module_name=module_provider.module.name,
+                provider_name=module_provider.name,
+                module_version=module_version, terraform_version='1.5.2',
+                analytics_token='rollup-test', user_agent=None, auth_token=None)
+
+    def test_module_provider_download_stats(self):
+        """Test obtaining download stats for module provider for each interval."""
+        now = datetime.datetime.now()
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        for days in [0, 0, 10, 100, 400]:
+            self._record_download(module_version, now - datetime.timedelta(days=days))
+        # Download for another provider of the same module
+        self._record_download(self._get_module_version('publishedmodule', 'secondprovider', '1.0.0'), now)
+
+        with mock.patch('terrareg.database.Database.get_connection', wraps=Database.get_connection) as mock_get_connection:
+            stats = AnalyticsEngine.get_module_provider_download_stats(module_version.module_provider)
+            # Ensure all stats are obtained in a single query
+            mock_get_connection.assert_called_once()
+
+        assert stats == {'week': 2, 'month': 3, 'year': 4, 'total': 5}
+
+    def test_module_provider_download_stats_interval_boundaries(self):
+        """Test each interval includes today and the previous days, up to the number of days in the interval."""
+        now = datetime.datetime(2023, 10, 20, 12, 0, 0)
+        module_provider = self._get_module_version('publishedmodule', 'testprovider', '1.5.0').module_provider
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            for days, download_count in [(6, 1), (7, 10), (30, 100), (31, 1000)]:
+                conn.execute(db.analytics_module_provider_daily.insert().values(
+                    date=now.date() - datetime.timedelta(days=days),
+                    module_provider_id=module_provider.pk,
+                    download_count=download_count
+                ))
+
+        with mock.patch('terrareg.analytics.AnalyticsEngine.get_datetime_now', mock.MagicMock(return_value=now)):
+            stats = AnalyticsEngine.get_module_provider_download_stats(module_provider)
+
+        assert stats == {'week': 1, 'month': 111, 'year': 1111, 'total': 1111}
+
+    def test_module_version_total_downloads(self):
+        """Test obtaining total downloads for module versions."""
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        other_module_version = self._get_module_version('publishedmodule', 'testprovider', '1.4.0')
+        yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+        for timestamp in [None, None, yesterday]:
+            self._record_download(module_version, timestamp)
+        self._record_download(other_module_version)
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 3
+        assert AnalyticsEngine.get_module_version_total_downloads(other_module_version) == 1
+        assert AnalyticsEngine.get_module_version_total_downloads(
+            self._get_module_version('secondmodule', 'testprovider', '1.1.1')) == 0
+        assert AnalyticsEngine.get_total_downloads() == 4
+
+        # Ensure downloads on the same day are stored in a single rollup row
+        db = Database.get()
+        with db.get_connection() as conn:
+            rows = conn.execute(db.analytics_module_version_daily.select().where(
+                db.analytics_module_version_daily.c.module_version_id == module_version.pk
+            )).fetchall()
+        assert sorted(row['download_count'] for row in rows) == [1, 2]
+
+    def test_rollups_match_analytics(self):
+        """Test that rollups contain the same number of downloads as raw analytics."""
+        self._import_test_analytics(self._TEST_ANALYTICS_DATA)
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            analytics_count = len(conn.execute(db.analytics.select()).fetchall())
+            for table in [db.analytics_module_version_daily, db.analytics_module_provider_daily, db.analytics_token_daily]:
+                rows = conn.execute(table.select()).fetchall()
+                assert sum(row['download_count'] for row in rows) == analytics_count
+
+        assert AnalyticsEngine.get_total_downloads() == analytics_count
+
+    def test_delete_analytics_for_module_version(self):
+        """Test deleting analytics for module version removes downloads from rollups."""
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        other_module_version = self._get_module_version('publishedmodule', 'testprovider', '1.4.0')
+        self._record_download(module_version)
+        self._record_download(module_version)
+        self._record_download(other_module_version)
+
+        AnalyticsEngine.delete_analytics_for_module_version(module_version)
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 0
+        assert AnalyticsEngine.get_module_version_total_downloads(other_module_version) == 1
+        assert AnalyticsEngine.get_module_provider_download_stats(module_version.module_provider) == {
+            'week': 1, 'month': 1, 'year': 1, 'total': 1
+        }
+        assert AnalyticsEngine.get_global_module_usage_counts(include_empty_auth_token=True) == {
+            'testnamespace/publishedmodule/testprovider': 1
+        }
+
+    def test_migrate_analytics_to_new_module_version(self):
+        """Test migrating analytics to new module version migrates rollups."""
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        other_module_version = self._get_module_version('publishedmodule', 'testprovider', '1.4.0')
+        self._record_download(module_version)
+        self._record_download(other_module_version)
+
+        AnalyticsEngine.migrate_analytics_to_new_module_version(
+            old_version_version_pk=other_module_version.pk,
+            new_module_version=module_version)
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 2
+        assert AnalyticsEngine.get_module_version_total_downloads(other_module_version) == 0
+        assert AnalyticsEngine.get_module_provider_download_stats(module_version.module_provider)['total'] == 2
+
+    def test_most_downloaded_module_provider_this_week(self):
+        """Test obtaining most downloaded module provider from rollups."""
+        old_timestamp = datetime.datetime.now() - datetime.timedelta(days=30)
+        for _ in range(3):
+            self._record_download(self._get_module_version('publishedmodule', 'testprovider', '1.5.0'), old_timestamp)
+        self._record_download(self._get_module_version('publishedmodule', 'testprovider', '1.5.0'))
+        self._record_download(self._get_module_version('secondmodule', 'testprovider', '1.1.1'))
+        self._record_download(self._get_module_version('secondmodule', 'testprovider', '1.1.1'))
+
+        module_provider = ModuleSearch.get_most_downloaded_module_provider_this_Week()
+        assert module_provider.id == 'testnamespace/secondmodule/testprovider'
+
+    def test_record_download_rolled_back_on_rollup_failure(self):
+        """Test analytics are not recorded when updating rollups fails."""
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        self._record_download(module_version)
+
+        with mock.patch('terrareg.analytics.AnalyticsEngine.update_rollups',
+                        mock.MagicMock(side_effect=Exception('Unable to update rollups'))):
+            with pytest.raises(Exception):
+                self._record_download(module_version)
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            assert len(conn.execute(db.analytics.select()).fetchall()) == 1
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 1
+
+    def test_rollup_rows_unique_per_key(self):
+        """Test downloads with the same key are added to a single rollup row in each table."""
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        for _ in range(3):
+            self._record_download(module_version)
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            for table in [db.analytics_module_version_daily, db.analytics_module_provider_daily, db.analytics_token_daily]:
+                rows = conn.execute(table.select()).fetchall()
+                assert [row['download_count'] for row in rows] == [3]
+
+            # Ensure inserting a duplicate rollup row is rejected
+            with pytest.raises(sqlalchemy.exc.IntegrityError):
+                conn.execute(db.analytics_module_version_daily.insert().values(
+                    date=datetime.date.today(), module_version_id=module_version.pk, download_count=1
+                ))
+
+    def test_migrate_analytics_to_module_version_with_existing_rollups(self):
+        """Test migrating analytics to module version with existing rollups merges rollup rows."""
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        other_module_version = self._get_module_version('publishedmodule', 'testprovider', '1.4.0')
+        self._record_download(module_version)
+        self._record_download(other_module_version)
+        self._record_download(other_module_version)
+
+        AnalyticsEngine.migrate_analytics_to_new_module_version(
+            old_version_version_pk=other_module_version.pk,
+            new_module_version=module_version)
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            for table in [db.analytics_module_version_daily, db.analytics_token_daily]:
+                rows = conn.execute(table.select()).fetchall()
+                assert [(row['module_version_id'], row['download_count']) for row in rows] == [(module_version.pk, 3)]
+
+    def test_delete_analytics_for_module_provider(self):
+        """Test deleting analytics for module provider removes module provider rollups."""
+        module_version = self._get_module_version('publishedmodule', 'testprovider', '1.5.0')
+        other_module_version = self._get_module_version('publishedmodule', 'secondprovider', '1.0.0')
+        self._record_download(module_version)
+        self._record_download(other_module_version)
+
+        AnalyticsEngine.delete_analytics_for_module_provider(module_version.module_provider)
+
+        assert AnalyticsEngine.get_module_provider_download_stats(module_version.module_provider)['total'] == 0
+        assert AnalyticsEngine.get_module_provider_download_stats(other_module_version.module_provider)['total'] == 1
@@ -0,0 +1,108 @@
+
+import datetime
+from unittest import mock
+
+import sqlalchemy
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestCompactAnalytics(AnalyticsIntegrationTest):
+    """Test compact_analytics method."""
+
+    def setup_method(self, method):
+        """Delete any analytics data"""
+        self._delete_analytics()
+        return super().setup_method(method)
+
+    def teardown_method(self, method):
+        """Delete any analytics data"""
+        self._delete_analytics()
+        return super().teardown_method(method)
+
+    @staticmethod
+    def _delete_analytics():
+        """Delete analytics and rollups."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            for table in [db.analytics, db.analytics_module_version_daily,
+                          db.analytics_module_provider_daily, db.analytics_token_daily]:
+                conn.execute(table.delete())
+
+    @staticmethod
+    def _get_analytics_count():
+        """Return number of raw analytics rows."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return conn.execute(sqlalchemy.select(sqlalchemy.func.count()).select_from(db.analytics)).scalar()
+
+    @staticmethod
+    def _get_module_providers():
+        """Return all module providers with analytics test data."""
+        return [
+            ModuleProvider.get(Module(Namespace(namespace), module), provider)
+            for namespace, module, provider in [
+                ('testnamespace', 'publishedmodule', 'testprovider'),
+                ('testnamespace', 'publishedmodule', 'secondprovider'),
+                ('testnamespace', 'secondmodule', 'testprovider'),
+                ('secondnamespace', 'othernamespacemodule', 'anotherprovider'),
+            ]
+        ]
+
+    def _get_analytics_state(self):
+        """Return results of analytics queries, which should be unaffected by compaction."""
+        return {
+            'token_versions': [
+                AnalyticsEngine.get_module_provider_token_versions(module_provider)
+                for module_provider in self._get_module_providers()
+            ],
+            'download_stats': [
+                AnalyticsEngine.get_module_provider_download_stats(module_provider)
+                for module_provider in self._get_module_providers()
+            ],
+            'global_usage': AnalyticsEngine.get_global_module_usage_counts(include_empty_auth_token=True),
+            'total_downloads': AnalyticsEngine.get_total_downloads(),
+        }
+
+    def test_compact_analytics_disabled(self):
+        """Test that analytics are not removed when retention is disabled."""
+        with mock.patch('terrareg.analytics.AnalyticsEngine.get_datetime_now',
+                        mock.MagicMock(return_value=datetime.datetime.now() - datetime.timedelta(days=100))):
+            self._import_test_analytics(self._TEST_ANALYTICS_DATA)
+        analytics_count = self._get_analytics_count()
+
+        with mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', -1):
+            assert AnalyticsEngine.compact_analytics() == 0
+
+        assert self._get_analytics_count() == analytics_count
+
+    def test_compact_analytics(self):
+        """Test removing old analytics, retaining latest analytics for each token."""
+        with mock.patch('terrareg.analytics.AnalyticsEngine.get_datetime_now',
+                        mock.MagicMock(return_value=datetime.datetime.now() - datetime.timedelta(days=100))):
+            self._import_test_analytics(self._TEST_ANALYTICS_DATA)
+        # Import recent analytics, which should not be removed
+        self._import_test_analytics({
+            'testnamespace/publishedmodule/testprovider/1.5.0': [
+                ['test-application', 'dev-key', '0.11.31'],
+                ['test-application', 'dev-key', '0.11.31'],
+            ]
+        })
+
+        expected_state = self._get_analytics_state()
+        analytics_count = self._get_analytics_count()
+
+        with mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 30), \
+                mock.patch('terrareg.config.Config.ANALYTICS_COMPACTION_BATCH_SIZE', 2):
+            deleted_count = AnalyticsEngine.compact_analytics()
+
+        assert deleted_count > 0
+        assert self._get_analytics_count() == analytics_count - deleted_count
+        assert self._get_analytics_state() == expected_state
+
+        # Ensure subsequent compaction does not remove any further rows
+        with mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 30):
+            assert AnalyticsEngine.compact_analytics() == 0
@@ -0,0 +1,22 @@
+
+from unittest import mock
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from . import AnalyticsIntegrationTest
+
+
+class TestGetModuleProviderVersionStatistics(AnalyticsIntegrationTest):
+    """Test get_module_provider_version_statistics method."""
+
+    def test_get_module_provider_version_statistics(self):
+        """Test obtaining major, minor and patch counts for published, non-beta versions."""
+        with mock.patch('terrareg.database.Database.get_connection', wraps=Database.get_connection) as mock_get_connection:
+            # publishedmodule/testprovider: 0.9.0, 1.3.0 and 2.0.0 (major),
+            # 1.4.0, 1.5.0 and 2.1.5 (minor), 0.9.1 and 0.9.2 (patch)
+            # publishedmodule/secondprovider, secondmodule, unusedmodule, noanalyticstoken
+            # and othernamespacemodule each contain a single (major) version
+            assert AnalyticsEngine.get_module_provider_version_statistics() == (8, 3, 2)
+
+            # Ensure all versions are obtained in a single query
+            mock_get_connection.assert_called_once()
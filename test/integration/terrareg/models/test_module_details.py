@@ -1,6 +1,7 @@
 
 from datetime import datetime
 import json
+import unittest.mock
 
 import pytest
 import sqlalchemy
@@ -84,6 +85,43 @@ class TestModuleDetails(TerraregIntegrationTest):
 
         assert res == None
 
+    def test_column_loading(self):
+        """Test columns are only selected from the database when accessed."""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(
+            readme_content='test readme content',
+            terraform_graph='digraph {\n}',
+            infracost='{"totalMonthlyCost": "123.321"}'
+        )
+
+        module_details = ModuleDetails(module_details.pk)
+        assert module_details.readme_content == Database.encode_blob('test readme content')
+        assert list(module_details._cache_columns.keys()) == ['readme_content']
+
+        # Ensure columns are not re-selected
+        with unittest.mock.patch('terrareg.database.Database.get_connection') as mock_get_connection:
+            assert module_details.readme_content == Database.encode_blob('test readme content')
+            mock_get_connection.assert_not_called()
+
+        assert module_details.infracost == {'totalMonthlyCost': '123.321'}
+        assert sorted(module_details._cache_columns.keys()) == ['infracost', 'readme_content']
+
+        # Ensure cached columns are removed after update
+        module_details.update_attributes(readme_content='updated readme content')
+        assert module_details._cache_columns == {}
+        assert module_details.readme_content == Database.encode_blob('updated readme content')
+
+    def test_column_loading_non_existent(self):
+        """Test accessing columns of non-existent module details."""
+        module_details = ModuleDetails(-1)
+        assert module_details.readme_content is None
+        assert module_details.terraform_docs is None
+        assert module_details.tfsec == {'results': None}
+        assert module_details.infracost == {}
+        assert module_details.terraform_graph is None
+        assert module_details.terraform_version is None
+        assert module_details.terraform_modules is None
+
     def test_graph_json(self):
         """Test graph data conversion to JSON"""
         module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace.get("moduledetails"), "graph-test"), "provider"), "1.0.0")
@@ -122,3 +160,63 @@ class TestModuleDetails(TerraregIntegrationTest):
                 {"classes": ["module.main_call-root"], "data": {"id": "root.module.main_call", "source": "module.main_call", "target": "root"}}
             ]
         }
+
+    def test_graph_json_precomputed(self):
+        """Test graph JSON is generated once for all label options and then read from database."""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(terraform_graph="""
+digraph {
+	compound = "true"
+	newrank = "true"
+	subgraph "root" {
+		"[root] aws_s3_bucket.test_bucket (expand)" [label = "aws_s3_bucket.test_bucket", shape = "box"]
+		"[root] module.submodule-call.aws_ec2_instance.test_instance (expand)" [label = "module.submodule-call.aws_ec2_instance.test_instance", shape = "box"]
+		"[root] module.submodule-call (close)" [label = "module.submodule-call", shape = "box"]
+	}
+}
+""")
+        assert module_details._get_precomputed_graph_json() is None
+
+        graphs = module_details.update_graph_json()
+        assert sorted(graphs.keys()) == [
+            'full_resource_names,full_module_names',
+            'full_resource_names,short_module_names',
+            'short_resource_names,full_module_names',
+            'short_resource_names,short_module_names',
+        ]
+
+        # Ensure graph JSON is not re-generated
+        with unittest.mock.patch('terrareg.models.ModuleDetails._generate_graph_json') as mock_generate_graph_json:
+            module_details = ModuleDetails(module_details.pk)
+            for full_resource_names in [False, True]:
+                for full_module_names in [False, True]:
+                    graph_json = module_details.get_graph_json(full_resource_names=full_resource_names, full_module_names=full_module_names)
+                    assert graph_json == graphs[module_details._get_graph_json_key(full_resource_names, full_module_names)]
+            mock_generate_graph_json.assert_not_called()
+
+        labels = {
+            node["data"]["id"]: node["data"]["label"]
+            for node in module_details.get_graph_json(full_resource_names=True)["nodes"]
+        }
+        assert labels["module.submodule-call.aws_ec2_instance.test_instance"] == "module.submodule-call.aws_ec2_instance.test_instance"
+        assert labels["module.submodule-call"] == "submodule-call"
+
+    def test_graph_json_outdated_version(self):
+        """Test graph JSON is re-generated when pre-computed graph JSON is from a previous version."""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(
+            terraform_graph='digraph {\n"[root] aws_s3_bucket.test_bucket (expand)" [label = "aws_s3_bucket.test_bucket", shape = "box"]\n}',
+            terraform_graph_json=json.dumps({"version": 0, "graphs": {}})
+        )
+
+        graph_json = module_details.get_graph_json()
+        assert [node["data"]["id"] for node in graph_json["nodes"]] == ["aws_s3_bucket.test_bucket"]
+
+        # Ensure re-generated graph JSON has been stored
+        assert ModuleDetails(module_details.pk)._get_precomputed_graph_json() is not None
+
+    def test_graph_json_without_graph(self):
+        """Test graph JSON for module details without graph data."""
+        module_details = ModuleDetails.create()
+        assert module_details.get_graph_json() is None
+        assert module_details._get_precomputed_graph_json() is None
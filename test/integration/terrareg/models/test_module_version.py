@@ -1,3 +1,4 @@
+from collections import OrderedDict
 
 from datetime import datetime
 import os
@@ -952,6 +953,113 @@ module &quot;test-usage3&quot; {
 
             assert module_version.get_readme_html(server_hostname='example.com').strip() == expected_output.strip()
 
+    def test_get_readme_html_cache(self):
+        """Test get_readme_html uses cached HTML, keyed by public URL and module version state."""
+        with tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory), \
+                unittest.mock.patch('terrareg.config.Config.README_HTML_CACHE', True), \
+                unittest.mock.patch('terrareg.config.Config.PUBLIC_URL', 'https://example.com'), \
+                unittest.mock.patch('terrareg.readme_html_cache.ReadmeHtmlCache._MEMORY_CACHE', OrderedDict()) as memory_cache:
+            module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+            module_details_id = module_version.module_details.pk
+            module_version.module_details.update_attributes(readme_content='''
+```
+module "test-usage" {
+  source = "./"
+}
+```
+''')
+
+            readme_html = module_version.get_readme_html(server_hostname='example.com')
+            assert '&quot;example.com/' in readme_html
+            assert len(os.listdir(os.path.join(data_directory, 'readme-html-cache', str(module_details_id)))) == 1
+
+            # Ensure README is not re-rendered, from memory and from persistent cache
+            with unittest.mock.patch('terrareg.models.convert_markdown_to_html') as mock_convert_markdown_to_html:
+                assert module_version.get_readme_html(server_hostname='example.com') == readme_html
+                memory_cache.clear()
+                assert module_version.get_readme_html(server_hostname='example.com') == readme_html
+
+                # Ensure request hostname does not affect cache key, as the public URL is used
+                assert module_version.get_readme_html(server_hostname='other.example.com') == readme_html
+                mock_convert_markdown_to_html.assert_not_called()
+
+            # Ensure README is rendered once module version state changes
+            with unittest.mock.patch('terrareg.models.ModuleVersion.is_latest_version', False):
+                assert 'This version of the module is not the latest version' in module_version.get_readme_html(server_hostname='example.com')
+            assert len(os.listdir(os.path.join(data_directory, 'readme-html-cache', str(module_details_id)))) == 2
+
+            # Ensure cache is cleared when README is updated
+            module_version.module_details.update_attributes(readme_content='# Updated README')
+            assert not os.path.exists(os.path.join(data_directory, 'readme-html-cache', str(module_details_id)))
+            assert len(memory_cache) == 0
+            assert 'Updated README' in module_version.get_readme_html(server_hostname='example.com')
+
+    def test_get_readme_html_cache_request_hostname(self):
+        """Test README HTML for request hostnames is only cached in memory, when no public URL is configured."""
+        with tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory), \
+                unittest.mock.patch('terrareg.config.Config.README_HTML_CACHE', True), \
+                unittest.mock.patch('terrareg.config.Config.PUBLIC_URL', None), \
+                unittest.mock.patch('terrareg.config.Config.DOMAIN_NAME', None), \
+                unittest.mock.patch('terrareg.readme_html_cache.ReadmeHtmlCache._MEMORY_CACHE', OrderedDict()) as memory_cache:
+            module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+            module_version.module_details.update_attributes(readme_content='''
+```
+module "test-usage" {
+  source = "./"
+}
+```
+''')
+
+            readme_html = module_version.get_readme_html(server_hostname='example.com')
+            assert '&quot;example.com/' in readme_html
+            assert '&quot;other.example.com/' in module_version.get_readme_html(server_hostname='other.example.com')
+
+            assert len(memory_cache) == 2
+            assert not os.path.exists(os.path.join(data_directory, 'readme-html-cache'))
+
+            with unittest.mock.patch('terrareg.models.convert_markdown_to_html') as mock_convert_markdown_to_html:
+                assert module_version.get_readme_html(server_hostname='example.com') == readme_html
+                mock_convert_markdown_to_html.assert_not_called()
+
+    def test_get_module_specs_cache(self):
+        """Test parsed module specs are shared between instances and removed when terraform-docs output is updated."""
+        module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        module_version.module_details.update_attributes(terraform_docs='{"inputs": [{"name": "first"}], "outputs": []}')
+
+        module_specs = module_version.get_module_specs()
+        assert module_specs == {'inputs': [{'name': 'first'}], 'outputs': []}
+
+        # Ensure terraform-docs output is not re-parsed by new instances
+        with unittest.mock.patch('terrareg.models.json.loads') as mock_json_loads:
+            other_module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+            assert other_module_version.get_module_specs() is module_specs
+            mock_json_loads.assert_not_called()
+
+        # Ensure updated terraform-docs output is used
+        module_version.module_details.update_attributes(terraform_docs='{"inputs": [{"name": "second"}], "outputs": []}')
+        other_module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        assert other_module_version.get_module_specs() == {'inputs': [{'name': 'second'}], 'outputs': []}
+
+    def test_get_module_specs_cache_modified_outside_process(self):
+        """Test cached module specs are not used for different terraform-docs output of the same length."""
+        module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        module_version.module_details.update_attributes(terraform_docs='{"inputs": [{"name": "first"}], "outputs": []}')
+        assert module_version.get_module_specs() == {'inputs': [{'name': 'first'}], 'outputs': []}
+
+        # Update terraform-docs output directly in the database, as performed by another process
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_details.update().where(
+                db.module_details.c.id == module_version.module_details.pk
+            ).values(
+                terraform_docs=Database.encode_blob('{"inputs": [{"name": "other"}], "outputs": []}')
+            ))
+
+        other_module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        assert other_module_version.get_module_specs() == {'inputs': [{'name': 'other'}], 'outputs': []}
+
     def test_git_path(self):
         """Test git_path property"""
         # Ensure the git_path from the module provider is returned
@@ -1,4 +1,5 @@
 
+import hashlib
 import shutil
 import subprocess
 import json
@@ -986,6 +987,9 @@ digraph {
 }
 """.strip()
 
+        # Ensure graph JSON has been pre-computed
+        assert module_version.module_details._get_precomputed_graph_json() is not None
+
         assert module_version.get_examples()[0].module_details.terraform_graph.strip() == """
 digraph {
 	compound = "true"
@@ -1749,6 +1753,12 @@ resource "aws_s3_bucket" "test" {
                             'subdir/nested-file.tf': '# Nested file',
                         }
 
+                    # Ensure digest and size of zip archive are stored against module version
+                    with open(module_version.archive_path_zip, 'rb') as zip_fh:
+                        zip_content = zip_fh.read()
+                    assert module_version.archive_sha256 == hashlib.sha256(zip_content).hexdigest()
+                    assert module_version.archive_size == len(zip_content)
+
 
             finally:
                 shutil.rmtree(temp_dir)
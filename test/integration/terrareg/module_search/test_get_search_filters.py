@@ -3,7 +3,8 @@ from unittest import mock
 import pytest
 
 from terrareg.models import Module, ModuleProvider, Namespace
-from terrareg.module_search import ModuleSearch
+from terrareg.config import ModuleSearchBackend
+from terrareg.module_search import InMemoryModuleSearchIndex, ModuleSearch
 from test.integration.terrareg import TerraregIntegrationTest
 
 class TestGetSearchFilters(TerraregIntegrationTest):
@@ -132,3 +133,20 @@ class TestGetSearchFilters(TerraregIntegrationTest):
         assert results == {'providers': {'aws': 11, 'gcp': 2},
                            'namespaces': {'modulesearch': 8, 'modulesearch-contributed': 2, 'modulesearch-trusted': 3},
                            'contributed': 2, 'trusted_namespaces': 11, 'verified': 3}
+
+
+class TestGetSearchFiltersInMemory(TestGetSearchFilters):
+    """Run search filter tests against in-memory search backend."""
+
+    def setup_method(self, method):
+        """Enable in-memory search backend and rebuild index."""
+        super(TestGetSearchFiltersInMemory, self).setup_method(method)
+        self._search_backend_mock = mock.patch('terrareg.config.Config.MODULE_SEARCH_BACKEND', ModuleSearchBackend.MEMORY)
+        self._search_backend_mock.start()
+        InMemoryModuleSearchIndex.reset()
+
+    def teardown_method(self, method):
+        """Disable in-memory search backend."""
+        self._search_backend_mock.stop()
+        InMemoryModuleSearchIndex.reset()
+        super(TestGetSearchFiltersInMemory, self).teardown_method(method)
@@ -0,0 +1,92 @@
+
+import pytest
+
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_search import ModuleSearch, ModuleSearchIndex
+from test.integration.terrareg import TerraregIntegrationTest
+from test import mock_create_audit_event
+
+
+class TestModuleSearchIndex(TerraregIntegrationTest):
+
+    @staticmethod
+    def _get_indexed_trigrams(module_provider_pk):
+        """Return trigrams stored in index for module provider."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            res = conn.execute(db.module_search_trigram.select().where(
+                db.module_search_trigram.c.module_provider_id == module_provider_pk
+            ))
+            return set(r['trigram'] for r in res)
+
+    @pytest.mark.parametrize('value, expected_trigrams', [
+        (None, set()),
+        ('', set()),
+        ('ab', set()),
+        ('abc', {'abc'}),
+        ('AbCd', {'abc', 'bcd'}),
+        # Repeated trigrams
+        ('aaaa', {'aaa'}),
+        # LIKE wildcard/escape characters and whitespace are not indexed
+        ('ab_cde', {'cde'}),
+        ('ab%cde', {'cde'}),
+        ('ab\\cde', {'cde'}),
+        ('ab cde', {'cde'}),
+        # Non-ASCII characters are not indexed
+        ('abécde', {'cde'}),
+    ])
+    def test_get_trigrams(self, value, expected_trigrams):
+        """Test obtaining trigrams for values."""
+        assert ModuleSearchIndex.get_trigrams(value) == expected_trigrams
+
+    def test_get_candidate_select_without_trigrams(self):
+        """Test candidate select is not used for search terms without trigrams."""
+        assert ModuleSearchIndex.get_candidate_select('ab') is None
+        assert ModuleSearchIndex.get_candidate_select('a_b') is None
+
+    def test_index_maintained(self, mock_create_audit_event):
+        """Test search index is maintained on publish, rename and delete of module provider."""
+        with mock_create_audit_event:
+            namespace = Namespace.get(name='testnamespace')
+            module = Module(namespace=namespace, name='searchindextest')
+            module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+            module_provider_pk = module_provider.pk
+
+            try:
+                # Module provider without latest version should not be indexed
+                assert self._get_indexed_trigrams(module_provider_pk) == set()
+
+                module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+                module_version.prepare_module()
+                module_version.update_attributes(description='Unique indexed description', owner='indexowner')
+                module_version.publish()
+
+                trigrams = self._get_indexed_trigrams(module_provider_pk)
+                assert {'sea', 'tes', 'nam', 'tpr', 'uni', 'own'}.issubset(trigrams)
+                result = ModuleSearch.search_module_providers(offset=0, limit=10, query='uniquE-not-indexed')
+                assert result.count == 0
+                result = ModuleSearch.search_module_providers(offset=0, limit=10, query='unique indexed')
+                assert [mp.pk for mp in result.rows] == [module_provider_pk]
+
+                # Update description and ensure index is updated
+                module_version.update_attributes(description='Changed')
+                trigrams = self._get_indexed_trigrams(module_provider_pk)
+                assert 'uni' not in trigrams
+                assert 'cha' in trigrams
+                result = ModuleSearch.search_module_providers(offset=0, limit=10, query='unique indexed')
+                assert result.count == 0
+
+                # Rename module and ensure index is updated
+                module_provider = module_provider.update_name(
+                    namespace=namespace, module_name='renamedindextest', provider_name='testprovider')
+                trigrams = self._get_indexed_trigrams(module_provider_pk)
+                assert 'ren' in trigrams
+                assert 'sea' not in trigrams
+                result = ModuleSearch.search_module_providers(offset=0, limit=10, query='renamedindextest')
+                assert [mp.pk for mp in result.rows] == [module_provider_pk]
+
+            finally:
+                module_provider.delete()
+
+            assert self._get_indexed_trigrams(module_provider_pk) == set()
@@ -3,9 +3,12 @@ from unittest import mock
 import pytest
 from terrareg.filters import NamespaceTrustFilter
 
-from terrareg.models import Module, ModuleProvider, Namespace
-from terrareg.module_search import ModuleSearch
+from terrareg.config import ModuleSearchBackend
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_search import InMemoryModuleSearchIndex, ModuleSearch
 from test.integration.terrareg import TerraregIntegrationTest
+from test import mock_create_audit_event
 
 class TestSearchModuleProviders(TerraregIntegrationTest):
 
@@ -407,3 +410,99 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
 
         # Ensure that no results are returned
         assert result.count == 0
+
+    def test_search_results_prepopulated(self):
+        """Ensure search results are populated with namespace, module provider and latest version rows."""
+        result = ModuleSearch.search_module_providers(
+            offset=0, limit=10,
+            query='DESCRIPTION-Search',
+            namespaces=['modulesearch']
+        )
+
+        assert result.count == 1
+        module_provider = result.rows[0]
+        expected_namespace_pk = Namespace(name='modulesearch').pk
+
+        # Ensure no further database queries are performed to obtain
+        # details of the namespace, module provider and latest version
+        with mock.patch('terrareg.database.Database.get_connection') as mock_get_connection:
+            assert module_provider._module._namespace.pk == expected_namespace_pk
+            assert not module_provider.verified
+            latest_version = module_provider.get_latest_version()
+            assert latest_version.version == '1.0.0'
+            assert latest_version.published == True
+            assert latest_version.description == 'DESCRIPTION-Search-PUBLISHED'
+            mock_get_connection.assert_not_called()
+
+        # Ensure objects match those obtained from the database
+        expected_module_provider = ModuleProvider.get(Module(Namespace('modulesearch'), 'contributedmodule-oneversion'), 'aws')
+        assert module_provider._get_db_row() == dict(expected_module_provider._get_db_row())
+        assert latest_version._get_db_row() == dict(expected_module_provider.get_latest_version()._get_db_row())
+
+
+class TestSearchModuleProvidersInMemory(TestSearchModuleProviders):
+    """Run search tests against in-memory search backend."""
+
+    def setup_method(self, method):
+        """Enable in-memory search backend and rebuild index."""
+        super(TestSearchModuleProvidersInMemory, self).setup_method(method)
+        self._search_backend_mock = mock.patch('terrareg.config.Config.MODULE_SEARCH_BACKEND', ModuleSearchBackend.MEMORY)
+        self._search_backend_mock.start()
+        InMemoryModuleSearchIndex.reset()
+
+    def teardown_method(self, method):
+        """Disable in-memory search backend."""
+        self._search_backend_mock.stop()
+        InMemoryModuleSearchIndex.reset()
+        super(TestSearchModuleProvidersInMemory, self).teardown_method(method)
+
+    def test_index_updated_on_publish(self, mock_create_audit_event):
+        """Test in-memory index is updated when module version is published and module provider deleted."""
+        # Build index
+        assert ModuleSearch.search_module_providers(offset=0, limit=10, query='inmemoryindextest').count == 0
+
+        with mock_create_audit_event:
+            namespace = Namespace.get(name='modulesearch')
+            module_provider = ModuleProvider.get(module=Module(namespace=namespace, name='inmemoryindextest'), name='aws', create=True)
+            try:
+                module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+                module_version.prepare_module()
+                module_version.publish()
+
+                result = ModuleSearch.search_module_providers(offset=0, limit=10, query='inmemoryindextest')
+                assert result.count == 1
+                assert result.rows[0].id == 'modulesearch/inmemoryindextest/aws'
+            finally:
+                module_provider.delete()
+
+        assert ModuleSearch.search_module_providers(offset=0, limit=10, query='inmemoryindextest').count == 0
+
+    def test_index_not_updated_on_rollback(self, mock_create_audit_event):
+        """Test in-memory index is only updated once the transaction has been committed."""
+        # Build index
+        assert ModuleSearch.search_module_providers(offset=0, limit=10, query='inmemoryrollbacktest').count == 0
+
+        with mock_create_audit_event:
+            namespace = Namespace.get(name='modulesearch')
+            module_provider = ModuleProvider.get(module=Module(namespace=namespace, name='inmemoryrollbacktest'), name='aws', create=True)
+            try:
+                with pytest.raises(Exception, match='Rollback'):
+                    with Database.start_transaction():
+                        module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+                        module_version.prepare_module()
+                        module_version.publish()
+                        raise Exception('Rollback')
+
+                assert ModuleSearch.search_module_providers(offset=0, limit=10, query='inmemoryrollbacktest').count == 0
+
+                with Database.start_transaction():
+                    module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+                    module_version.prepare_module()
+                    module_version.publish()
+
+                    # Ensure index is not updated before commit
+                    assert ModuleSearch.search_module_providers(offset=0, limit=10, query='inmemoryrollbacktest').count == 0
+
+                assert ModuleSearch.search_module_providers(offset=0, limit=10, query='inmemoryrollbacktest').count == 1
+            finally:
+                module_provider.delete()
@@ -0,0 +1,50 @@
+from unittest import mock
+
+import pytest
+
+from terrareg.database import Database
+from test.integration.terrareg import TerraregIntegrationTest
+from test import test_request_context
+
+
+class TestDatabaseTransaction(TerraregIntegrationTest):
+
+    def test_call_after_commit_outside_transaction(self):
+        """Test callback is called immediately when not within a transaction."""
+        callback = mock.MagicMock()
+        Database.call_after_commit(callback)
+        callback.assert_called_once_with()
+
+    def test_call_after_commit(self):
+        """Test callback is called once transaction has been committed."""
+        callback = mock.MagicMock()
+        with Database.start_transaction():
+            Database.call_after_commit(callback)
+            callback.assert_not_called()
+        callback.assert_called_once_with()
+
+    def test_call_after_commit_in_request_context(self, test_request_context):
+        """Test callback is called once transaction started in request context has been committed."""
+        callback = mock.MagicMock()
+        with test_request_context:
+            with Database.start_transaction():
+                Database.call_after_commit(callback)
+                callback.assert_not_called()
+        callback.assert_called_once_with()
+
+    def test_call_after_commit_exception(self):
+        """Test callback is not called when transaction is rolled back due to an exception."""
+        callback = mock.MagicMock()
+        with pytest.raises(Exception, match='Rollback'):
+            with Database.start_transaction():
+                Database.call_after_commit(callback)
+                raise Exception('Rollback')
+        callback.assert_not_called()
+
+    def test_call_after_commit_explicit_rollback(self):
+        """Test callback is not called when transaction is explicitly rolled back."""
+        callback = mock.MagicMock()
+        with Database.start_transaction() as transaction_context:
+            Database.call_after_commit(callback)
+            transaction_context.transaction.rollback()
+        callback.assert_not_called()
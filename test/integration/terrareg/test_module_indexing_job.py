@@ -0,0 +1,253 @@
+
+import datetime
+from unittest import mock
+
+import pytest
+
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_indexing_job import ModuleIndexingJob, ModuleIndexingJobStatus, ModuleIndexingJobWorker
+from terrareg.errors import GitCloneError, InvalidTerraregMetadataFileError
+from test.integration.terrareg import TerraregIntegrationTest
+from test import BaseTest
+
+
+class TestModuleIndexingJob(TerraregIntegrationTest):
+    """Test queued module indexing jobs."""
+
+    def setup_method(self, method):
+        """Delete any indexing jobs and indexed module version"""
+        self._cleanup()
+        return super().setup_method(method)
+
+    def teardown_method(self, method):
+        """Delete any indexing jobs and indexed module version"""
+        self._cleanup()
+        return super().teardown_method(method)
+
+    def _cleanup(self):
+        """Delete indexing jobs and module version created by tests."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_indexing_job.delete())
+        if module_version := ModuleVersion.get(self._get_module_provider(), '1.2.3'):
+            module_version.delete()
+
+    @staticmethod
+    def _get_module_provider():
+        """Return test module provider"""
+        return ModuleProvider.get(Module(Namespace('moduleextraction'), 'bitbucketexample'), 'testprovider')
+
+    @staticmethod
+    def _process_job(job):
+        """Process job using worker"""
+        ModuleIndexingJobWorker(app=BaseTest.get().SERVER._app).process_job(job)
+
+    def test_create(self):
+        """Test creating job, re-using existing queued job for the same version."""
+        module_provider = self._get_module_provider()
+        job = ModuleIndexingJob.create(module_provider=module_provider, version='1.2.3')
+
+        assert job.status is ModuleIndexingJobStatus.QUEUED
+        assert job.attempts == 0
+        assert job.module_provider.pk == module_provider.pk
+
+        # Ensure queued job is re-used
+        assert ModuleIndexingJob.create(module_provider=module_provider, version='1.2.3').pk == job.pk
+        assert ModuleIndexingJob.create(module_provider=module_provider, version='1.2.4').pk != job.pk
+
+        outline = job.get_api_outline()
+        assert outline['id'] == job.pk
+        assert outline['module_provider_id'] == 'moduleextraction/bitbucketexample/testprovider'
+        assert outline['version'] == '1.2.3'
+        assert outline['status'] == 'queued'
+        assert outline['attempts'] == 0
+        assert outline['error'] is None
+
+        assert ModuleIndexingJob.get(job.pk + 100) is None
+
+    def test_claim_next(self):
+        """Test claiming jobs, ensuring each job is only claimed once."""
+        first_job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+        second_job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.4')
+
+        claimed_job = ModuleIndexingJob.claim_next()
+        assert claimed_job.pk == first_job.pk
+        assert claimed_job.status is ModuleIndexingJobStatus.RUNNING
+        assert claimed_job.attempts == 1
+
+        assert ModuleIndexingJob.claim_next().pk == second_job.pk
+        assert ModuleIndexingJob.claim_next() is None
+
+    def test_run(self):
+        """Test running job indexes module version."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+        job = ModuleIndexingJob.claim_next()
+
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload') as mock_process_upload:
+            self._process_job(job)
+
+        mock_process_upload.assert_called_once_with()
+        job = ModuleIndexingJob.get(job.pk)
+        assert job.status is ModuleIndexingJobStatus.SUCCEEDED
+        assert job.error is None
+        assert ModuleVersion.get(self._get_module_provider(), '1.2.3') is not None
+
+    def test_run_retry(self):
+        """Test failed jobs are retried with backoff, until the maximum number of attempts."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload',
+                        side_effect=GitCloneError('Unable to clone repository')) as mock_process_upload, \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_MAX_ATTEMPTS', 2), \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_RETRY_DELAY', 60):
+
+            self._process_job(ModuleIndexingJob.claim_next())
+
+            job = ModuleIndexingJob.get(job.pk)
+            assert job.status is ModuleIndexingJobStatus.QUEUED
+            assert job.error == 'Unable to clone repository'
+            # Ensure module version creation was rolled back
+            assert ModuleVersion.get(self._get_module_provider(), '1.2.3') is None
+
+            # Ensure job is not retried until retry delay has passed
+            assert ModuleIndexingJob.claim_next() is None
+            with mock.patch('terrareg.module_indexing_job.datetime') as mock_datetime:
+                mock_datetime.datetime.now.return_value = datetime.datetime.now() + datetime.timedelta(seconds=61)
+                mock_datetime.timedelta = datetime.timedelta
+                job = ModuleIndexingJob.claim_next()
+            assert job.attempts == 2
+
+            self._process_job(job)
+
+        assert mock_process_upload.call_count == 2
+        job = ModuleIndexingJob.get(job.pk)
+        assert job.status is ModuleIndexingJobStatus.FAILED
+        assert job.error == 'Unable to clone repository'
+        assert ModuleIndexingJob.claim_next() is None
+
+    @pytest.mark.parametrize('exception', [
+        GitCloneError('Unable to clone repository'),
+        OSError('Unable to write file'),
+    ])
+    def test_run_retryable_error(self, exception):
+        """Test jobs are re-queued after transient errors."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload', side_effect=exception), \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_MAX_ATTEMPTS', 3):
+            self._process_job(ModuleIndexingJob.claim_next())
+
+        job = ModuleIndexingJob.get(job.pk)
+        assert job.status is ModuleIndexingJobStatus.QUEUED
+        assert job.attempts == 1
+
+    def test_run_non_retryable_error(self):
+        """Test jobs are marked as failed on the first attempt for errors that will not succeed when retried."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload',
+                        side_effect=InvalidTerraregMetadataFileError('Invalid metadata file')) as mock_process_upload, \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_MAX_ATTEMPTS', 3):
+            self._process_job(ModuleIndexingJob.claim_next())
+
+        mock_process_upload.assert_called_once_with()
+        job = ModuleIndexingJob.get(job.pk)
+        assert job.status is ModuleIndexingJobStatus.FAILED
+        assert job.attempts == 1
+        assert job.error == 'Invalid metadata file'
+        assert job.lease_expires_at is None
+        assert ModuleIndexingJob.claim_next() is None
+
+    @staticmethod
+    def _mock_now(seconds):
+        """Mock current time in module indexing job module, offset by number of seconds"""
+        now = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
+        mock_datetime = mock.patch('terrareg.module_indexing_job.datetime')
+        mock_datetime_module = mock_datetime.start()
+        mock_datetime_module.datetime.now.return_value = now
+        mock_datetime_module.timedelta = datetime.timedelta
+        return mock_datetime
+
+    def test_reclaim_expired_lease(self):
+        """Test running jobs are re-claimed once their lease has expired."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+
+        with mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_LEASE_DURATION', 60):
+            job = ModuleIndexingJob.claim_next()
+            assert job.lease_expires_at is not None
+
+            # Ensure job is not claimed whilst lease is held
+            assert ModuleIndexingJob.claim_next() is None
+            assert job.claim() is False
+
+            # Ensure lease can be renewed
+            mock_datetime = self._mock_now(50)
+            try:
+                job.renew_lease()
+                assert ModuleIndexingJob.claim_next() is None
+            finally:
+                mock_datetime.stop()
+
+            # Ensure job is re-claimed once lease has expired
+            mock_datetime = self._mock_now(120)
+            try:
+                reclaimed_job = ModuleIndexingJob.claim_next()
+            finally:
+                mock_datetime.stop()
+
+        assert reclaimed_job.pk == job.pk
+        assert reclaimed_job.status is ModuleIndexingJobStatus.RUNNING
+        assert reclaimed_job.attempts == 2
+
+    def test_fail_abandoned_job(self):
+        """Test running jobs with an expired lease and no remaining attempts are marked as failed."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+
+        with mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_LEASE_DURATION', 60), \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_MAX_ATTEMPTS', 1):
+            ModuleIndexingJob.claim_next()
+
+            mock_datetime = self._mock_now(120)
+            try:
+                assert ModuleIndexingJob.claim_next() is None
+            finally:
+                mock_datetime.stop()
+
+        job = ModuleIndexingJob.get(job.pk)
+        assert job.status is ModuleIndexingJobStatus.FAILED
+        assert job.error == 'Worker processing the job stopped before the job completed'
+        assert job.lease_expires_at is None
+
+    @pytest.mark.parametrize('debug, expected_error', [
+        (False, 'An unexpected error occurred whilst indexing the module version'),
+        (True, 'An unexpected error occurred whilst indexing the module version: /internal/path/to/file'),
+    ])
+    def test_run_unexpected_error(self, debug, expected_error):
+        """Test details of errors other than Terrareg errors are only stored when debug is enabled."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload',
+                        side_effect=OSError('/internal/path/to/file')), \
+                mock.patch('terrareg.config.Config.DEBUG', debug), \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_MAX_ATTEMPTS', 1):
+            self._process_job(ModuleIndexingJob.claim_next())
+
+        job = ModuleIndexingJob.get(job.pk)
+        assert job.status is ModuleIndexingJobStatus.FAILED
+        assert job.error == expected_error
+        assert job.get_api_outline()['error'] == expected_error
+
+    def test_run_long_error(self):
+        """Test errors longer than the error column are truncated."""
+        job = ModuleIndexingJob.create(module_provider=self._get_module_provider(), version='1.2.3')
+
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload',
+                        side_effect=GitCloneError('a' * 5000)), \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_MAX_ATTEMPTS', 1):
+            self._process_job(ModuleIndexingJob.claim_next())
+
+        job = ModuleIndexingJob.get(job.pk)
+        assert job.status is ModuleIndexingJobStatus.FAILED
+        assert job.error == ('a' * 1021) + '...'
+        assert job.lease_expires_at is None
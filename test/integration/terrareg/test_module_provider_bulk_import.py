@@ -0,0 +1,165 @@
+
+from unittest import mock
+
+from terrareg.database import Database
+from terrareg.git_mirror import GitMirrorCache
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_indexing_job import ModuleIndexingJobStatus
+from terrareg.module_provider_bulk_import import ModuleProviderBulkImport
+from terrareg.errors import GitCloneError
+import terrareg.bulk_import
+from test.integration.terrareg import TerraregIntegrationTest
+from test import BaseTest
+
+
+class TestModuleProviderBulkImport(TerraregIntegrationTest):
+    """Test bulk import of module versions from git tags."""
+
+    TAG_REFS = [
+        'refs/tags/v1.0.0',
+        'refs/tags/v1.10.0',
+        'refs/tags/v1.2.0',
+        'refs/tags/not-a-version',
+        'refs/tags/1.3.0',
+    ]
+
+    def setup_method(self, method):
+        """Delete any indexing jobs and indexed module versions"""
+        self._cleanup()
+        return super().setup_method(method)
+
+    def teardown_method(self, method):
+        """Delete any indexing jobs and indexed module versions"""
+        self._cleanup()
+        return super().teardown_method(method)
+
+    def _cleanup(self):
+        """Delete indexing jobs and module versions created by tests."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_indexing_job.delete())
+        for module_version in self._get_module_provider().get_versions(include_beta=True, include_unpublished=True):
+            module_version.delete()
+
+    @staticmethod
+    def _get_module_provider():
+        """Return test module provider"""
+        return ModuleProvider.get(Module(Namespace('moduleextraction'), 'bitbucketexample'), 'testprovider')
+
+    def test_get_unindexed_git_tag_versions(self):
+        """Test obtaining versions from tags that match tag format, in version order."""
+        with mock.patch('terrareg.models.ModuleProvider.get_git_tag_refs', return_value=self.TAG_REFS):
+            assert self._get_module_provider().get_unindexed_git_tag_versions() == [
+                ('1.0.0', 'v1.0.0'),
+                ('1.2.0', 'v1.2.0'),
+                ('1.10.0', 'v1.10.0'),
+            ]
+
+    def test_import(self):
+        """Test importing versions, skipping versions that have already been indexed."""
+        progress_callback = mock.MagicMock()
+        bulk_import = ModuleProviderBulkImport(
+            module_provider=self._get_module_provider(),
+            app=BaseTest.get().SERVER._app,
+            concurrency=2,
+            progress_callback=progress_callback
+        )
+
+        with mock.patch('terrareg.models.ModuleProvider.get_git_tag_refs', return_value=self.TAG_REFS[:1]), \
+                mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload') as mock_process_upload:
+            jobs = bulk_import.run(bulk_import.queue())
+
+        assert [(job.version, job.status) for job in jobs] == [('1.0.0', ModuleIndexingJobStatus.SUCCEEDED)]
+        assert mock_process_upload.call_count == 1
+        progress_callback.assert_called_once_with(job=mock.ANY, completed=1, total=1)
+        assert ModuleVersion.get(self._get_module_provider(), '1.0.0') is not None
+
+        # Import all tags, ensuring that already indexed version is not re-imported
+        progress_callback.reset_mock()
+        with mock.patch('terrareg.models.ModuleProvider.get_git_tag_refs', return_value=self.TAG_REFS), \
+                mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload') as mock_process_upload:
+            jobs = bulk_import.run(bulk_import.queue())
+
+        assert sorted([job.version for job in jobs]) == ['1.10.0', '1.2.0']
+        assert all(job.status is ModuleIndexingJobStatus.SUCCEEDED for job in jobs)
+        assert mock_process_upload.call_count == 2
+        assert [call.kwargs['completed'] for call in progress_callback.call_args_list] == [1, 2]
+        for version in ['1.0.0', '1.2.0', '1.10.0']:
+            assert ModuleVersion.get(self._get_module_provider(), version) is not None
+
+    def test_import_failure(self):
+        """Test failed versions are retried and reported as failed."""
+        bulk_import = ModuleProviderBulkImport(
+            module_provider=self._get_module_provider(),
+            app=BaseTest.get().SERVER._app,
+            concurrency=1
+        )
+
+        with mock.patch('terrareg.models.ModuleProvider.get_git_tag_refs', return_value=self.TAG_REFS[:1]), \
+                mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload',
+                           side_effect=GitCloneError('Unable to clone repository')) as mock_process_upload, \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_MAX_ATTEMPTS', 2), \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_RETRY_DELAY', 0):
+            jobs = bulk_import.run(bulk_import.queue())
+
+        assert mock_process_upload.call_count == 2
+        assert len(jobs) == 1
+        assert jobs[0].status is ModuleIndexingJobStatus.FAILED
+        assert jobs[0].attempts == 2
+        assert jobs[0].error == 'Unable to clone repository'
+        assert ModuleVersion.get(self._get_module_provider(), '1.0.0') is None
+
+    def test_start(self):
+        """Test processing jobs in a background thread."""
+        bulk_import = ModuleProviderBulkImport(
+            module_provider=self._get_module_provider(),
+            app=BaseTest.get().SERVER._app
+        )
+
+        with mock.patch('terrareg.models.ModuleProvider.get_git_tag_refs', return_value=self.TAG_REFS[:1]), \
+                mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload') as mock_process_upload:
+            jobs = bulk_import.queue()
+            bulk_import.start(jobs).join()
+
+        assert mock_process_upload.call_count == 1
+        assert ModuleVersion.get(self._get_module_provider(), '1.0.0') is not None
+
+    def test_clone_via_temporary_mirror(self):
+        """Test versions are cloned via a temporary mirror, when the git mirror cache is disabled."""
+        bulk_import = ModuleProviderBulkImport(
+            module_provider=self._get_module_provider(),
+            app=BaseTest.get().SERVER._app
+        )
+
+        def process_upload():
+            assert GitMirrorCache.is_enabled(git_url=self._get_module_provider().get_git_clone_url())
+
+        with mock.patch('terrareg.models.ModuleProvider.get_git_tag_refs', return_value=self.TAG_REFS[:2]), \
+                mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', None), \
+                mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload', side_effect=process_upload) as mock_process_upload:
+            jobs = bulk_import.run(bulk_import.queue())
+
+        assert mock_process_upload.call_count == 2
+        assert all(job.status is ModuleIndexingJobStatus.SUCCEEDED for job in jobs)
+        assert not GitMirrorCache.is_enabled(git_url=self._get_module_provider().get_git_clone_url())
+
+    def test_cli(self):
+        """Test bulk import CLI imports versions without starting background workers."""
+        # Database has already been initialised by test server
+        with mock.patch('terrareg.database.Database.initialise'), \
+                mock.patch('terrareg.models.ModuleProvider.get_git_tag_refs', return_value=self.TAG_REFS[:1]), \
+                mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload') as mock_process_upload, \
+                mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_QUEUE', True), \
+                mock.patch('terrareg.module_indexing_job.ModuleIndexingJobWorker.start_instance') as mock_start_instance, \
+                mock.patch('terrareg.analytics.AnalyticsCompactionWorker.start_instance') as mock_start_compaction:
+            assert terrareg.bulk_import.main(['moduleextraction/bitbucketexample/testprovider']) == 0
+
+        assert mock_process_upload.call_count == 1
+        mock_start_instance.assert_not_called()
+        mock_start_compaction.assert_not_called()
+        assert ModuleVersion.get(self._get_module_provider(), '1.0.0') is not None
+
+    def test_cli_non_existent_module_provider(self):
+        """Test bulk import CLI with non-existent module provider."""
+        with mock.patch('terrareg.database.Database.initialise'):
+            assert terrareg.bulk_import.main(['moduleextraction/doesnotexist/testprovider']) == 1
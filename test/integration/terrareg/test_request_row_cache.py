@@ -0,0 +1,75 @@
+
+from unittest import mock
+
+import pytest
+
+from terrareg.database import Database, RequestRowCache
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from test.integration.terrareg import TerraregIntegrationTest
+from test import test_request_context
+
+
+class TestRequestRowCache(TerraregIntegrationTest):
+
+    def test_rows_shared_within_request(self, test_request_context):
+        """Test that rows are shared between model instances within a request."""
+        with test_request_context:
+            namespace = Namespace(name='testnamespace')
+            module_provider = ModuleProvider(module=Module(namespace=namespace, name='wrongversionorder'), name='testprovider')
+            module_version = ModuleVersion(module_provider=module_provider, version='1.5.4')
+            assert module_version._get_db_row() is not None
+
+            with mock.patch('terrareg.database.Database.get_connection') as mock_get_connection:
+                new_namespace = Namespace(name='testnamespace')
+                new_module_provider = ModuleProvider(module=Module(namespace=new_namespace, name='wrongversionorder'), name='testprovider')
+                new_module_version = ModuleVersion(module_provider=new_module_provider, version='1.5.4')
+
+                assert new_namespace.pk == namespace.pk
+                assert new_module_provider.pk == module_provider.pk
+                assert new_module_version.pk == module_version.pk
+                mock_get_connection.assert_not_called()
+
+    def test_rows_not_shared_between_requests(self, test_request_context):
+        """Test that rows are not cached outside of a request context."""
+        with test_request_context:
+            Namespace(name='testnamespace').pk
+            assert RequestRowCache.get(('namespace', 'testnamespace')) is not None
+
+        assert RequestRowCache.get(('namespace', 'testnamespace')) is None
+
+        Namespace(name='testnamespace').pk
+        assert RequestRowCache.get(('namespace', 'testnamespace')) is None
+
+    def test_non_existent_rows_not_cached(self, test_request_context):
+        """Test that lookups for non-existent objects are not cached."""
+        with test_request_context:
+            assert Namespace(name='doesnotexist').pk is None
+            assert RequestRowCache.get(('namespace', 'doesnotexist')) is None
+
+    def test_invalidate_on_update_attributes(self, test_request_context):
+        """Test that cached rows are invalidated when an instance is updated."""
+        with test_request_context:
+            namespace = Namespace(name='testnamespace')
+            module_provider = ModuleProvider(module=Module(namespace=namespace, name='wrongversionorder'), name='testprovider')
+            module_version = ModuleVersion(module_provider=module_provider, version='1.5.4')
+            original_owner = module_version._get_db_row()['owner']
+
+            try:
+                module_version.update_attributes(owner='Updated owner')
+
+                new_module_version = ModuleVersion(module_provider=module_provider, version='1.5.4')
+                assert new_module_version._get_db_row()['owner'] == 'Updated owner'
+            finally:
+                module_version.update_attributes(owner=original_owner)
+
+    def test_clear_on_transaction_rollback(self, test_request_context):
+        """Test that cached rows are removed when a transaction is rolled back."""
+        with test_request_context:
+            Namespace(name='testnamespace').pk
+            assert RequestRowCache.get(('namespace', 'testnamespace')) is not None
+
+            with pytest.raises(Exception):
+                with Database.start_transaction():
+                    raise Exception('Rollback transaction')
+
+            assert RequestRowCache.get(('namespace', 'testnamespace')) is None
@@ -16,6 +16,7 @@ import terrareg.result_data
 from test import BaseTest
 from .test_data import test_data_full, test_git_providers, test_user_group_data_full
 from terrareg.constants import EXTRACTION_VERSION
+from terrareg.module_specs_cache import ModuleSpecsCache
 
 
 class TerraregUnitTest(BaseTest):
@@ -98,6 +99,9 @@ def setup_test_data(test_data=None, user_group_data=None, namespace_redirects=No
             TEST_NAMESPACE_REDIRECTS = deepcopy(namespace_redirects if namespace_redirects else {})
             TEST_MODULE_PROVIDER_REDIRECTS = deepcopy(module_provider_redirects if module_provider_redirects else {})
 
+            # Remove parsed module specs, as module details IDs are re-used between tests
+            ModuleSpecsCache.clear()
+
             # Replace all ModuleDetails in test data with IDs and move contents to
             # TEST_MODULE_DETAILS
             default_readme = 'Mock module README file'
@@ -234,9 +238,9 @@ def mock_module_details(request):
         TEST_MODULE_DETAILS[str(self._id)].update(**kwargs)
     mock_method(request, 'terrareg.models.ModuleDetails.update_attributes', update_attributes)
 
-    def _get_db_row(self):
-        return dict(TEST_MODULE_DETAILS[str(self._id)])
-    mock_method(request, 'terrareg.models.ModuleDetails._get_db_row', _get_db_row)
+    def _get_column(self, column):
+        return TEST_MODULE_DETAILS[str(self._id)].get(column)
+    mock_method(request, 'terrareg.models.ModuleDetails._get_column', _get_column)
 
 
 def mock_module_version(request):
@@ -302,7 +306,9 @@ def mock_module_version(request):
             'published': unittest_data.get('published', False),
             'beta': unittest_data.get('beta', False),
             'module_details_id': unittest_data.get('module_details_id', None),
-            'extraction_version': unittest_data.get('extraction_version', EXTRACTION_VERSION)
+            'extraction_version': unittest_data.get('extraction_version', EXTRACTION_VERSION),
+            'archive_sha256': unittest_data.get('archive_sha256', None),
+            'archive_size': unittest_data.get('archive_size', None),
         }
     mock_method(request, 'terrareg.models.ModuleVersion._get_db_row', _get_db_row)
 
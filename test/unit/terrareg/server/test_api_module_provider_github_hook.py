@@ -605,3 +605,33 @@ class TestApiModuleVersionGithubHook(TerraregUnitTest):
             mocked_prepare_module.assert_called_once()
             mocked_process_upload.assert_called_once()
 
+
+    @setup_test_data()
+    def test_hook_with_indexing_job_queue(self, client, mock_models):
+        """Test hook call queues indexing job when job queue is enabled."""
+        mock_job = unittest.mock.MagicMock(pk=12)
+        with unittest.mock.patch(
+                    'terrareg.models.ModuleVersion.prepare_module') as mocked_prepare_module, \
+                unittest.mock.patch(
+                    'terrareg.module_extractor.GitModuleExtractor.process_upload') as mocked_process_upload, \
+                unittest.mock.patch(
+                    'terrareg.module_indexing_job.ModuleIndexingJob.create', return_value=mock_job) as mocked_create_job, \
+                unittest.mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_QUEUE', True):
+
+            res = client.post(
+                '/v1/terrareg/modules/moduleextraction/bitbucketexample/testprovider/hooks/github',
+                json={
+                    "action": "published",
+                    "release": {
+                        "tag_name": "v4.0.6"
+                    }
+                }
+            )
+
+            assert res.status_code == 202
+            assert res.json == {'status': 'Queued', 'message': 'Queued import of provided tag', 'tag': 'v4.0.6', 'job_id': 12}
+
+            mocked_create_job.assert_called_once()
+            assert mocked_create_job.call_args.kwargs['version'] == '4.0.6'
+            mocked_prepare_module.assert_not_called()
+            mocked_process_upload.assert_not_called()
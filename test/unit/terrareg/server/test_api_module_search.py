@@ -280,6 +280,26 @@ class TestApiModuleSearch(TerraregUnitTest):
             "implicit_compatible"
         ]
 
+    def test_with_include_search_filters(self, client, mocked_search_module_providers, mock_models):
+        """Call with include_search_filters, ensuring search filters are returned with results"""
+        search_filters = {
+            'verified': 1,
+            'trusted_namespaces': 2,
+            'contributed': 3,
+            'providers': {'testprovider': 5},
+            'namespaces': {'testnamespace': 5}
+        }
+        with mock.patch('terrareg.module_search.ModuleSearch.get_search_filters',
+                        mock.MagicMock(return_value=search_filters)) as mock_get_search_filters:
+            res = client.get('/v1/modules/search?q=unittestteststring&include_search_filters=true')
+
+        assert res.status_code == 200
+        assert res.json == {
+            'meta': {'current_offset': 0, 'limit': 10}, 'modules': [],
+            'search_filters': search_filters
+        }
+        mock_get_search_filters.assert_called_once_with(query='unittestteststring')
+
     def test_unauthenticated(self, client, mock_models):
         """Test unauthenticated call to API"""
         def call_endpoint():
@@ -0,0 +1,108 @@
+import unittest.mock
+
+from test.unit.terrareg import (
+    mock_models,
+    setup_test_data, TerraregUnitTest
+)
+from terrareg.module_indexing_job import ModuleIndexingJobStatus
+import terrareg.errors
+from test import client
+
+
+class TestApiModuleVersionBulkImport(TerraregUnitTest):
+    """Test module version bulk import resource."""
+
+    def _get_mock_get_current_auth_method(self, allowed_to_create):
+        """Return mock auth method"""
+        mock_auth_method = unittest.mock.MagicMock()
+        mock_auth_method.can_upload_module_version = unittest.mock.MagicMock(return_value=allowed_to_create)
+        mock_get_current_auth_method = unittest.mock.MagicMock(return_value=mock_auth_method)
+        return mock_get_current_auth_method
+
+    @staticmethod
+    def _get_mock_job(pk, version, status, error=None):
+        """Return mock indexing job"""
+        return unittest.mock.MagicMock(pk=pk, version=version, status=status, error=error)
+
+    @setup_test_data()
+    def test_bulk_import(self, client, mock_models):
+        """Test bulk import, processing jobs in the background."""
+        queued_jobs = [
+            self._get_mock_job(1, '1.0.0', ModuleIndexingJobStatus.QUEUED),
+            self._get_mock_job(2, '1.1.0', ModuleIndexingJobStatus.QUEUED),
+        ]
+        with unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.queue',
+                                 return_value=queued_jobs) as mock_queue, \
+                unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.start') as mock_start, \
+                unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.run') as mock_run, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post('/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/bulk_import')
+
+            assert res.status_code == 202
+            assert res.json == {
+                'status': 'Queued',
+                'versions': {
+                    '1.0.0': {'status': 'queued', 'job_id': 1},
+                    '1.1.0': {'status': 'queued', 'job_id': 2},
+                }
+            }
+            mock_queue.assert_called_once_with()
+            mock_start.assert_called_once_with(queued_jobs)
+            mock_run.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_with_indexing_job_queue(self, client, mock_models):
+        """Test bulk import only queues jobs when the indexing job queue is enabled."""
+        queued_jobs = [self._get_mock_job(1, '1.0.0', ModuleIndexingJobStatus.QUEUED)]
+        with unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.queue',
+                                 return_value=queued_jobs), \
+                unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.start') as mock_start, \
+                unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.run') as mock_run, \
+                unittest.mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_QUEUE', True), \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post('/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/bulk_import')
+
+            assert res.status_code == 202
+            assert res.json == {
+                'status': 'Queued',
+                'versions': {'1.0.0': {'status': 'queued', 'job_id': 1}}
+            }
+            mock_start.assert_not_called()
+            mock_run.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_git_error(self, client, mock_models):
+        """Test bulk import with error obtaining git tags."""
+        with unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.queue',
+                                 side_effect=terrareg.errors.GitCloneError('Error occurred whilst obtaining git tags')), \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post('/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/bulk_import')
+
+            assert res.status_code == 500
+            assert res.json == {'status': 'Error', 'message': 'Error occurred whilst obtaining git tags'}
+
+    @setup_test_data()
+    def test_bulk_import_with_no_module_provider_repository_url(self, client, mock_models):
+        """Test bulk import of module provider without a repository URL."""
+        with unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.queue') as mock_queue, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post('/v1/terrareg/modules/testnamespace/modulenorepourl/testprovider/bulk_import')
+
+            assert res.status_code == 400
+            assert res.json == {'status': 'Error', 'message': 'Module provider is not configured with a repository'}
+            mock_queue.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_unauthenticated(self, client, mock_models):
+        """Test bulk import without permission."""
+        with unittest.mock.patch('terrareg.module_provider_bulk_import.ModuleProviderBulkImport.queue') as mock_queue, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(False)):
+
+            res = client.post('/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/bulk_import')
+
+            assert res.status_code == 403
+            mock_queue.assert_not_called()
@@ -279,3 +279,29 @@ class TestApiModuleVersionImport(TerraregUnitTest):
 
             mocked_prepare_module.assert_not_called()
             mocked_process_upload.assert_not_called()
+
+    @setup_test_data()
+    def test_import_with_indexing_job_queue(self, client, mock_models):
+        """Test import queues indexing job when job queue is enabled."""
+        mock_job = unittest.mock.MagicMock(pk=23)
+        with unittest.mock.patch(
+                    'terrareg.models.ModuleVersion.prepare_module', return_value=False) as mocked_prepare_module, \
+                unittest.mock.patch(
+                    'terrareg.module_extractor.GitModuleExtractor.process_upload') as mocked_process_upload, \
+                unittest.mock.patch(
+                    'terrareg.module_indexing_job.ModuleIndexingJob.create', return_value=mock_job) as mocked_create_job, \
+                unittest.mock.patch('terrareg.config.Config.MODULE_INDEXING_JOB_QUEUE', True), \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/import',
+                json={'version': '5.5.4'}
+            )
+            assert res.json == {'status': 'Queued', 'job_id': 23}
+            assert res.status_code == 202
+
+            mocked_create_job.assert_called_once()
+            assert mocked_create_job.call_args.kwargs['module_provider'].id == 'testnamespace/modulewithrepourl/testprovider'
+            assert mocked_create_job.call_args.kwargs['version'] == '5.5.4'
+            mocked_prepare_module.assert_not_called()
+            mocked_process_upload.assert_not_called()
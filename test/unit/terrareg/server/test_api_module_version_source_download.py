@@ -0,0 +1,222 @@
+
+import hashlib
+import os
+import tempfile
+import unittest.mock
+
+import pytest
+
+from test.unit.terrareg import (
+    mock_models,
+    setup_test_data, TerraregUnitTest
+)
+import terrareg.config
+import terrareg.models
+from test import client
+from test.unit.terrareg.test_artifact_storage import fake_s3_client
+
+
+ARCHIVE_CONTENT = b'unittest archive content'
+ARCHIVE_SHA256 = hashlib.sha256(ARCHIVE_CONTENT).hexdigest()
+
+test_data = {
+    'testnamespace': {
+        'id': 1,
+        'modules': {
+            'testmodulename': {'testprovider': {
+                'id': 1,
+                'latest_version': '1.0.0',
+                'versions': {
+                    '1.0.0': {
+                        'published': True,
+                        'archive_sha256': ARCHIVE_SHA256,
+                        'archive_size': len(ARCHIVE_CONTENT)
+                    },
+                    '1.1.0': {
+                        'published': False,
+                        'archive_sha256': ARCHIVE_SHA256,
+                        'archive_size': len(ARCHIVE_CONTENT)
+                    },
+                    # Archive generated before digests were recorded
+                    '1.2.0': {'published': True},
+                    # Archive that does not match the recorded size
+                    '1.3.0': {
+                        'published': True,
+                        'archive_sha256': ARCHIVE_SHA256,
+                        'archive_size': 1
+                    },
+                }
+            }}
+        }
+    }
+}
+
+
+class TestApiModuleVersionSourceDownload(TerraregUnitTest):
+    """Test ApiModuleVersionSourceDownload resource."""
+
+    @pytest.fixture
+    def data_directory(self):
+        """Create archives for module versions in temporary data directory"""
+        with tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory):
+            for version in ['1.0.0', '1.1.0', '1.2.0', '1.3.0']:
+                version_directory = os.path.join(data_directory, 'modules', 'testnamespace', 'testmodulename', 'testprovider', version)
+                os.makedirs(version_directory)
+                with open(os.path.join(version_directory, 'source.zip'), 'wb') as fh:
+                    fh.write(ARCHIVE_CONTENT)
+            yield data_directory
+
+    @staticmethod
+    def _get_url(version):
+        """Return URL of source download for version"""
+        return f'/v1/terrareg/modules/testnamespace/testmodulename/testprovider/{version}/source.zip'
+
+    @setup_test_data(test_data)
+    def test_published_version(self, client, mock_models, data_directory):
+        """Test download of published module version uses digest as ETag and is immutable."""
+        res = client.get(self._get_url('1.0.0'))
+
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+        assert res.headers['ETag'] == f'"{ARCHIVE_SHA256}"'
+        assert res.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    @setup_test_data(test_data)
+    def test_published_version_with_authentication(self, client, mock_models, data_directory):
+        """Test download of published module version is not publicly cacheable when authentication is required."""
+        with unittest.mock.patch('terrareg.config.Config.ALLOW_UNAUTHENTICATED_ACCESS', False), \
+                unittest.mock.patch('terrareg.presigned_url.TerraformSourcePresignedUrl.validate_presigned_key'):
+            res = client.get(self._get_url('1.0.0') + '?presign=unittest')
+
+        assert res.status_code == 200
+        assert res.headers['Cache-Control'] == 'private, max-age=31536000, immutable'
+
+    @setup_test_data(test_data)
+    def test_if_none_match(self, client, mock_models, data_directory):
+        """Test conditional request with matching ETag."""
+        res = client.get(self._get_url('1.0.0'), headers={'If-None-Match': f'"{ARCHIVE_SHA256}"'})
+
+        assert res.status_code == 304
+        assert res.data == b''
+        assert res.headers['ETag'] == f'"{ARCHIVE_SHA256}"'
+
+        res = client.get(self._get_url('1.0.0'), headers={'If-None-Match': '"differentdigest"'})
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+
+    @setup_test_data(test_data)
+    def test_range_request(self, client, mock_models, data_directory):
+        """Test range requests, including with If-Range."""
+        res = client.get(self._get_url('1.0.0'), headers={'Range': 'bytes=0-7'})
+        assert res.status_code == 206
+        assert res.data == ARCHIVE_CONTENT[0:8]
+        assert res.headers['Accept-Ranges'] == 'bytes'
+        assert res.headers['Content-Range'] == f'bytes 0-7/{len(ARCHIVE_CONTENT)}'
+
+        res = client.get(self._get_url('1.0.0'), headers={'Range': 'bytes=8-', 'If-Range': f'"{ARCHIVE_SHA256}"'})
+        assert res.status_code == 206
+        assert res.data == ARCHIVE_CONTENT[8:]
+
+        # Ensure full content is returned when If-Range does not match
+        res = client.get(self._get_url('1.0.0'), headers={'Range': 'bytes=8-', 'If-Range': '"differentdigest"'})
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+
+    @setup_test_data(test_data)
+    def test_unpublished_version(self, client, mock_models, data_directory):
+        """Test download of unpublished module version must be revalidated."""
+        res = client.get(self._get_url('1.1.0'))
+
+        assert res.status_code == 200
+        assert res.headers['ETag'] == f'"{ARCHIVE_SHA256}"'
+        assert res.headers['Cache-Control'] == 'no-cache'
+
+    @pytest.mark.parametrize('version', ['1.2.0', '1.3.0'])
+    @setup_test_data(test_data)
+    def test_version_without_valid_digest(self, version, client, mock_models, data_directory):
+        """Test download of archive without recorded digest, or with mismatched size, does not use digest."""
+        res = client.get(self._get_url(version))
+
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+        assert 'ETag' in res.headers
+        assert res.headers['ETag'] != f'"{ARCHIVE_SHA256}"'
+        assert res.headers['Cache-Control'] == 'no-cache'
+
+    @setup_test_data(test_data)
+    def test_s3_storage_presigned_redirect(self, client, mock_models, fake_s3_client):
+        """Test download of archive in S3 storage redirects to presigned URL."""
+        res = client.get(self._get_url('1.0.0'))
+
+        assert res.status_code == 302
+        assert res.headers['Location'] == (
+            'https://s3.example.com/unittest-bucket/prefix/modules/testnamespace/testmodulename/testprovider/1.0.0/source.zip'
+            '?method=get_object&expires=300'
+        )
+        assert res.headers['Cache-Control'] == 'no-store'
+
+    @setup_test_data(test_data)
+    def test_s3_storage_streamed(self, client, mock_models, fake_s3_client):
+        """Test download of archive in S3 storage is streamed when presigned redirects are disabled."""
+        fake_s3_client.objects[(
+            'unittest-bucket', 'prefix/modules/testnamespace/testmodulename/testprovider/1.0.0/source.zip'
+        )] = ARCHIVE_CONTENT
+
+        with unittest.mock.patch('terrareg.config.Config.S3_ARTIFACT_PRESIGNED_REDIRECT', False):
+            res = client.get(self._get_url('1.0.0'))
+
+            assert res.status_code == 200
+            assert res.data == ARCHIVE_CONTENT
+            assert res.headers['Content-Type'] == 'application/zip'
+            assert res.headers['Content-Length'] == str(len(ARCHIVE_CONTENT))
+            assert res.headers['ETag'] == f'"{ARCHIVE_SHA256}"'
+            assert res.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+            res = client.get(self._get_url('1.0.0'), headers={'If-None-Match': f'"{ARCHIVE_SHA256}"'})
+            assert res.status_code == 304
+
+            # Ensure non-existent archive returns 404
+            res = client.get(self._get_url('1.1.0'))
+            assert res.status_code == 404
+
+    @setup_test_data(test_data)
+    def test_x_accel_redirect(self, client, mock_models, data_directory):
+        """Test download is offloaded to nginx using X-Accel-Redirect."""
+        with unittest.mock.patch('terrareg.config.Config.SOURCE_DOWNLOAD_OFFLOAD_MODE', terrareg.config.SourceDownloadOffloadMode.X_ACCEL_REDIRECT):
+            res = client.get(self._get_url('1.0.0'), headers={'Range': 'bytes=0-7'})
+
+            # Ensure range is left to the web server
+            assert res.status_code == 200
+            assert res.data == b''
+            assert 'Content-Length' not in res.headers
+            assert res.headers['Content-Type'] == 'application/zip'
+            assert res.headers['X-Accel-Redirect'] == '/_terrareg_data/modules/testnamespace/testmodulename/testprovider/1.0.0/source.zip'
+            assert res.headers['ETag'] == f'"{ARCHIVE_SHA256}"'
+            assert res.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+            # Ensure conditional requests are not offloaded
+            res = client.get(self._get_url('1.0.0'), headers={'If-None-Match': f'"{ARCHIVE_SHA256}"'})
+            assert res.status_code == 304
+            assert 'X-Accel-Redirect' not in res.headers
+
+            # Ensure archives without digest do not use an ETag
+            res = client.get(self._get_url('1.2.0'))
+            assert res.status_code == 200
+            assert res.headers['X-Accel-Redirect'] == '/_terrareg_data/modules/testnamespace/testmodulename/testprovider/1.2.0/source.zip'
+            assert 'ETag' not in res.headers
+            assert res.headers['Cache-Control'] == 'no-cache'
+
+    @setup_test_data(test_data)
+    def test_x_sendfile(self, client, mock_models, data_directory):
+        """Test download is offloaded to web server using X-Sendfile."""
+        with unittest.mock.patch('terrareg.config.Config.SOURCE_DOWNLOAD_OFFLOAD_MODE', terrareg.config.SourceDownloadOffloadMode.X_SENDFILE):
+            res = client.get(self._get_url('1.1.0'))
+
+        assert res.status_code == 200
+        assert res.data == b''
+        assert res.headers['X-Sendfile'] == os.path.join(
+            data_directory, 'modules', 'testnamespace', 'testmodulename', 'testprovider', '1.1.0', 'source.zip'
+        )
+        assert 'X-Accel-Redirect' not in res.headers
+        assert res.headers['Cache-Control'] == 'no-cache'
@@ -0,0 +1,53 @@
+import unittest.mock
+
+from test.unit.terrareg import TerraregUnitTest
+from test import client, app_context, test_request_context
+
+
+class TestApiTerraregGlobalVersionStats(TerraregUnitTest):
+    """Test global version stats endpoint"""
+
+    def test_global_version_stats(
+            self, app_context,
+            test_request_context,
+            client
+        ):
+        """Test obtaining major, minor and patch release counts."""
+        with client, \
+                unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_module_provider_version_statistics') as mock_get_module_provider_version_statistics:
+
+            mock_get_module_provider_version_statistics.return_value = (4, 7, 12)
+
+            res = client.get('/v1/terrareg/analytics/global/version_stats')
+
+            assert res.json == {
+                'major_versions': 4,
+                'minor_versions': 7,
+                'patch_versions': 12
+            }
+            assert res.status_code == 200
+            mock_get_module_provider_version_statistics.assert_called_once_with()
+
+    def test_global_stats_summary_excludes_version_stats(
+            self, app_context,
+            test_request_context,
+            client
+        ):
+        """Test global stats summary does not calculate version statistics."""
+        with client, \
+                unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_module_provider_version_statistics') as mock_get_module_provider_version_statistics, \
+                unittest.mock.patch('terrareg.models.Namespace.get_total_count', unittest.mock.MagicMock(return_value=2)), \
+                unittest.mock.patch('terrareg.models.ModuleProvider.get_total_count', unittest.mock.MagicMock(return_value=3)), \
+                unittest.mock.patch('terrareg.models.ModuleVersion.get_total_count', unittest.mock.MagicMock(return_value=5)), \
+                unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_total_downloads', unittest.mock.MagicMock(return_value=8)):
+
+            res = client.get('/v1/terrareg/analytics/global/stats_summary')
+
+            assert res.json == {
+                'namespaces': 2,
+                'modules': 3,
+                'module_versions': 5,
+                'downloads': 8
+            }
+            assert res.status_code == 200
+            mock_get_module_provider_version_statistics.assert_not_called()
@@ -1,8 +1,10 @@
 
+import threading
 import unittest.mock
 
 import pytest
 
+from terrareg.analytics import PrometheusMetricsCache
 from test.unit.terrareg import TerraregUnitTest
 from test import client, app_context, test_request_context
 
@@ -10,6 +12,13 @@ from test import client, app_context, test_request_context
 class TestPrometheusMetrics(TerraregUnitTest):
     """Test global usage stats endpoint"""
 
+    @pytest.fixture(autouse=True)
+    def reset_metrics_cache(self):
+        """Remove cached metrics before and after each test."""
+        PrometheusMetricsCache.reset()
+        yield
+        PrometheusMetricsCache.reset()
+
     def test_prometheus_metrics(
             self, app_context,
             test_request_context,
@@ -36,3 +45,58 @@ class TestPrometheusMetrics(TerraregUnitTest):
             assert res.headers['Content-Type'] == 'text/plain; version=0.0.4'
 
             mock_get_prometheus_metrics.assert_called_once()
+
+    def test_prometheus_metrics_cached(
+            self, app_context,
+            test_request_context,
+            client
+        ):
+        """Test metrics are cached and regenerated in the background once expired."""
+        with client, \
+                unittest.mock.patch('terrareg.config.Config.PROMETHEUS_METRICS_CACHE_TTL', 60), \
+                unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_prometheus_metrics') as mock_get_prometheus_metrics, \
+                unittest.mock.patch('terrareg.analytics.time.monotonic') as mock_monotonic:
+
+            # Block regeneration of metrics until released
+            release_refresh = threading.Event()
+            def get_prometheus_metrics():
+                if mock_get_prometheus_metrics.call_count == 1:
+                    return 'first_metric 1'
+                release_refresh.wait(timeout=5)
+                return 'second_metric 1'
+            mock_get_prometheus_metrics.side_effect = get_prometheus_metrics
+            mock_monotonic.return_value = 1000
+
+            assert client.get('/metrics').data.decode('utf-8') == 'first_metric 1'
+            mock_get_prometheus_metrics.assert_called_once()
+
+            # Ensure cached metrics are returned within TTL
+            mock_monotonic.return_value = 1059
+            assert client.get('/metrics').data.decode('utf-8') == 'first_metric 1'
+            mock_get_prometheus_metrics.assert_called_once()
+
+            # Ensure stale metrics are returned whilst metrics are regenerated
+            mock_monotonic.return_value = 1060
+            assert client.get('/metrics').data.decode('utf-8') == 'first_metric 1'
+            release_refresh.set()
+            PrometheusMetricsCache._REFRESH_THREAD.join()
+            assert mock_get_prometheus_metrics.call_count == 2
+
+            assert client.get('/metrics').data.decode('utf-8') == 'second_metric 1'
+
+    def test_prometheus_metrics_cache_disabled(
+            self, app_context,
+            test_request_context,
+            client
+        ):
+        """Test metrics are generated on each request when cache is disabled."""
+        with client, \
+                unittest.mock.patch('terrareg.config.Config.PROMETHEUS_METRICS_CACHE_TTL', 0), \
+                unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_prometheus_metrics') as mock_get_prometheus_metrics:
+
+            mock_get_prometheus_metrics.return_value = 'unittest_metric 1'
+
+            client.get('/metrics')
+            client.get('/metrics')
+
+            assert mock_get_prometheus_metrics.call_count == 2
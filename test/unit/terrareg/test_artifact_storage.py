@@ -0,0 +1,180 @@
+
+import io
+import os
+import tempfile
+import unittest.mock
+
+import pytest
+
+import terrareg.config as terrareg_config
+from terrareg.artifact_storage import BaseArtifactStorage, LocalArtifactStorage, S3ArtifactStorage
+from terrareg.errors import ArtifactStorageNotConfiguredError
+from terrareg.utils import PathIsNotWithinBaseDirectoryError
+
+
+class FakeS3ClientError(Exception):
+    """Error matching format of botocore ClientError"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}}
+
+
+class FakeS3Client:
+    """In-memory S3 client, implementing methods used by S3ArtifactStorage"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fh, bucket, key):
+        self.objects[(bucket, key)] = fh.read()
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3ClientError('404')
+        return {'ContentLength': len(self.objects[(Bucket, Key)])}
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3ClientError('NoSuchKey')
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return f"https://s3.example.com/{Params['Bucket']}/{Params['Key']}?method={method}&expires={ExpiresIn}"
+
+
+@pytest.fixture
+def fake_s3_client():
+    """Configure S3 artifact storage with fake client"""
+    client = FakeS3Client()
+    with unittest.mock.patch('terrareg.config.Config.ARTIFACT_STORAGE_BACKEND', terrareg_config.ArtifactStorageBackend.S3), \
+            unittest.mock.patch('terrareg.config.Config.S3_ARTIFACT_BUCKET', 'unittest-bucket'), \
+            unittest.mock.patch('terrareg.config.Config.S3_ARTIFACT_PREFIX', 'prefix/'), \
+            unittest.mock.patch('terrareg.artifact_storage.S3ArtifactStorage._get_client', return_value=client):
+        yield client
+
+
+class TestBaseArtifactStorage:
+
+    def test_get_local(self):
+        """Test local storage is used by default"""
+        assert isinstance(BaseArtifactStorage.get(), LocalArtifactStorage)
+
+    def test_get_s3(self, fake_s3_client):
+        """Test S3 storage is used when configured"""
+        assert isinstance(BaseArtifactStorage.get(), S3ArtifactStorage)
+
+    def test_get_s3_without_bucket(self):
+        """Test error is raised when S3 storage is configured without bucket"""
+        with unittest.mock.patch('terrareg.config.Config.ARTIFACT_STORAGE_BACKEND', terrareg_config.ArtifactStorageBackend.S3), \
+                unittest.mock.patch('terrareg.config.Config.S3_ARTIFACT_BUCKET', ''):
+            with pytest.raises(ArtifactStorageNotConfiguredError):
+                BaseArtifactStorage.get()
+
+
+class TestLocalArtifactStorage:
+
+    @pytest.fixture
+    def data_directory(self):
+        """Use temporary data directory"""
+        with tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory):
+            yield data_directory
+
+    def test_write_read_delete(self, data_directory):
+        """Test writing, reading and deleting artifacts"""
+        storage = LocalArtifactStorage()
+        key = 'modules/ns/mod/prov/1.0.0/source.zip'
+        assert storage.exists(key) is False
+        assert storage.open(key) is None
+
+        with storage.write_path(key) as path:
+            assert path == os.path.join(data_directory, key)
+            with open(path, 'wb') as fh:
+                fh.write(b'archive content')
+
+        assert storage.exists(key) is True
+        assert storage.get_local_path(key) == os.path.join(data_directory, key)
+        assert storage.get_download_url(key) is None
+        with storage.open(key) as fh:
+            assert fh.read() == b'archive content'
+
+        storage.delete(key)
+        assert storage.exists(key) is False
+        # Ensure deleting non-existent artifact does not error
+        storage.delete(key)
+
+        storage.delete_directory('modules/ns/mod/prov/1.0.0')
+        assert not os.path.exists(os.path.join(data_directory, 'modules/ns/mod/prov/1.0.0'))
+        assert os.path.isdir(os.path.join(data_directory, 'modules/ns/mod/prov'))
+
+    def test_delete_directory_with_unmanaged_files(self, data_directory):
+        """Test directories containing other files are not deleted"""
+        os.makedirs(os.path.join(data_directory, 'modules/ns'))
+        with open(os.path.join(data_directory, 'modules/ns/other-file'), 'w'):
+            pass
+
+        LocalArtifactStorage().delete_directory('modules/ns')
+        assert os.path.isfile(os.path.join(data_directory, 'modules/ns/other-file'))
+
+    def test_path_traversal(self, data_directory):
+        """Test keys outside of data directory are rejected"""
+        with pytest.raises(PathIsNotWithinBaseDirectoryError):
+            LocalArtifactStorage().open('../outside')
+
+
+class TestS3ArtifactStorage:
+
+    def test_write_read_delete(self, fake_s3_client):
+        """Test writing, reading and deleting artifacts"""
+        storage = S3ArtifactStorage()
+        key = 'modules/ns/mod/prov/1.0.0/source.zip'
+        assert storage.exists(key) is False
+        assert storage.open(key) is None
+
+        with storage.write_path(key) as path:
+            # Ensure file is written to temporary path and uploaded on exit
+            with open(path, 'wb') as fh:
+                fh.write(b'archive content')
+            assert fake_s3_client.objects == {}
+
+        assert fake_s3_client.objects == {('unittest-bucket', f'prefix/{key}'): b'archive content'}
+        assert not os.path.exists(path)
+
+        assert storage.exists(key) is True
+        assert storage.get_local_path(key) is None
+        assert storage.open(key).read() == b'archive content'
+
+        storage.delete(key)
+        assert storage.exists(key) is False
+        assert fake_s3_client.objects == {}
+
+    def test_write_path_error(self, fake_s3_client):
+        """Test file is not uploaded when error occurs whilst writing"""
+        storage = S3ArtifactStorage()
+        with pytest.raises(ValueError):
+            with storage.write_path('modules/ns/mod/prov/1.0.0/source.zip') as path:
+                with open(path, 'wb') as fh:
+                    fh.write(b'partial content')
+                raise ValueError('Failed to generate archive')
+
+        assert fake_s3_client.objects == {}
+
+    @pytest.mark.parametrize('presigned_redirect, expected_url', [
+        (True, 'https://s3.example.com/unittest-bucket/prefix/modules/ns/mod/prov/1.0.0/source.zip?method=get_object&expires=60'),
+        (False, None),
+    ])
+    def test_get_download_url(self, presigned_redirect, expected_url, fake_s3_client):
+        """Test presigned download URL is returned, when enabled"""
+        with unittest.mock.patch('terrareg.config.Config.S3_ARTIFACT_PRESIGNED_REDIRECT', presigned_redirect), \
+                unittest.mock.patch('terrareg.config.Config.S3_ARTIFACT_PRESIGNED_URL_EXPIRY', 60):
+            assert S3ArtifactStorage().get_download_url('modules/ns/mod/prov/1.0.0/source.zip') == expected_url
+
+    def test_unexpected_error(self, fake_s3_client):
+        """Test errors other than non-existent objects are raised"""
+        with unittest.mock.patch.object(fake_s3_client, 'head_object', side_effect=FakeS3ClientError('AccessDenied')):
+            with pytest.raises(FakeS3ClientError):
+                S3ArtifactStorage().exists('modules/ns/mod/prov/1.0.0/source.zip')
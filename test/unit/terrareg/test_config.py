@@ -93,6 +93,12 @@ class TestConfig:
         ('GITHUB_APP_CLIENT_ID', None),
         ('GITHUB_APP_CLIENT_SECRET', None),
         ('GITHUB_LOGIN_TEXT', None),
+        ('GIT_MIRROR_CACHE_DIRECTORY', None),
+        ('S3_ARTIFACT_BUCKET', None),
+        ('S3_ARTIFACT_PREFIX', None),
+        ('S3_ARTIFACT_ENDPOINT_URL', None),
+        ('S3_ARTIFACT_REGION', None),
+        ('SOURCE_DOWNLOAD_X_ACCEL_REDIRECT_LOCATION', None),
     ])
     def test_string_configs(self, config_name, override_expected_value):
         """Test string configs to ensure they are overridden with environment variables."""
@@ -101,7 +107,8 @@ class TestConfig:
             assert getattr(terrareg.config.Config(), config_name) == (override_expected_value if override_expected_value is not None else 'unittest-value')
 
     @pytest.mark.parametrize('config_name, test_value, test_expected', [
-        ('SENTRY_TRACES_SAMPLE_RATE', '1.523', 1.523)
+        ('SENTRY_TRACES_SAMPLE_RATE', '1.523', 1.523),
+        ('ANALYTICS_INGESTION_FLUSH_INTERVAL', '2.5', 2.5),
     ])
     def test_custom_string_configs(self, config_name, test_value, test_expected):
         """Test string configs with custom values to ensure they are overridden with environment variables."""
@@ -111,6 +118,24 @@ class TestConfig:
 
     @pytest.mark.parametrize('config_name', [
         'ADMIN_SESSION_EXPIRY_MINS',
+        'ANALYTICS_INGESTION_BATCH_SIZE',
+        'ANALYTICS_INGESTION_MAX_QUEUE_SIZE',
+        'ANALYTICS_RETENTION_DAYS',
+        'ANALYTICS_COMPACTION_INTERVAL',
+        'ANALYTICS_COMPACTION_BATCH_SIZE',
+        'PROMETHEUS_METRICS_CACHE_TTL',
+        'MODULE_EXTRACTION_PARALLELISM',
+        'MODULE_EXTRACTION_CACHE_MAX_AGE',
+        'README_HTML_CACHE_MEMORY_ENTRIES',
+        'MODULE_SPECS_CACHE_SIZE',
+        'MODULE_ARCHIVE_COMPRESSION_LEVEL',
+        'S3_ARTIFACT_PRESIGNED_URL_EXPIRY',
+        'MODULE_INDEXING_JOB_WORKERS',
+        'MODULE_BULK_IMPORT_CONCURRENCY',
+        'GIT_MIRROR_CACHE_MAX_SIZE',
+        'MODULE_INDEXING_JOB_MAX_ATTEMPTS',
+        'MODULE_INDEXING_JOB_RETRY_DELAY',
+        'MODULE_INDEXING_JOB_LEASE_DURATION',
         'LISTEN_PORT',
         'GIT_CLONE_TIMEOUT',
         'REDIRECT_DELETION_LOOKBACK_DAYS',
@@ -146,6 +171,7 @@ class TestConfig:
         ('IGNORE_ANALYTICS_TOKEN_AUTH_KEYS'),
         ('OPENID_CONNECT_SCOPES'),
         ('EXAMPLE_FILE_EXTENSIONS'),
+        ('MODULE_ARCHIVE_FORMATS'),
     ])
     def test_list_configs(self, config_name, test_value, expected_value):
         """Test list configs to ensure they are overridden with environment variables."""
@@ -156,7 +182,10 @@ class TestConfig:
 
     @pytest.mark.parametrize('config_name,enum,expected_default', [
         ('MODULE_VERSION_REINDEX_MODE', terrareg.config.ModuleVersionReindexMode, terrareg.config.ModuleVersionReindexMode.LEGACY),
+        ('MODULE_SEARCH_BACKEND', terrareg.config.ModuleSearchBackend, terrareg.config.ModuleSearchBackend.DATABASE),
         ('SERVER', terrareg.config.ServerType, terrareg.config.ServerType.BUILTIN),
+        ('ARTIFACT_STORAGE_BACKEND', terrareg.config.ArtifactStorageBackend, terrareg.config.ArtifactStorageBackend.LOCAL),
+        ('SOURCE_DOWNLOAD_OFFLOAD_MODE', terrareg.config.SourceDownloadOffloadMode, terrareg.config.SourceDownloadOffloadMode.NONE),
     ])
     def test_enum_configs(self, config_name, enum, expected_default):
         """Test enum configs to ensure they are overridden with environment variables."""
@@ -205,6 +234,11 @@ class TestConfig:
         'OPENID_CONNECT_DEBUG',
         "MANAGE_TERRAFORM_RC_FILE",
         'DISABLE_ANALYTICS',
+        'ANALYTICS_ASYNC_INGESTION',
+        'MODULE_INDEXING_JOB_QUEUE',
+        'S3_ARTIFACT_PRESIGNED_REDIRECT',
+        'MODULE_EXTRACTION_CACHE',
+        'README_HTML_CACHE',
         'ALLOW_FORCEFUL_MODULE_PROVIDER_REDIRECT_DELETION',
         'ALLOW_UNAUTHENTICATED_ACCESS',
         'AUTO_GENERATE_GITHUB_ORGANISATION_NAMESPACES',
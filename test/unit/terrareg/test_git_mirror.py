@@ -0,0 +1,161 @@
+
+import os
+import subprocess
+import tempfile
+import threading
+import unittest.mock
+
+import pytest
+
+from terrareg.git_mirror import GitMirrorCache
+
+
+class TestGitMirrorCache:
+
+    @pytest.fixture
+    def cache_directory(self):
+        """Enable mirror cache using temporary directory"""
+        with tempfile.TemporaryDirectory() as cache_directory, \
+                unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', cache_directory), \
+                unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_MAX_SIZE', 1024):
+            yield cache_directory
+
+    @staticmethod
+    def _git(repository, *args):
+        """Run git command in repository"""
+        subprocess.check_output(
+            ['git', '-c', 'user.name=unittest', '-c', 'user.email=unittest@example.com', *args],
+            cwd=repository
+        )
+
+    @pytest.fixture
+    def repository(self):
+        """Create git repository with tags"""
+        with tempfile.TemporaryDirectory() as repository:
+            self._git(repository, 'init', '--quiet')
+            for version in ['1.0.0', '1.1.0']:
+                with open(os.path.join(repository, 'main.tf'), 'w') as fh:
+                    fh.write(f'# {version}\n')
+                self._git(repository, 'add', 'main.tf')
+                self._git(repository, 'commit', '--quiet', '-m', version)
+                self._git(repository, 'tag', f'v{version}')
+            yield repository
+
+    def _clone(self, repository, tag):
+        """Clone tag into temporary directory and return content of main.tf"""
+        with tempfile.TemporaryDirectory() as destination:
+            GitMirrorCache.clone(git_url=repository, tag=tag, destination=destination, env=os.environ.copy(), timeout=None)
+            with open(os.path.join(destination, 'main.tf'), 'r') as fh:
+                return fh.read()
+
+    def test_clone(self, cache_directory, repository):
+        """Test cloning tags, mirroring repository once and fetching changes for subsequent clones."""
+        with unittest.mock.patch('terrareg.git_mirror.subprocess.check_output', wraps=subprocess.check_output) as mock_check_output:
+            assert self._clone(repository, 'v1.0.0') == '# 1.0.0\n'
+            assert self._clone(repository, 'v1.1.0') == '# 1.1.0\n'
+
+            # Add new tag to remote, which should be fetched into mirror
+            with open(os.path.join(repository, 'main.tf'), 'w') as fh:
+                fh.write('# 2.0.0\n')
+            self._git(repository, 'commit', '--quiet', '-am', '2.0.0')
+            self._git(repository, 'tag', 'v2.0.0')
+            assert self._clone(repository, 'v2.0.0') == '# 2.0.0\n'
+
+        commands = [call.args[0][:3] for call in mock_check_output.call_args_list]
+        assert commands.count(['git', 'clone', '--mirror']) == 1
+        assert commands.count(['git', 'remote', 'update']) == 2
+        assert os.path.isdir(GitMirrorCache.get_mirror_directory(repository))
+
+    def test_clone_non_existent_tag(self, cache_directory, repository):
+        """Test cloning non-existent tag raises error."""
+        with pytest.raises(subprocess.CalledProcessError):
+            self._clone(repository, 'v5.0.0')
+
+    def test_get_tag_refs(self, cache_directory, repository):
+        """Test obtaining tag refs from mirror."""
+        assert GitMirrorCache.get_tag_refs(git_url=repository, env=os.environ.copy(), timeout=None) == [
+            'refs/tags/v1.0.0', 'refs/tags/v1.1.0'
+        ]
+        assert os.path.isdir(GitMirrorCache.get_mirror_directory(repository))
+
+    def test_evict(self, cache_directory, repository):
+        """Test least recently used mirrors are removed once maximum size is exceeded."""
+        with tempfile.TemporaryDirectory() as second_repository:
+            self._git(second_repository, 'clone', '--quiet', repository, '.')
+
+            self._clone(repository, 'v1.0.0')
+            with unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_MAX_SIZE', 0):
+                self._clone(second_repository, 'v1.0.0')
+
+            # Mirror of most recently used repository is retained
+            assert not os.path.isdir(GitMirrorCache.get_mirror_directory(repository))
+            assert os.path.isdir(GitMirrorCache.get_mirror_directory(second_repository))
+
+    def test_temporary_mirror(self, repository):
+        """Test cloning tags via temporary mirror, when cache is disabled."""
+        with unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', None):
+            assert not GitMirrorCache.is_enabled(git_url=repository)
+
+            with unittest.mock.patch('terrareg.git_mirror.subprocess.check_output', wraps=subprocess.check_output) as mock_check_output:
+                with GitMirrorCache.temporary_mirror(repository):
+                    assert GitMirrorCache.is_enabled(git_url=repository)
+                    mirror_directory = GitMirrorCache.get_mirror_directory(repository)
+
+                    # Ensure nested contexts share the mirror
+                    with GitMirrorCache.temporary_mirror(repository):
+                        assert self._clone(repository, 'v1.0.0') == '# 1.0.0\n'
+                    assert self._clone(repository, 'v1.1.0') == '# 1.1.0\n'
+                    assert os.path.isdir(mirror_directory)
+
+            # Ensure repository is mirrored once, without being updated for subsequent clones
+            commands = [call.args[0][:3] for call in mock_check_output.call_args_list]
+            assert commands.count(['git', 'clone', '--mirror']) == 1
+            assert commands.count(['git', 'remote', 'update']) == 0
+
+            # Ensure mirror is removed
+            assert not os.path.exists(mirror_directory)
+            assert not GitMirrorCache.is_enabled(git_url=repository)
+
+    def test_temporary_mirror_with_cache_enabled(self, cache_directory, repository):
+        """Test temporary mirror is not used when cache is enabled."""
+        with GitMirrorCache.temporary_mirror(repository):
+            assert GitMirrorCache.get_mirror_directory(repository) == os.path.join(
+                cache_directory, f'{GitMirrorCache.get_repository_key(repository)}.git')
+        assert GitMirrorCache._TEMPORARY_CACHE_DIRECTORIES.get() == {}
+
+    def test_temporary_mirror_missing_tag(self, repository):
+        """Test cloning tag that is missing from existing temporary mirror fetches from remote."""
+        with unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', None), \
+                GitMirrorCache.temporary_mirror(repository):
+            assert self._clone(repository, 'v1.0.0') == '# 1.0.0\n'
+
+            # Add new tag to remote, after the repository has been mirrored
+            with open(os.path.join(repository, 'main.tf'), 'w') as fh:
+                fh.write('# 2.0.0\n')
+            self._git(repository, 'commit', '--quiet', '-am', '2.0.0')
+            self._git(repository, 'tag', 'v2.0.0')
+
+            with unittest.mock.patch('terrareg.git_mirror.subprocess.check_output', wraps=subprocess.check_output) as mock_check_output:
+                assert self._clone(repository, 'v2.0.0') == '# 2.0.0\n'
+                # Existing tags are cloned without updating the mirror
+                assert self._clone(repository, 'v1.1.0') == '# 1.1.0\n'
+
+            commands = [call.args[0][:3] for call in mock_check_output.call_args_list]
+            assert commands.count(['git', 'clone', '--mirror']) == 0
+            assert commands.count(['git', 'remote', 'update']) == 1
+
+    def test_temporary_mirror_other_thread(self, repository):
+        """Test temporary mirror is not used by other threads, without copying the context."""
+        results = []
+
+        def check_enabled():
+            results.append(GitMirrorCache.is_enabled(git_url=repository))
+
+        with unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', None), \
+                GitMirrorCache.temporary_mirror(repository):
+            thread = threading.Thread(target=check_enabled)
+            thread.start()
+            thread.join()
+            assert GitMirrorCache.is_enabled(git_url=repository)
+
+        assert results == [False]
@@ -0,0 +1,168 @@
+
+import hashlib
+import os
+import tarfile
+import tempfile
+import zipfile
+
+import pytest
+
+from terrareg.module_archive import ModuleArchiveGenerator
+
+
+class TestModuleArchiveGenerator:
+
+    @pytest.fixture
+    def source_directory(self):
+        """Create directory containing module source"""
+        with tempfile.TemporaryDirectory() as source_directory:
+            for path, content in {
+                'main.tf': '# main',
+                'variables.tf': '# variables',
+                'scripts/run.sh': '#!/bin/bash',
+                'modules/b/main.tf': '# b',
+                'modules/a/main.tf': '# a',
+                '.git/HEAD': 'ref: refs/heads/main',
+                'modules/.git/HEAD': 'nested git file',
+            }.items():
+                os.makedirs(os.path.join(source_directory, os.path.dirname(path)), exist_ok=True)
+                with open(os.path.join(source_directory, path), 'w') as fh:
+                    fh.write(content)
+            os.chmod(os.path.join(source_directory, 'scripts/run.sh'), 0o700)
+            os.symlink('main.tf', os.path.join(source_directory, 'link.tf'))
+            os.symlink('/etc/passwd', os.path.join(source_directory, 'outside'))
+            yield source_directory
+
+    EXPECTED_FILES = {
+        'main.tf': b'# main',
+        'modules/.git/HEAD': b'nested git file',
+        'modules/a/main.tf': b'# a',
+        'modules/b/main.tf': b'# b',
+        'scripts/run.sh': b'#!/bin/bash',
+        'variables.tf': b'# variables',
+    }
+
+    def _generate(self, source_directory, output_directory, **kwargs):
+        """Generate archives and return paths"""
+        zip_path = os.path.join(output_directory, 'source.zip')
+        tar_gz_path = os.path.join(output_directory, 'source.tar.gz')
+        digests = ModuleArchiveGenerator(source_directory=source_directory, compression_level=6).generate(
+            zip_path=zip_path, tar_gz_path=tar_gz_path, **kwargs
+        )
+
+        # Ensure digests match generated archives
+        for archive_format, path in [('zip', zip_path), ('tar.gz', tar_gz_path)]:
+            with open(path, 'rb') as fh:
+                content = fh.read()
+            assert digests[archive_format].sha256 == hashlib.sha256(content).hexdigest()
+            assert digests[archive_format].size == len(content)
+
+        return zip_path, tar_gz_path
+
+    def test_generate(self, source_directory):
+        """Test generating zip and tar.gz archives."""
+        with tempfile.TemporaryDirectory() as output_directory:
+            zip_path, tar_gz_path = self._generate(source_directory, output_directory)
+
+            with zipfile.ZipFile(zip_path) as zip_file:
+                names = zip_file.namelist()
+                # Ensure entries are sorted and top-level .git directory is excluded
+                assert names == [
+                    'link.tf', 'main.tf', 'modules/', 'modules/.git/', 'modules/.git/HEAD',
+                    'modules/a/', 'modules/a/main.tf', 'modules/b/', 'modules/b/main.tf',
+                    'scripts/', 'scripts/run.sh', 'variables.tf'
+                ]
+                # Ensure symlink within module is replaced with content of target
+                assert zip_file.read('link.tf') == b'# main'
+                for name, content in self.EXPECTED_FILES.items():
+                    assert zip_file.read(name) == content
+                assert all(info.date_time == (1980, 1, 1, 0, 0, 0) for info in zip_file.infolist())
+                assert (zip_file.getinfo('scripts/run.sh').external_attr >> 16) & 0o777 == 0o755
+                assert (zip_file.getinfo('main.tf').external_attr >> 16) & 0o777 == 0o644
+
+            with tarfile.open(tar_gz_path, 'r:gz') as tar:
+                members = tar.getmembers()
+                assert [member.name for member in members] == [
+                    'link.tf', 'main.tf', 'modules', 'modules/.git', 'modules/.git/HEAD',
+                    'modules/a', 'modules/a/main.tf', 'modules/b', 'modules/b/main.tf',
+                    'outside', 'scripts', 'scripts/run.sh', 'variables.tf'
+                ]
+                for name, content in self.EXPECTED_FILES.items():
+                    assert tar.extractfile(name).read() == content
+                assert tar.getmember('link.tf').issym()
+                assert tar.getmember('link.tf').linkname == 'main.tf'
+                assert all(member.mtime == ModuleArchiveGenerator.ENTRY_MTIME for member in members)
+                assert all(member.uid == 0 and member.uname == '' for member in members)
+                assert tar.getmember('scripts/run.sh').mode == 0o755
+
+            # Ensure no temporary files remain
+            assert sorted(os.listdir(output_directory)) == ['source.tar.gz', 'source.zip']
+
+    def test_generate_reproducible(self, source_directory):
+        """Test archives of identical content are identical."""
+        with tempfile.TemporaryDirectory() as first_output, tempfile.TemporaryDirectory() as second_output:
+            first_paths = self._generate(source_directory, first_output)
+
+            # Update modification time of files
+            os.utime(os.path.join(source_directory, 'main.tf'), (1000000000, 1000000000))
+
+            second_paths = self._generate(source_directory, second_output)
+
+            for first_path, second_path in zip(first_paths, second_paths):
+                with open(first_path, 'rb') as first_fh, open(second_path, 'rb') as second_fh:
+                    assert first_fh.read() == second_fh.read()
+
+    @pytest.mark.parametrize('generate_zip, generate_tar_gz', [
+        (True, False),
+        (False, True),
+        (False, False),
+    ])
+    def test_generate_single_format(self, source_directory, generate_zip, generate_tar_gz):
+        """Test only generating requested formats."""
+        with tempfile.TemporaryDirectory() as output_directory:
+            zip_path = os.path.join(output_directory, 'source.zip')
+            tar_gz_path = os.path.join(output_directory, 'source.tar.gz')
+            digests = ModuleArchiveGenerator(source_directory=source_directory).generate(
+                zip_path=zip_path if generate_zip else None,
+                tar_gz_path=tar_gz_path if generate_tar_gz else None
+            )
+
+            assert ('zip' in digests) is generate_zip
+            assert ('tar.gz' in digests) is generate_tar_gz
+
+            assert os.path.isfile(zip_path) is generate_zip
+            assert os.path.isfile(tar_gz_path) is generate_tar_gz
+
+            if generate_zip:
+                with zipfile.ZipFile(zip_path) as zip_file:
+                    for name, content in self.EXPECTED_FILES.items():
+                        assert zip_file.read(name) == content
+            if generate_tar_gz:
+                with tarfile.open(tar_gz_path, 'r:gz') as tar:
+                    for name, content in self.EXPECTED_FILES.items():
+                        assert tar.extractfile(name).read() == content
+
+    @pytest.mark.parametrize('compression_level', [0, 9])
+    def test_generate_zip_compression_level(self, compression_level):
+        """Test compression level is applied to files in zip archive."""
+        with tempfile.TemporaryDirectory() as source_directory, \
+                tempfile.TemporaryDirectory() as output_directory:
+            content = b'variable "test" {}\n' * 1000
+            with open(os.path.join(source_directory, 'main.tf'), 'wb') as fh:
+                fh.write(content)
+
+            zip_path = os.path.join(output_directory, 'source.zip')
+            ModuleArchiveGenerator(source_directory=source_directory, compression_level=compression_level).generate(
+                zip_path=zip_path, tar_gz_path=None
+            )
+
+            with zipfile.ZipFile(zip_path) as zip_file:
+                zip_info = zip_file.getinfo('main.tf')
+                assert zip_info.compress_type == zipfile.ZIP_DEFLATED
+                assert zip_file.read('main.tf') == content
+
+            # Compression level 0 stores data without compression
+            if compression_level == 0:
+                assert zip_info.compress_size >= len(content)
+            else:
+                assert zip_info.compress_size < len(content) // 10
@@ -1,8 +1,11 @@
 
+import hashlib
+import json
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
 from unittest.main import MODULE_EXAMPLES
 import unittest.mock
 
@@ -15,6 +18,9 @@ from test.unit.terrareg import (
     mock_models
 )
 from terrareg.module_extractor import GitModuleExtractor, ModuleExtractor
+from terrareg.extraction_cache import ExtractionCache
+from terrareg.module_archive import ArchiveDigest
+from test.unit.terrareg.test_artifact_storage import fake_s3_client
 import terrareg.models
 
 
@@ -53,6 +59,92 @@ class TestGitModuleExtractor(TerraregUnitTest):
             timeout=300)
         assert check_call_mock.call_args.kwargs['env']['GIT_SSH_COMMAND'] == 'ssh -o StrictHostKeyChecking=accept-new'
 
+    @setup_test_data()
+    def test__clone_repository_with_git_mirror_cache(self, mock_models):
+        """Test _clone_repository method clones via git mirror cache, when enabled"""
+        namespace = terrareg.models.Namespace(name='moduleextraction')
+        module = terrareg.models.Module(namespace=namespace, name='gitextraction')
+        module_provider = terrareg.models.ModuleProvider(module=module, name='staticrepourl')
+        module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version='4.3.2')
+
+        module_extractor = GitModuleExtractor(module_version=module_version)
+        with unittest.mock.patch('terrareg.module_extractor.subprocess.check_output') as check_output_mock, \
+                unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', '/tmp/git-mirrors'), \
+                unittest.mock.patch('terrareg.git_mirror.GitMirrorCache.clone') as mock_mirror_clone:
+            with module_extractor as me:
+                me._clone_repository()
+
+        check_output_mock.assert_not_called()
+        mock_mirror_clone.assert_called_once_with(
+            git_url='ssh://git@localhost:7999/bla/test-module.git',
+            tag='v4.3.2',
+            destination=module_extractor.extract_directory,
+            env=unittest.mock.ANY,
+            timeout=300
+        )
+        assert mock_mirror_clone.call_args.kwargs['env']['GIT_SSH_COMMAND'] == 'ssh -o StrictHostKeyChecking=accept-new'
+
+    @setup_test_data()
+    @pytest.mark.parametrize('archive_formats, expect_zip, expect_tar_gz', [
+        (['zip', 'tar.gz'], True, True),
+        (['zip'], True, False),
+        ([], False, False),
+    ])
+    def test__generate_archive(self, archive_formats, expect_zip, expect_tar_gz, mock_models):
+        """Test _generate_archive only generates configured archive formats"""
+        namespace = terrareg.models.Namespace(name='moduleextraction')
+        module = terrareg.models.Module(namespace=namespace, name='gitextraction')
+        module_provider = terrareg.models.ModuleProvider(module=module, name='staticrepourl')
+        module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version='4.3.2')
+
+        digests = {}
+        if expect_zip:
+            digests['zip'] = ArchiveDigest(sha256='abcdef', size=1234)
+        if expect_tar_gz:
+            digests['tar.gz'] = ArchiveDigest(sha256='fedcba', size=4321)
+
+        with tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory), \
+                unittest.mock.patch('terrareg.config.Config.MODULE_ARCHIVE_FORMATS', archive_formats), \
+                unittest.mock.patch('terrareg.models.ModuleVersion.update_attributes') as mock_update_attributes, \
+                unittest.mock.patch('terrareg.module_archive.ModuleArchiveGenerator.generate', return_value=digests) as mock_generate:
+            with GitModuleExtractor(module_version=module_version) as me:
+                me._generate_archive()
+
+            mock_generate.assert_called_once_with(
+                zip_path=module_version.archive_path_zip if expect_zip else None,
+                tar_gz_path=module_version.archive_path_tar_gz if expect_tar_gz else None
+            )
+        # Ensure digest of zip archive is stored against module version
+        mock_update_attributes.assert_called_once_with(
+            archive_sha256='abcdef' if expect_zip else None,
+            archive_size=1234 if expect_zip else None
+        )
+
+    @setup_test_data()
+    def test__generate_archive_s3_storage(self, mock_models, fake_s3_client):
+        """Test _generate_archive uploads archives to S3 artifact storage"""
+        namespace = terrareg.models.Namespace(name='moduleextraction')
+        module = terrareg.models.Module(namespace=namespace, name='gitextraction')
+        module_provider = terrareg.models.ModuleProvider(module=module, name='staticrepourl')
+        module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version='4.3.2')
+
+        with unittest.mock.patch('terrareg.config.Config.MODULE_ARCHIVE_FORMATS', ['zip']), \
+                unittest.mock.patch('terrareg.models.ModuleVersion.update_attributes') as mock_update_attributes:
+            with GitModuleExtractor(module_version=module_version) as me:
+                with open(os.path.join(me.extract_directory, 'main.tf'), 'w') as fh:
+                    fh.write('# main')
+                me._generate_archive()
+
+        assert list(fake_s3_client.objects) == [
+            ('unittest-bucket', 'prefix/modules/moduleextraction/gitextraction/staticrepourl/4.3.2/source.zip')
+        ]
+        zip_content = list(fake_s3_client.objects.values())[0]
+        mock_update_attributes.assert_called_once_with(
+            archive_sha256=hashlib.sha256(zip_content).hexdigest(),
+            archive_size=len(zip_content)
+        )
+
     @setup_test_data()
     def test_known_git_error(self, mock_models):
         """Test error thrown by git with expected format of error."""
@@ -167,6 +259,21 @@ class TestGitModuleExtractor(TerraregUnitTest):
             )
             mock_create_terraform_rc_file.assert_called_once_with()
 
+    def test_run_tf_init_lock(self):
+        """Test terraform init is run whilst holding the terraform init lock"""
+        def check_call(*args, **kwargs):
+            assert GitModuleExtractor.TERRAFORM_INIT_LOCK.locked()
+
+        with unittest.mock.patch('terrareg.module_extractor.subprocess.check_call', unittest.mock.MagicMock(side_effect=check_call)) as mock_check_call, \
+                unittest.mock.patch("terrareg.module_extractor.ModuleExtractor._create_terraform_rc_file", unittest.mock.MagicMock()):
+
+            module_extractor = GitModuleExtractor(module_version=None)
+
+            assert module_extractor._run_tf_init(module_path='/tmp/mock-patch/to/module') is True
+
+            mock_check_call.assert_called_once()
+            assert not GitModuleExtractor.TERRAFORM_INIT_LOCK.locked()
+
     def test_run_tf_init_error(self):
         """Test running terraform init with error returned"""
 
@@ -290,28 +397,112 @@ terraform {
                 shutil.rmtree(temp_dir)
 
 
+    @staticmethod
+    def _mock_terraform_check_output(terraform_version='1.5.7'):
+        """Return mock check_output, creating binary for tfswitch and returning version for terraform."""
+        def check_output(command, **kwargs):
+            if command[0] == 'tfswitch':
+                with open(command[4], 'w') as fh:
+                    fh.write(f'terraform {terraform_version}')
+                return b''
+            assert command[1:] == ['-version', '-json']
+            return json.dumps({'terraform_version': terraform_version}).encode('utf-8')
+        return unittest.mock.MagicMock(side_effect=check_output)
+
     def test_switch_terraform_versions(self):
         """Test switching terraform versions."""
         module_extractor = GitModuleExtractor(module_version=None)
         mock_lock = unittest.mock.MagicMock()
         mock_lock.acquire.return_value = True
+        check_output_mock = self._mock_terraform_check_output()
 
-        with unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.TERRAFORM_LOCK', mock_lock), \
-                unittest.mock.patch('terrareg.module_extractor.subprocess.check_output', unittest.mock.MagicMock()) as check_output_mock, \
+        with tempfile.TemporaryDirectory() as cache_directory, \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.TFSWITCH_LOCK', mock_lock), \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.get_terraform_binary_cache_directory',
+                                    unittest.mock.MagicMock(return_value=cache_directory)), \
+                unittest.mock.patch('terrareg.module_extractor.subprocess.check_output', check_output_mock), \
                 unittest.mock.patch('terrareg.config.Config.DEFAULT_TERRAFORM_VERSION', 'unittest-tf-version'), \
                 unittest.mock.patch('terrareg.config.Config.TERRAFORM_ARCHIVE_MIRROR', 'https://localhost-archive/mirror/terraform'):
 
             with module_extractor._switch_terraform_versions(module_path='/tmp/mock-patch/to/module'):
-                pass
+                # Ensure version-specific binary is used
+                assert module_extractor.terraform_binary == os.path.join(cache_directory, '1.5.7', 'terraform')
+                with open(module_extractor.terraform_binary, 'r') as fh:
+                    assert fh.read() == 'terraform 1.5.7'
+
+            # Ensure default binary path is returned outside of context
+            assert module_extractor.terraform_binary == os.path.join(os.getcwd(), 'bin', 'terraform')
+
+            # Ensure temporary tfswitch directory has been removed
+            assert os.listdir(cache_directory) == ['1.5.7']
+
+        mock_lock.acquire.assert_called_once_with(blocking=True, timeout=60)
+        mock_lock.release.assert_called_once_with()
+        expected_env = os.environ.copy()
+        expected_env['TF_VERSION'] = "unittest-tf-version"
+        tfswitch_call = check_output_mock.call_args_list[0]
+        assert tfswitch_call.args[0][:4] == ["tfswitch", "--mirror", "https://localhost-archive/mirror/terraform", "--bin"]
+        assert tfswitch_call.args[0][4].startswith(os.path.join(cache_directory, '.tfswitch-'))
+        assert tfswitch_call.kwargs == {'env': expected_env, 'cwd': "/tmp/mock-patch/to/module"}
+
+    def test_switch_terraform_versions_existing_version(self):
+        """Test switching terraform versions does not replace binary for version already in cache."""
+        module_extractor = GitModuleExtractor(module_version=None)
+
+        with tempfile.TemporaryDirectory() as cache_directory, \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.get_terraform_binary_cache_directory',
+                                    unittest.mock.MagicMock(return_value=cache_directory)), \
+                unittest.mock.patch('terrareg.module_extractor.subprocess.check_output', self._mock_terraform_check_output()):
+
+            existing_binary = os.path.join(cache_directory, '1.5.7', 'terraform')
+            os.makedirs(os.path.dirname(existing_binary))
+            with open(existing_binary, 'w') as fh:
+                fh.write('existing binary')
+
+            with module_extractor._switch_terraform_versions(module_path='/tmp/mock-patch/to/module'):
+                assert module_extractor.terraform_binary == existing_binary
 
-            mock_lock.acquire.assert_called_once_with(blocking=True, timeout=60)
-            expected_env = os.environ.copy()
-            expected_env['TF_VERSION'] = "unittest-tf-version"
-            check_output_mock.assert_called_once_with(
-                ["tfswitch", "--mirror", "https://localhost-archive/mirror/terraform", "--bin", f"{os.getcwd()}/bin/terraform"],
-                env=expected_env,
-                cwd="/tmp/mock-patch/to/module"
-            )
+            with open(existing_binary, 'r') as fh:
+                assert fh.read() == 'existing binary'
+
+    def test_switch_terraform_versions_per_thread(self):
+        """Test terraform binary selected by switching terraform versions is only used by current thread."""
+        module_extractor = GitModuleExtractor(module_version=None)
+        thread_terraform_binary = []
+
+        with tempfile.TemporaryDirectory() as cache_directory, \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.get_terraform_binary_cache_directory',
+                                    unittest.mock.MagicMock(return_value=cache_directory)), \
+                unittest.mock.patch('terrareg.module_extractor.subprocess.check_output', self._mock_terraform_check_output('1.3.2')):
+
+            with module_extractor._switch_terraform_versions(module_path='/tmp/mock-patch/to/module'):
+                thread = threading.Thread(target=lambda: thread_terraform_binary.append(module_extractor.terraform_binary))
+                thread.start()
+                thread.join()
+
+                assert module_extractor.terraform_binary == os.path.join(cache_directory, '1.3.2', 'terraform')
+
+        assert thread_terraform_binary == [os.path.join(os.getcwd(), 'bin', 'terraform')]
+
+    @pytest.mark.parametrize('version_output, expected_version', [
+        (b'{"terraform_version": "1.5.7", "platform": "linux_amd64"}', '1.5.7'),
+        # Terraform versions that do not support JSON output
+        (b'Terraform v0.12.31\n\nYour version of Terraform is out of date!', '0.12.31'),
+    ])
+    def test_get_terraform_binary_version(self, version_output, expected_version):
+        """Test obtaining version of terraform binary."""
+        with unittest.mock.patch('terrareg.module_extractor.subprocess.check_output',
+                                 unittest.mock.MagicMock(return_value=version_output)) as check_output_mock:
+            assert ModuleExtractor._get_terraform_binary_version('/tmp/terraform') == expected_version
+
+        check_output_mock.assert_called_once_with(['/tmp/terraform', '-version', '-json'])
+
+    def test_get_terraform_binary_version_invalid(self):
+        """Test obtaining version of terraform binary with unexpected output."""
+        with unittest.mock.patch('terrareg.module_extractor.subprocess.check_output',
+                                 unittest.mock.MagicMock(return_value=b'{"terraform_version": "../../1.0.0"}')):
+            with pytest.raises(terrareg.errors.TerraformVersionSwitchError):
+                ModuleExtractor._get_terraform_binary_version('/tmp/terraform')
 
     def test_switch_terraform_versions_error(self):
         """Test running switch_terraform_version with erorr in tfswitch"""
@@ -321,7 +512,10 @@ terraform {
         def raise_exception(*args, **kwargs):
             raise subprocess.CalledProcessError(cmd="test", returncode=2)
 
-        with unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.TERRAFORM_LOCK', mock_lock), \
+        with tempfile.TemporaryDirectory() as cache_directory, \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.TFSWITCH_LOCK', mock_lock), \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.get_terraform_binary_cache_directory',
+                                    unittest.mock.MagicMock(return_value=cache_directory)), \
                 unittest.mock.patch('terrareg.module_extractor.subprocess.check_output', unittest.mock.MagicMock(side_effect=raise_exception)) as check_output_mock, \
                 unittest.mock.patch('terrareg.config.Config.DEFAULT_TERRAFORM_VERSION', 'unittest-tf-version'):
 
@@ -329,13 +523,19 @@ terraform {
                 with module_extractor._switch_terraform_versions(module_path='/tmp/mock-patch/to/module'):
                     pass
 
+            mock_lock.release.assert_called_once_with()
+            assert os.listdir(cache_directory) == []
+
     def test_switch_terraform_versions_with_lock(self):
-        """Test switching terraform versions whilst Terraform locked is already acquired."""
+        """Test switching terraform versions whilst tfswitch lock is already acquired."""
         module_extractor = GitModuleExtractor(module_version=None)
         mock_lock = unittest.mock.MagicMock()
         mock_lock.acquire.return_value = False
 
-        with unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.TERRAFORM_LOCK', mock_lock), \
+        with tempfile.TemporaryDirectory() as cache_directory, \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.TFSWITCH_LOCK', mock_lock), \
+                unittest.mock.patch('terrareg.module_extractor.ModuleExtractor.get_terraform_binary_cache_directory',
+                                    unittest.mock.MagicMock(return_value=cache_directory)), \
                 unittest.mock.patch('terrareg.module_extractor.subprocess.check_output', unittest.mock.MagicMock()) as check_output_mock:
             
             with pytest.raises(terrareg.errors.UnableToGetGlobalTerraformLockError):
@@ -540,4 +740,204 @@ disable_checkpoint = true
         for example_path, mock_example_file_instance in created_example_files.items():
             mock_example_file_instance.update_attributes.assert_called_once_with(
                 content=file_contents[example_path]
-            )
\ No newline at end of file
+            )
+    def test_process_submodules_parallel(self):
+        """Test _process_submodules analyses submodules concurrently in separate copies of the module."""
+        mock_module_version = unittest.mock.MagicMock()
+        mock_module_version.git_path = ''
+
+        mock_submodule = unittest.mock.MagicMock(spec=terrareg.models.Submodule)
+        mock_submodule.path = 'modules/submodule'
+        mock_example = unittest.mock.MagicMock(spec=terrareg.models.Example)
+        mock_example.path = 'examples/example'
+
+        # Ensure both workers are running concurrently
+        barrier = threading.Barrier(2, timeout=5)
+        analysed_directories = {}
+
+        def mock_analyse_submodule(submodule_path, is_example, module_directory, base_directory):
+            barrier.wait()
+            analysed_directories[submodule_path] = module_directory
+
+            # Ensure worker has a copy of the module, without the git or terraform directories
+            assert base_directory == module_directory
+            assert module_directory != module_extractor.module_directory
+            assert os.path.isfile(os.path.join(module_directory, submodule_path, 'main.tf'))
+            assert not os.path.exists(os.path.join(module_directory, '.git'))
+            assert not os.path.exists(os.path.join(module_directory, '.terraform'))
+            return {'submodule_path': submodule_path, 'is_example': is_example}
+
+        with GitModuleExtractor(module_version=mock_module_version) as module_extractor, \
+                unittest.mock.patch('terrareg.config.Config.MODULE_EXTRACTION_PARALLELISM', 2), \
+                unittest.mock.patch.object(module_extractor, '_analyse_submodule', side_effect=mock_analyse_submodule), \
+                unittest.mock.patch.object(module_extractor, '_extract_example_files') as mock_extract_example_files, \
+                unittest.mock.patch.object(module_extractor, '_insert_submodule_details') as mock_insert_submodule_details:
+
+            for path in ['modules/submodule', 'examples/example', '.git', '.terraform']:
+                os.makedirs(os.path.join(module_extractor.extract_directory, path))
+                with open(os.path.join(module_extractor.extract_directory, path, 'main.tf'), 'w') as fh:
+                    fh.write('')
+
+            module_extractor._process_submodules(submodules=[mock_submodule, mock_example])
+
+        # Ensure each submodule was analysed in a different copy of the module,
+        # which has since been removed
+        assert len(set(analysed_directories.values())) == 2
+        for module_directory in analysed_directories.values():
+            assert not os.path.exists(module_directory)
+
+        mock_extract_example_files.assert_called_once_with(example=mock_example)
+        assert mock_insert_submodule_details.call_args_list == [
+            unittest.mock.call(submodule=mock_submodule, analysis={'submodule_path': 'modules/submodule', 'is_example': False}),
+            unittest.mock.call(submodule=mock_example, analysis={'submodule_path': 'examples/example', 'is_example': True}),
+        ]
+
+    def test_process_submodules_sequential(self):
+        """Test _process_submodules processes submodules sequentially by default."""
+        mock_module_version = unittest.mock.MagicMock()
+        mock_module_version.git_path = ''
+        mock_submodules = [unittest.mock.MagicMock(), unittest.mock.MagicMock()]
+
+        with GitModuleExtractor(module_version=mock_module_version) as module_extractor, \
+                unittest.mock.patch('terrareg.config.Config.MODULE_EXTRACTION_PARALLELISM', 1), \
+                unittest.mock.patch.object(module_extractor, '_process_submodule') as mock_process_submodule, \
+                unittest.mock.patch.object(module_extractor, '_process_submodules_parallel') as mock_process_submodules_parallel:
+
+            module_extractor._process_submodules(submodules=mock_submodules)
+
+        assert mock_process_submodule.call_args_list == [
+            unittest.mock.call(submodule=mock_submodules[0]),
+            unittest.mock.call(submodule=mock_submodules[1]),
+        ]
+        mock_process_submodules_parallel.assert_not_called()
+
+    def test_analyse_submodule_extraction_cache(self):
+        """Test analysis results are re-used for submodules with identical content."""
+        mock_module_version = unittest.mock.MagicMock()
+        mock_module_version.git_path = ''
+
+        with GitModuleExtractor(module_version=mock_module_version) as module_extractor, \
+                tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.MODULE_EXTRACTION_CACHE', True), \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory), \
+                unittest.mock.patch('terrareg.extraction_cache.ExtractionCache.get_tool_versions',
+                                    unittest.mock.MagicMock(return_value={'terraform-docs': '0.16.0'})), \
+                unittest.mock.patch.object(module_extractor, '_install_terraform_version',
+                                           unittest.mock.MagicMock(return_value='/tmp/terraform-binaries/1.5.2/terraform')), \
+                unittest.mock.patch.object(module_extractor, '_run_terraform_analysis',
+                                           side_effect=lambda module_path: {'terraform_version': '{"terraform_version": "1.5.2"}'}) as mock_terraform_analysis, \
+                unittest.mock.patch.object(module_extractor, '_perform_submodule_analysis',
+                                           side_effect=lambda **kwargs: {'terraform_docs': {'inputs': []}}) as mock_perform_analysis:
+
+            for directory in ['modules/submodule', 'modules/shared']:
+                os.makedirs(os.path.join(module_extractor.extract_directory, directory))
+            with open(os.path.join(module_extractor.extract_directory, 'modules/submodule/main.tf'), 'w') as fh:
+                fh.write('module "shared" {\n  source = "../shared"\n}\n')
+            with open(os.path.join(module_extractor.extract_directory, 'modules/shared/main.tf'), 'w') as fh:
+                fh.write('variable "test" {}\n')
+
+            def analyse_submodule():
+                return module_extractor._analyse_submodule(
+                    submodule_path='modules/submodule', is_example=False,
+                    module_directory=module_extractor.module_directory)
+
+            expected_analysis = {'terraform_docs': {'inputs': []}, 'terraform_version': '{"terraform_version": "1.5.2"}'}
+            assert analyse_submodule() == expected_analysis
+            assert mock_perform_analysis.call_count == 1
+            assert mock_terraform_analysis.call_count == 1
+
+            # Ensure cached result is returned for unchanged content
+            assert analyse_submodule() == expected_analysis
+            assert mock_perform_analysis.call_count == 1
+            assert mock_terraform_analysis.call_count == 1
+
+            # Ensure change to referenced local module invalidates cache
+            with open(os.path.join(module_extractor.extract_directory, 'modules/shared/main.tf'), 'w') as fh:
+                fh.write('variable "changed" {}\n')
+            analyse_submodule()
+            assert mock_perform_analysis.call_count == 2
+
+            # Ensure change to tool versions invalidates cache
+            with unittest.mock.patch('terrareg.extraction_cache.ExtractionCache.get_tool_versions',
+                                     unittest.mock.MagicMock(return_value={'terraform-docs': '0.17.0'})):
+                analyse_submodule()
+            assert mock_perform_analysis.call_count == 3
+
+            # Ensure change to selected Terraform version invalidates cache
+            with unittest.mock.patch.object(module_extractor, '_install_terraform_version',
+                                            unittest.mock.MagicMock(return_value='/tmp/terraform-binaries/1.6.0/terraform')):
+                analyse_submodule()
+            assert mock_perform_analysis.call_count == 4
+
+            # Ensure change to Terraform configuration invalidates cache
+            for config, value in [('DEFAULT_TERRAFORM_VERSION', '1.6.0'),
+                                  ('TERRAFORM_ARCHIVE_MIRROR', 'https://mirror.example.com/terraform')]:
+                with unittest.mock.patch(f'terrareg.config.Config.{config}', value):
+                    analyse_submodule()
+            assert mock_perform_analysis.call_count == 6
+
+            # Ensure analysis is not cached when disabled
+            with unittest.mock.patch('terrareg.config.Config.MODULE_EXTRACTION_CACHE', False):
+                analyse_submodule()
+            assert mock_perform_analysis.call_count == 7
+
+    def test_analyse_submodule_extraction_cache_remote_modules(self):
+        """Test Terraform analysis is not cached for submodules using remote modules."""
+        mock_module_version = unittest.mock.MagicMock()
+        mock_module_version.git_path = ''
+
+        with GitModuleExtractor(module_version=mock_module_version) as module_extractor, \
+                tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.MODULE_EXTRACTION_CACHE', True), \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory), \
+                unittest.mock.patch('terrareg.extraction_cache.ExtractionCache.get_tool_versions',
+                                    unittest.mock.MagicMock(return_value={'terraform-docs': '0.16.0'})), \
+                unittest.mock.patch.object(module_extractor, '_install_terraform_version',
+                                           unittest.mock.MagicMock(return_value='/tmp/terraform-binaries/1.5.2/terraform')), \
+                unittest.mock.patch.object(module_extractor, '_run_terraform_analysis',
+                                           side_effect=lambda module_path: {'terraform_modules': 'remote'}) as mock_terraform_analysis, \
+                unittest.mock.patch.object(module_extractor, '_perform_submodule_analysis',
+                                           side_effect=lambda **kwargs: {'terraform_docs': {'inputs': []}}) as mock_perform_analysis:
+
+            for directory in ['modules/submodule', 'modules/shared']:
+                os.makedirs(os.path.join(module_extractor.extract_directory, directory))
+            with open(os.path.join(module_extractor.extract_directory, 'modules/submodule/main.tf'), 'w') as fh:
+                fh.write('module "shared" {\n  source = "../shared"\n}\n')
+            # Remote module is used by a referenced local module
+            with open(os.path.join(module_extractor.extract_directory, 'modules/shared/main.tf'), 'w') as fh:
+                fh.write('module "remote" {\n  source  = "example.com/namespace/module/provider"\n  version = "1.0.0"\n}\n')
+
+            for _ in range(2):
+                assert module_extractor._analyse_submodule(
+                    submodule_path='modules/submodule', is_example=False,
+                    module_directory=module_extractor.module_directory
+                ) == {'terraform_docs': {'inputs': []}, 'terraform_modules': 'remote'}
+
+            # Ensure only Terraform analysis is performed again
+            assert mock_perform_analysis.call_count == 1
+            assert mock_terraform_analysis.call_count == 2
+
+    @pytest.mark.parametrize('content, expected_result', [
+        ('module "local" {\n  source = "./local"\n}\n', False),
+        ('terraform {\n  required_providers {\n    aws = {\n      source = "hashicorp/aws"\n    }\n  }\n}\n', False),
+        ('module "registry" {\n  source = "hashicorp/consul/aws"\n}\n', True),
+        ('module "git" {\n  source = "git::https://example.com/module.git"\n}\n', True),
+    ])
+    def test_extraction_cache_has_remote_modules(self, content, expected_result):
+        """Test detection of remote modules."""
+        with tempfile.TemporaryDirectory() as base_directory:
+            os.makedirs(os.path.join(base_directory, 'local'))
+            with open(os.path.join(base_directory, 'main.tf'), 'w') as fh:
+                fh.write(content)
+
+            assert ExtractionCache.has_remote_modules(directory=base_directory, base_directory=base_directory) is expected_result
+
+    def test_extraction_cache_key_with_external_local_module(self):
+        """Test analysis is not cached for modules referencing local modules outside of the module source."""
+        with tempfile.TemporaryDirectory() as base_directory, \
+                unittest.mock.patch('terrareg.extraction_cache.ExtractionCache.get_tool_versions',
+                                    unittest.mock.MagicMock(return_value={})):
+            with open(os.path.join(base_directory, 'main.tf'), 'w') as fh:
+                fh.write('module "outside" {\n  source = "../../outside"\n}\n')
+
+            assert ExtractionCache.get_key(directory=base_directory, base_directory=base_directory, include_infracost=False) is None
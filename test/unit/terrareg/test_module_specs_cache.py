@@ -0,0 +1,64 @@
+
+import unittest.mock
+
+import pytest
+
+from terrareg.module_specs_cache import ModuleSpecsCache
+
+
+class TestModuleSpecsCache:
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        """Use empty cache with 1MB size limit"""
+        ModuleSpecsCache.clear()
+        with unittest.mock.patch('terrareg.config.Config.MODULE_SPECS_CACHE_SIZE', 1):
+            yield
+        ModuleSpecsCache.clear()
+
+    def test_set_get_delete(self):
+        """Test storing, retrieving and deleting entries"""
+        assert ModuleSpecsCache.get((1, 10)) is None
+
+        ModuleSpecsCache.set((1, 10), {'inputs': []}, 10)
+        ModuleSpecsCache.set((2, 20), {'outputs': []}, 20)
+        assert ModuleSpecsCache.get((1, 10)) == {'inputs': []}
+        assert ModuleSpecsCache._CACHE_SIZE == 30
+
+        ModuleSpecsCache.delete(1)
+        assert ModuleSpecsCache.get((1, 10)) is None
+        assert ModuleSpecsCache.get((2, 20)) == {'outputs': []}
+        assert ModuleSpecsCache._CACHE_SIZE == 20
+
+    def test_eviction(self):
+        """Test least recently used entries are evicted once size limit is exceeded."""
+        ModuleSpecsCache.set((1, 1), 'first', 400 * 1024)
+        ModuleSpecsCache.set((2, 1), 'second', 400 * 1024)
+        # Mark first entry as recently used
+        assert ModuleSpecsCache.get((1, 1)) == 'first'
+        ModuleSpecsCache.set((3, 1), 'third', 400 * 1024)
+
+        assert list(ModuleSpecsCache._CACHE.keys()) == [(1, 1), (3, 1)]
+        assert ModuleSpecsCache._CACHE_SIZE == 800 * 1024
+
+    def test_replace_entry(self):
+        """Test replacing entry updates cache size"""
+        ModuleSpecsCache.set((1, 1), 'first', 100)
+        ModuleSpecsCache.set((1, 1), 'replaced', 200)
+
+        assert ModuleSpecsCache.get((1, 1)) == 'replaced'
+        assert ModuleSpecsCache._CACHE_SIZE == 200
+
+    def test_entry_larger_than_cache(self):
+        """Test entries larger than the cache are not stored"""
+        ModuleSpecsCache.set((1, 1), 'first', 100)
+        ModuleSpecsCache.set((2, 1), 'large', 2 * 1024 * 1024)
+
+        assert ModuleSpecsCache.get((2, 1)) is None
+        assert ModuleSpecsCache.get((1, 1)) == 'first'
+
+    def test_disabled(self):
+        """Test entries are not stored when cache is disabled"""
+        with unittest.mock.patch('terrareg.config.Config.MODULE_SPECS_CACHE_SIZE', 0):
+            ModuleSpecsCache.set((1, 1), 'first', 100)
+            assert ModuleSpecsCache.get((1, 1)) is None
@@ -0,0 +1,72 @@
+
+from collections import OrderedDict
+import os
+import tempfile
+import unittest.mock
+
+import pytest
+
+from terrareg.readme_html_cache import ReadmeHtmlCache
+
+
+class TestReadmeHtmlCache:
+
+    @pytest.fixture
+    def data_directory(self):
+        """Use temporary data directory and empty memory cache"""
+        with tempfile.TemporaryDirectory() as data_directory, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory), \
+                unittest.mock.patch('terrareg.readme_html_cache.ReadmeHtmlCache._MEMORY_CACHE', OrderedDict()):
+            yield data_directory
+
+    def test_get_key(self):
+        """Test key changes with hostname and render context"""
+        key = ReadmeHtmlCache.get_key(server_hostname='example.com', render_context={'is_latest_version': True})
+        assert key == ReadmeHtmlCache.get_key(server_hostname='example.com', render_context={'is_latest_version': True})
+        assert key != ReadmeHtmlCache.get_key(server_hostname='other.example.com', render_context={'is_latest_version': True})
+        assert key != ReadmeHtmlCache.get_key(server_hostname='example.com', render_context={'is_latest_version': False})
+
+    def test_set_get_delete(self, data_directory):
+        """Test storing, retrieving and deleting entries"""
+        assert ReadmeHtmlCache.get(1, 'abcd') is None
+
+        ReadmeHtmlCache.set(1, 'abcd', '<h1>Readme</h1>')
+        ReadmeHtmlCache.set(2, 'abcd', '<h1>Other</h1>')
+        assert os.path.isfile(os.path.join(data_directory, 'readme-html-cache', '1', 'abcd.html'))
+        assert ReadmeHtmlCache.get(1, 'abcd') == '<h1>Readme</h1>'
+
+        ReadmeHtmlCache.delete(1)
+        assert ReadmeHtmlCache.get(1, 'abcd') is None
+        assert not os.path.exists(os.path.join(data_directory, 'readme-html-cache', '1'))
+        assert ReadmeHtmlCache.get(2, 'abcd') == '<h1>Other</h1>'
+
+    def test_memory_eviction(self, data_directory):
+        """Test least recently used entries are evicted from memory and read from the data directory."""
+        with unittest.mock.patch('terrareg.config.Config.README_HTML_CACHE_MEMORY_ENTRIES', 2):
+            ReadmeHtmlCache.set(1, 'a', 'first')
+            ReadmeHtmlCache.set(2, 'b', 'second')
+            # Mark first entry as recently used
+            assert ReadmeHtmlCache.get(1, 'a') == 'first'
+            ReadmeHtmlCache.set(3, 'c', 'third')
+
+            assert list(ReadmeHtmlCache._MEMORY_CACHE.keys()) == [(1, 'a'), (3, 'c')]
+
+            # Ensure evicted entry is obtained from data directory
+            assert ReadmeHtmlCache.get(2, 'b') == 'second'
+            assert list(ReadmeHtmlCache._MEMORY_CACHE.keys()) == [(3, 'c'), (2, 'b')]
+
+    def test_memory_cache_disabled(self, data_directory):
+        """Test entries are only stored in data directory when memory cache is disabled."""
+        with unittest.mock.patch('terrareg.config.Config.README_HTML_CACHE_MEMORY_ENTRIES', 0):
+            ReadmeHtmlCache.set(1, 'a', 'first')
+            assert len(ReadmeHtmlCache._MEMORY_CACHE) == 0
+            assert ReadmeHtmlCache.get(1, 'a') == 'first'
+
+    def test_set_without_persisting(self, data_directory):
+        """Test entries that are not persisted are only held in memory."""
+        ReadmeHtmlCache.set(1, 'a', 'first', persist=False)
+        assert ReadmeHtmlCache.get(1, 'a') == 'first'
+        assert not os.path.exists(os.path.join(data_directory, 'readme-html-cache'))
+
+        ReadmeHtmlCache._MEMORY_CACHE.clear()
+        assert ReadmeHtmlCache.get(1, 'a') is None
@@ -0,0 +1,97 @@
+
+import pytest
+
+from terrareg.errors import InvalidTerraformGraphError
+from terrareg.terraform_graph import TerraformGraphParser
+
+
+TERRAFORM_GRAPH = """
+digraph {
+	compound = "true"
+	newrank = "true"
+	subgraph "root" {
+		"[root] aws_s3_bucket.test (expand)" [label = "aws_s3_bucket.test", shape = "box"]
+		"[root] provider[\\"registry.terraform.io/hashicorp/aws\\"]" [label = "provider[\\"registry.terraform.io/hashicorp/aws\\"]", shape = "diamond"]
+		"[root] module.child (close)" [label = "module.child", shape = "box"]
+		"[root] output.name (expand)" -> "[root] module.child (close)"
+		"[root] aws_s3_bucket.test (expand)" -> "[root] provider[\\"registry.terraform.io/hashicorp/aws\\"]"
+		"[root] output.name (expand)" -> "[root] aws_s3_bucket.test (expand)"
+		"[root] aws_s3_bucket.test (expand)" -> "[root] var.name"
+		"[root] output.name (expand)" -> "[root] module.child (close)"
+	}
+}
+"""
+
+EXPECTED_NODES = [
+    '[root] aws_s3_bucket.test (expand)',
+    '[root] provider["registry.terraform.io/hashicorp/aws"]',
+    '[root] module.child (close)',
+    '[root] output.name (expand)',
+    '[root] var.name',
+]
+
+# Edges are ordered by source node and target node, retaining parallel edges
+EXPECTED_EDGES = [
+    ('[root] aws_s3_bucket.test (expand)', '[root] provider["registry.terraform.io/hashicorp/aws"]'),
+    ('[root] aws_s3_bucket.test (expand)', '[root] var.name'),
+    ('[root] output.name (expand)', '[root] aws_s3_bucket.test (expand)'),
+    ('[root] output.name (expand)', '[root] module.child (close)'),
+    ('[root] output.name (expand)', '[root] module.child (close)'),
+]
+
+
+class TestTerraformGraphParser:
+
+    def test_parse(self):
+        """Test parsing output of terraform graph"""
+        assert TerraformGraphParser._parse_lines(TERRAFORM_GRAPH) is not None
+        assert TerraformGraphParser.parse(TERRAFORM_GRAPH) == (EXPECTED_NODES, EXPECTED_EDGES)
+
+    def test_parse_tokens(self):
+        """Test graphs that are not in the format of terraform graph output are parsed using the tokenizer."""
+        graph = (
+            '/* Graph with comments */ digraph "test" { node [shape = "box"] [color = "red"]; '
+            '"[root] aws_s3_bucket.test (expand)" [label = "aws_s3_bucket.test",\n shape = "box"]; '
+            '"[root] provider[\\"registry.terraform.io/hashicorp/aws\\"]" '
+            '"[root] module.child (close)" // Node without attributes\n'
+            '{ "[root] output.name (expand)" -> "[root] module.child (close)" } '
+            '"[root] aws_s3_bucket.test (expand)" -> "[root] provider[\\"registry.terraform.io/hashicorp/aws\\"]" '
+            '"[root] output.name (expand)" -> "[root] aws_s3_bucket.test (expand)" -> "[root] var.name" [weight = 2] '
+            '"[root] output.name (expand)":port -> "[root] module.child (close)" '
+            '}'
+        )
+        assert TerraformGraphParser._parse_lines(graph) is None
+
+        assert TerraformGraphParser.parse(graph) == (EXPECTED_NODES, EXPECTED_EDGES)
+
+    def test_parse_lines_matches_tokens(self):
+        """Test line-based parsing produces the same result as parsing tokens."""
+        assert TerraformGraphParser._parse_lines(TERRAFORM_GRAPH) == TerraformGraphParser._parse_tokens(TERRAFORM_GRAPH)
+
+    def test_strict_graph(self):
+        """Test parallel edges are removed in strict graphs"""
+        assert TerraformGraphParser.parse('strict digraph { a -> b; a -> b; b -> a }') == (['a', 'b'], [('a', 'b'), ('b', 'a')])
+
+    @pytest.mark.parametrize('graph', [
+        '',
+        'graph { a -- b }',
+        'digraph { a -> b',
+        'digraph { "a" [label = "a" }',
+        'digraph { a -> }',
+        'digraph { a -> b } c',
+        'digraph { a ! b }',
+    ])
+    def test_invalid_graph(self, graph):
+        """Test invalid graphs raise error"""
+        with pytest.raises(InvalidTerraformGraphError):
+            TerraformGraphParser.parse(graph)
+
+    def test_matches_graphviz(self):
+        """Test nodes and edges are returned in the same order as graphviz."""
+        pygraphviz = pytest.importorskip('pygraphviz')
+
+        graph = pygraphviz.AGraph(TERRAFORM_GRAPH)
+        assert TerraformGraphParser.parse(TERRAFORM_GRAPH) == (
+            [str(node) for node in graph.nodes()],
+            [(str(edge[0]), str(edge[1])) for edge in graph.edges()]
+        )